@@ -0,0 +1,142 @@
+"""Async route handlers vs the previous sync handlers, with and without I/O latency.
+
+Serves GET /events/{eventId}/registrations/{userId} two ways:
+
+- sync: a `def` handler with a sync service dependency, as the routes
+  were before; FastAPI runs both in its 40-thread pool
+- async: the application's own async handler and async service
+
+Repository reads either stay in memory or sleep --io-ms to stand in
+for a blocking backend such as DynamoDB, in which case the async path
+runs service calls on the ASYNC_IO_WORKERS executor. Requests are
+issued in-process through httpx's ASGITransport by the given numbers of
+concurrent clients, and throughput and latency percentiles are
+reported for each.
+
+Run from the backend directory:
+
+    python -m benchmarks.async_routes --clients 1 50 200 --requests 2000
+    python -m benchmarks.async_routes --clients 1 50 200 --requests 2000 --io-ms 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Optional
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+
+import core.dependencies as dependencies
+from core.exceptions import EntityNotFoundError
+from core.responses import FastJSONResponse
+from domains.events.models import Event
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+from main import app as async_app
+
+
+class SlowUserRepository(UserRepository):
+    """In-memory users whose reads block like a network round trip."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.blocking_io = True
+        self._latency = latency
+
+    def exists(self, user_id: str) -> bool:
+        time.sleep(self._latency)
+        return super().exists(user_id)
+
+
+class SlowEventRepository(EventRepository):
+    """In-memory events whose reads block like a network round trip."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.blocking_io = True
+        self._latency = latency
+
+    def get(self, event_id: str) -> Optional[Event]:
+        time.sleep(self._latency)
+        return super().get(event_id)
+
+
+def build_sync_app(service: EventService) -> FastAPI:
+    """Build the registration-position route the way it was served before."""
+    app = FastAPI()
+
+    def get_service() -> EventService:
+        return service
+
+    @app.get("/events/{eventId}/registrations/{userId}")
+    def get_registration_position(
+        eventId: str, userId: str, service: EventService = Depends(get_service)
+    ) -> FastJSONResponse:
+        try:
+            return FastJSONResponse(service.get_registration_position(eventId, userId))
+        except EntityNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    return app
+
+
+async def drive(app: FastAPI, clients: int, requests: int) -> dict:
+    """Issue requests from concurrent clients, returning throughput and latency."""
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def run_client(index: int) -> None:
+            for n in range(index, requests, clients):
+                start = time.perf_counter()
+                response = await client.get(f"/events/bench/registrations/user-{n % 100}")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "p50": statistics.median(latencies) * 1e3,
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1e3,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--io-ms", type=float, default=0.0, help="simulated latency per repository read")
+    args = parser.parse_args()
+
+    latency = args.io_ms / 1000
+    if latency:
+        users, events = SlowUserRepository(latency), SlowEventRepository(latency)
+    else:
+        users, events = UserRepository(), EventRepository()
+    for i in range(100):
+        users.create(User(userId=f"user-{i}", name=f"User {i}"))
+    events.create(Event(
+        eventId="bench", capacity=100, registered=RegistrantList(f"user-{i}" for i in range(100))
+    ))
+    dependencies.override_repositories(users, events)
+    apps = {"sync": build_sync_app(EventService(events)), "async": async_app}
+
+    storage = f"{args.io_ms:g} ms simulated I/O per read" if latency else "in memory"
+    print(f"{args.requests} registration-position requests, {storage}")
+    print(f"{'clients':>8} {'handlers':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for clients in args.clients:
+        for label, app in apps.items():
+            result = asyncio.run(drive(app, clients, args.requests))
+            print(f"{clients:>8} {label:>9} {result['throughput']:>9.0f} {result['p50']:>8.3f} {result['p99']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
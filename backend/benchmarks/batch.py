@@ -0,0 +1,78 @@
+"""Benchmark for seeding users and registrations through the API.
+
+Compares one request per item against the :batch endpoints, driving
+the FastAPI app in-process with Starlette's TestClient (needs httpx).
+Each mode runs against fresh repositories.
+
+Run from the backend directory:
+
+    python -m benchmarks.batch --users 5000 --batch-size 1000
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+import core.dependencies as dependencies
+from domains.events.repository import EventRepository
+from domains.users.repository import UserRepository
+from main import app
+
+
+def reset_state() -> None:
+    """Point the app at empty in-memory repositories."""
+    dependencies.override_repositories(UserRepository(), EventRepository())
+
+
+def seed_individually(client: TestClient, user_ids, event_id: str) -> None:
+    """Create and register users with one request each."""
+    for user_id in user_ids:
+        client.post("/users", json={"userId": user_id, "name": user_id})
+    for user_id in user_ids:
+        client.post(f"/events/{event_id}/registrations", json={"userId": user_id})
+
+
+def seed_in_batches(client: TestClient, user_ids, event_id: str, batch_size: int) -> None:
+    """Create and register users through the batch endpoints."""
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        client.post("/users:batch", json={"users": [{"userId": u, "name": u} for u in chunk]})
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        client.post(f"/events/{event_id}/registrations:batch", json={"userIds": chunk})
+
+
+def run(label: str, seed, client: TestClient, user_ids, capacity: int, *extra) -> float:
+    """Seed a fresh event and verify its final state, returns seconds."""
+    reset_state()
+    event_id = "seed-event"
+    client.post("/events", json={"eventId": event_id, "capacity": capacity, "hasWaitlist": True})
+    start = time.perf_counter()
+    seed(client, user_ids, event_id, *extra)
+    elapsed = time.perf_counter() - start
+
+    body = client.get(f"/events/{event_id}/registrations").json()
+    assert len(body["registered"]) == min(capacity, len(user_ids))
+    assert len(body["registered"]) + len(body["waitlist"]) == len(user_ids)
+    print(f"  {label:<12} {elapsed:8.2f}s  {2 * len(user_ids) / elapsed:10.0f} items/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--capacity", type=int, default=4_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    user_ids = [f"user-{i}" for i in range(args.users)]
+    client = TestClient(app)
+    print(f"users={args.users} capacity={args.capacity} batch-size={args.batch_size}")
+    single = run("individual", seed_individually, client, user_ids, args.capacity)
+    batched = run("batch", seed_in_batches, client, user_ids, args.capacity, args.batch_size)
+    print(f"  speedup      {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark for bulk NDJSON export and import through the admin routes.
+
+Builds a state directly in the repositories, then times GET
+/admin/export and a POST /admin/import of its output into empty
+repositories, in memory or over a write-ahead log. The imported state
+is checked against the original. With --batch, the same state is also
+seeded through the :batch endpoints for comparison. Drives the FastAPI
+app in-process with Starlette's TestClient (needs httpx), uncompressed.
+
+Run from the backend directory:
+
+    python -m benchmarks.bulk_transfer --users 100000 --events 100 --per-event 10000
+    python -m benchmarks.bulk_transfer --persistence-dir /tmp/bulk --fsync always
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import time
+
+from fastapi.testclient import TestClient
+
+import core.dependencies as dependencies
+from core.persistence import DurableStore
+from domains.events.durable_repository import DurableEventRepository
+from domains.events.models import Event
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.users.durable_repository import DurableUserRepository
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+# The admin routes are only mounted when opted in
+os.environ.setdefault("ADMIN_API", "on")
+from main import app  # noqa: E402
+
+# Bytes per request body chunk sent to the import
+CHUNK_SIZE = 64 * 1024
+
+# Largest batch accepted by the :batch endpoints
+BATCH_SIZE = 1000
+
+
+def build_source(users: int, events: int, per_event: int, seed: int) -> EventRepository:
+    """Fill fresh repositories with users and full events, a fifth of each waitlisted."""
+    rng = random.Random(seed)
+    user_ids = [f"user-{i:07d}" for i in range(users)]
+    user_repo, event_repo = UserRepository(), EventRepository()
+    for user_id in user_ids:
+        user_repo.create(User.model_construct(userId=user_id, name=f"User {user_id}"))
+    capacity = per_event * 4 // 5
+    for e in range(events):
+        registrants = rng.sample(user_ids, per_event)
+        event_repo.create(Event(
+            eventId=f"event-{e:05d}", name=f"Event {e}", capacity=capacity, hasWaitlist=True,
+            registered=RegistrantList(registrants[:capacity]), waitlist=RegistrantList(registrants[capacity:]),
+        ))
+    dependencies.override_repositories(user_repo, event_repo)
+    return event_repo
+
+
+def empty_target(persistence_dir: str, fsync: str):
+    """Point the app at empty repositories, durable if a directory is given."""
+    if not persistence_dir:
+        repositories = UserRepository(), EventRepository()
+    else:
+        shutil.rmtree(persistence_dir, ignore_errors=True)
+        store = DurableStore(persistence_dir, fsync=fsync, snapshot_every=10**12)
+        repositories = DurableUserRepository(store), DurableEventRepository(store)
+        store.recover()
+    dependencies.override_repositories(*repositories)
+    return repositories[1]
+
+
+def state_of(event_repo: EventRepository):
+    """Get every event's registered list and waitlist, for comparing states."""
+    return {event.eventId: (list(event.registered), list(event.waitlist)) for event in event_repo.list_all()}
+
+
+async def largest_chunk() -> int:
+    """Get the size of the largest chunk an export streams."""
+    service = await dependencies.get_async_admin_service()
+    return max([len(chunk) async for chunk in service.export()])
+
+
+def seed_in_batches(client: TestClient, lines) -> None:
+    """Seed the exported state through the :batch endpoints instead."""
+    records = [json.loads(line) for line in lines if line]
+    users = [{"userId": r["userId"], "name": r["name"]} for r in records if r["type"] == "user"]
+    for start in range(0, len(users), BATCH_SIZE):
+        client.post("/users:batch", json={"users": users[start:start + BATCH_SIZE]})
+    for record in records:
+        if record["type"] != "event":
+            continue
+        registrants = record.pop("registered") + record.pop("waitlist")
+        del record["type"]
+        client.post("/events", json=record)
+        for start in range(0, len(registrants), BATCH_SIZE):
+            client.post(
+                f"/events/{record['eventId']}/registrations:batch",
+                json={"userIds": registrants[start:start + BATCH_SIZE]},
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--per-event", type=int, default=10_000)
+    parser.add_argument("--persistence-dir", help="import into durable repositories in this directory")
+    parser.add_argument("--fsync", default="always", choices=("always", "interval", "none"))
+    parser.add_argument("--batch", action="store_true", help="also seed through the :batch endpoints")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    registrations = args.events * args.per_event
+    print(f"users={args.users} events={args.events} registrations={registrations}")
+    source = build_source(args.users, args.events, args.per_event, args.seed)
+    expected = state_of(source)
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "identity"}
+
+    start = time.perf_counter()
+    body = client.get("/admin/export", headers=headers).content
+    elapsed = time.perf_counter() - start
+    # TestClient buffers responses, so chunk sizes come from the service itself
+    largest = asyncio.run(largest_chunk())
+    print(f"  export          {elapsed:6.2f}s  {registrations / elapsed:10.0f} registrations/s  "
+          f"{len(body) / 2**20:.1f} MiB, largest chunk {largest / 2**20:.1f} MiB")
+
+    target = empty_target(args.persistence_dir, args.fsync)
+    start = time.perf_counter()
+    response = client.post(
+        "/admin/import",
+        content=(body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)),
+        headers=headers,
+    )
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.text
+    counts = response.json()
+    assert counts["registered"] + counts["waitlisted"] == registrations, counts
+    assert state_of(target) == expected
+    label = f"import ({args.fsync})" if args.persistence_dir else "import"
+    print(f"  {label:<16}{elapsed:6.2f}s  {registrations / elapsed:10.0f} registrations/s")
+
+    if args.batch:
+        target = empty_target(args.persistence_dir, args.fsync)
+        start = time.perf_counter()
+        seed_in_batches(client, body.split(b"\n"))
+        elapsed = time.perf_counter() - start
+        assert state_of(target) == expected
+        print(f"  {':batch':<16}{elapsed:6.2f}s  {registrations / elapsed:10.0f} registrations/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Capacity changes: bulk promotion cost against waitlist length.
+
+Fills one event with a registered list and a long waitlist, raises
+capacity by k seats with EventService.update_capacity, which promotes
+k users in one pass under one lock, then lowers it again, demoting the
+same k users to the head of the waitlist. Bulk times include the
+reverse-index updates and change feed notifications for every moved
+user.
+
+For comparison, `pop(0) ms` times only the list updates of promoting
+k users one at a time from a waitlist held as a plain list, as before
+the registrant list: each `waitlist.pop(0)` shifts the whole list, so
+that column grows with the waitlist length while bulk promotion does
+not. Demotion rebuilds the waitlist, so it grows with both.
+
+Run from the backend directory:
+
+    python -m benchmarks.capacity --waitlist 10000 100000 --promote 100 1000
+"""
+
+import argparse
+import time
+from typing import List
+
+from domains.events.models import Event
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+
+
+def promote_one_at_a_time(registered: List[str], waitlist: List[str], count: int) -> None:
+    """Move the waitlist head into a seat count times, as separate list updates."""
+    for _ in range(count):
+        registered.append(waitlist.pop(0))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registered", type=int, default=1_000)
+    parser.add_argument("--waitlist", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--promote", type=int, nargs="+", default=[100, 1_000])
+    args = parser.parse_args()
+
+    print(f"{args.registered} registered")
+    print(f"{'waitlist':>9} {'k':>6} {'bulk ms':>9} {'pop(0) ms':>10} {'demote ms':>10}")
+    for waitlist_size in args.waitlist:
+        for count in args.promote:
+            registered = [f"r{i}" for i in range(args.registered)]
+            waitlist = [f"w{i}" for i in range(waitlist_size)]
+            repository = EventRepository()
+            repository.create(Event(
+                eventId="bench",
+                capacity=args.registered,
+                hasWaitlist=True,
+                registered=RegistrantList(registered),
+                waitlist=RegistrantList(waitlist),
+            ))
+            service = EventService(repository)
+
+            start = time.perf_counter()
+            result = service.update_capacity("bench", args.registered + count)
+            bulk = time.perf_counter() - start
+            assert len(result["promoted"]) == min(count, waitlist_size)
+
+            start = time.perf_counter()
+            service.update_capacity("bench", args.registered)
+            demote = time.perf_counter() - start
+
+            start = time.perf_counter()
+            promote_one_at_a_time(registered, waitlist, count)
+            loop = time.perf_counter() - start
+
+            print(f"{waitlist_size:>9} {count:>6} {bulk * 1e3:>9.2f} {loop * 1e3:>10.2f} {demote * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
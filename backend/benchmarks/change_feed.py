@@ -0,0 +1,76 @@
+"""Change feed fan-out cost and delivery latency by subscriber count.
+
+Subscribes the given numbers of readers to one topic on an asyncio
+loop, then publishes changes from another thread, as services do from
+the I/O executor. Reports the publisher's cost per change, which
+grows with the wakeups it schedules, and the median and p99 time from
+publish until a reader holds the change.
+
+Run from the backend directory:
+
+    python -m benchmarks.change_feed --subscribers 1 100 1000 --changes 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from typing import List
+
+from core.change_feed import ChangeFeed
+
+
+async def run(subscribers: int, changes: int) -> dict:
+    """Publish changes to subscribed readers, returning publish cost and delivery latency."""
+    feed = ChangeFeed(buffer_size=max(256, changes), heartbeat=5)
+    subscriptions = [feed.subscribe("bench") for _ in range(subscribers)]
+    delays: List[float] = []
+
+    async def reader(subscription) -> None:
+        received = 0
+        while received < changes:
+            batch = await subscription.next(feed.heartbeat)
+            now = time.perf_counter()
+            for _, _, data in batch:
+                delays.append(now - float(data))
+            received += len(batch)
+        subscription.close()
+
+    publish_seconds = []
+
+    def publisher() -> None:
+        for _ in range(changes):
+            start = time.perf_counter()
+            feed.publish("bench", "registered", start)
+            publish_seconds.append(time.perf_counter() - start)
+            # Roughly one change per millisecond, so readers keep up
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    await asyncio.gather(*(reader(s) for s in subscriptions))
+    thread.join()
+    delays.sort()
+    return {
+        "publish_us": statistics.mean(publish_seconds) * 1e6,
+        "p50": statistics.median(delays) * 1e3,
+        "p99": delays[int(len(delays) * 0.99) - 1] * 1e3,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.changes} changes to one topic")
+    print(f"{'subscribers':>12} {'publish us':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for subscribers in args.subscribers:
+        result = asyncio.run(run(subscribers, args.changes))
+        print(f"{subscribers:>12} {result['publish_us']:>11.1f} {result['p50']:>8.3f} {result['p99']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
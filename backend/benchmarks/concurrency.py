@@ -0,0 +1,122 @@
+"""Multi-threaded registration stress test.
+
+Hammers a handful of events with concurrent register/unregister calls
+from a thread pool, then checks that capacity was never exceeded and
+that registered, waitlist and the user index agree. Reports throughput
+for each thread count.
+
+Run from the backend directory:
+
+    python -m benchmarks.concurrency --threads 1 2 4 8 16 --mode striped
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.exceptions import BusinessRuleViolationError
+from core.locking import EventLocks
+from domains.events.models import Event
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+
+def build(num_events: int, num_users: int, capacity: int, locks: EventLocks):
+    """Create users and waitlist-enabled events."""
+    user_repo = UserRepository()
+    event_repo = EventRepository()
+    for i in range(num_users):
+        user_repo.create(User(userId=f"user-{i}", name=f"user-{i}"))
+    event_service = EventService(event_repo)
+    for i in range(num_events):
+        event_service.create_event(
+            Event(eventId=f"event-{i}", capacity=capacity, waitlistEnabled=True)
+        )
+    return event_repo, RegistrationService(user_repo, event_repo, locks)
+
+
+def worker(service: RegistrationService, event_ids, user_ids, ops: int, seed: int,
+           violations: list) -> None:
+    """Issue a random mix of registrations and unregistrations."""
+    rng = random.Random(seed)
+    for _ in range(ops):
+        event_id = rng.choice(event_ids)
+        user_id = rng.choice(user_ids)
+        try:
+            if rng.random() < 0.7:
+                service.register_user(event_id, user_id)
+            else:
+                service.unregister_user(event_id, user_id)
+        except BusinessRuleViolationError:
+            pass
+        except (ValueError, IndexError) as e:
+            violations.append(f"{event_id}/{user_id}: {e!r}")
+
+
+def check_invariants(event_repo: EventRepository, user_ids) -> list:
+    """Return a list of invariant violations found in the final state."""
+    problems = []
+    for event in event_repo.list_all():
+        registered, waitlist = list(event.registered), list(event.waitlist)
+        if len(registered) > event.capacity:
+            problems.append(f"{event.eventId} overbooked: {len(registered)}/{event.capacity}")
+        if waitlist and len(registered) < event.capacity:
+            problems.append(f"{event.eventId} has free seats but a waitlist")
+        if set(registered) & set(waitlist):
+            problems.append(f"{event.eventId} has users both registered and waitlisted")
+    for user_id in user_ids:
+        indexed = {e.eventId for e in event_repo.list_registered_for_user(user_id)}
+        actual = {e.eventId for e in event_repo.list_all() if user_id in e.registered}
+        if indexed != actual:
+            problems.append(f"{user_id} index mismatch")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--mode", choices=["striped", "global"], default="striped")
+    parser.add_argument("--stripes", type=int, default=64)
+    parser.add_argument("--events", type=int, default=8)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=20_000, help="total operations per run")
+    parser.add_argument("--switch-interval", type=float, default=1e-6,
+                        help="sys.setswitchinterval value; small values provoke races")
+    args = parser.parse_args()
+
+    sys.setswitchinterval(args.switch_interval)
+    event_ids = [f"event-{i}" for i in range(args.events)]
+    user_ids = [f"user-{i}" for i in range(args.users)]
+    failed = False
+
+    print(f"mode={args.mode} events={args.events} capacity={args.capacity} ops={args.ops}")
+    print(f"{'threads':>8} {'ops/s':>12} {'violations':>11}")
+    for threads in args.threads:
+        locks = EventLocks(stripes=args.stripes, global_mode=args.mode == "global")
+        event_repo, service = build(args.events, args.users, args.capacity, locks)
+        violations: list = []
+        per_thread = args.ops // threads
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for t in range(threads):
+                pool.submit(worker, service, event_ids, user_ids, per_thread, t, violations)
+        elapsed = time.perf_counter() - start
+
+        violations.extend(check_invariants(event_repo, user_ids))
+        failed = failed or bool(violations)
+        print(f"{threads:>8} {per_thread * threads / elapsed:>12.0f} {len(violations):>11}")
+        for problem in violations[:5]:
+            print(f"    {problem}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Polling cost of registration reads with ETags and the response cache.
+
+Polls GET /events/{eventId}/registrations on a large event and
+GET /users/{userId}/events for a user registered for many events, in
+three modes:
+
+- uncached: body cache disabled, so every poll re-serializes
+- cached: the body is served from the (resource, version) LRU
+- 304: the client sends If-None-Match and gets an empty 304
+
+Requests ask for identity encoding unless --gzip is given; with gzip,
+compressing each 200 response adds the same cost to both the uncached
+and cached modes.
+
+Runs in-process via Starlette's TestClient (needs httpx).
+
+Run from the backend directory:
+
+    python -m benchmarks.conditional --registrants 5000 --user-events 200 --polls 500
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+import core.dependencies as dependencies
+import core.http_cache as http_cache
+from domains.events.models import Event
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.users.models import User
+from domains.users.repository import UserRepository
+from main import app
+
+
+def poll(client: TestClient, path: str, polls: int, etag: bool, encoding: str) -> float:
+    """Poll a path, returning milliseconds per request."""
+    headers = {"Accept-Encoding": encoding}
+    if etag:
+        headers["If-None-Match"] = client.get(path, headers=headers).headers["etag"]
+    start = time.perf_counter()
+    for _ in range(polls):
+        response = client.get(path, headers=headers)
+        assert response.status_code == (304 if etag else 200)
+    return (time.perf_counter() - start) / polls * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registrants", type=int, default=5000)
+    parser.add_argument("--user-events", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--gzip", action="store_true", help="accept gzip-compressed responses")
+    args = parser.parse_args()
+
+    users, events = UserRepository(), EventRepository()
+    for i in range(args.registrants):
+        users.create(User(userId=f"user-{i}", name=f"User {i}"))
+    events.create(Event(
+        eventId="big-event",
+        capacity=args.registrants // 2,
+        hasWaitlist=True,
+        registered=RegistrantList(f"user-{i}" for i in range(args.registrants // 2)),
+        waitlist=RegistrantList(f"user-{i}" for i in range(args.registrants // 2, args.registrants)),
+    ))
+    for e in range(args.user_events):
+        events.create(Event(
+            eventId=f"event-{e}",
+            title=f"Event {e}",
+            capacity=50,
+            registered=RegistrantList(f"user-{(e + k) % args.registrants}" for k in range(50)),
+        ))
+    dependencies.override_repositories(users, events)
+    client = TestClient(app)
+
+    paths = {
+        f"registrations ({args.registrants} users)": "/events/big-event/registrations",
+        f"user events ({args.user_events} events)": "/users/user-49/events",
+    }
+    encoding = "gzip" if args.gzip else "identity"
+    shared_cache = http_cache.response_cache
+    print(f"{args.polls} polls, ms/request")
+    print(f"{'resource':<32} {'uncached':>9} {'cached':>9} {'304':>9}")
+    for label, path in paths.items():
+        http_cache.response_cache = http_cache.ResponseCache(max_entries=0)
+        uncached = poll(client, path, args.polls, etag=False, encoding=encoding)
+        http_cache.response_cache = shared_cache
+        cached = poll(client, path, args.polls, etag=False, encoding=encoding)
+        not_modified = poll(client, path, args.polls, etag=True, encoding=encoding)
+        print(f"{label:<32} {uncached:>9.3f} {cached:>9.3f} {not_modified:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Latency and throughput benchmark for the DynamoDB repositories.
+
+Runs the registration hot paths against moto's in-process DynamoDB by
+default, or against DynamoDB Local with --endpoint-url. Several service
+instances with independent locks stand in for concurrent Lambda
+instances, so capacity is enforced only by the conditional writes.
+
+moto's backend is not thread-safe, so against moto the instances are
+interleaved from a single thread; use DynamoDB Local to exercise truly
+concurrent conditional writes.
+
+Run from the backend directory (moto is needed for the default mode):
+
+    pip install -r requirements-dev.txt
+    python -m benchmarks.dynamodb --instances 4 --registrations 400
+    python -m benchmarks.dynamodb --endpoint-url http://localhost:8000 --threads 16
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from core.exceptions import BusinessRuleViolationError
+from core.locking import EventLocks
+from domains.events.models import Event
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(name: str, samples: List[float], elapsed: float) -> None:
+    """Print latency percentiles and throughput for one operation."""
+    print(f"  {name:<18} n={len(samples):<6} "
+          f"p50={percentile(samples, 50) * 1e3:7.2f}ms "
+          f"p99={percentile(samples, 99) * 1e3:7.2f}ms "
+          f"mean={statistics.fmean(samples) * 1e3:7.2f}ms "
+          f"{len(samples) / elapsed:8.0f} ops/s")
+
+
+def timed(fn: Callable[[], object], samples: List[float]) -> None:
+    """Call fn, appending its latency and ignoring rule violations."""
+    start = time.perf_counter()
+    try:
+        fn()
+    except BusinessRuleViolationError:
+        pass
+    samples.append(time.perf_counter() - start)
+
+
+def run_phase(name: str, calls: List[Callable[[], object]], threads: int) -> None:
+    """Run calls across a thread pool and report their latency."""
+    samples: List[float] = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(timed, call, samples) for call in calls]
+        for future in futures:
+            future.result()
+    report(name, samples, time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def dynamodb_backend(endpoint_url: str):
+    """Yield a DynamoDB client backed by DynamoDB Local or moto."""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    if endpoint_url:
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+        from core.dynamodb import create_client
+        yield create_client(endpoint_url)
+        return
+    try:
+        from moto import mock_aws
+    except ImportError:
+        raise SystemExit("moto is required without --endpoint-url: pip install -r requirements-dev.txt")
+    with mock_aws():
+        from core.dynamodb import create_client
+        yield create_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint-url", default="", help="DynamoDB Local URL; moto if omitted")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--registrations", type=int, default=400)
+    parser.add_argument("--instances", type=int, default=4,
+                        help="service instances with independent locks")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="worker threads; defaults to 1 on moto and 8 on DynamoDB Local")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.threads is None:
+        args.threads = 8 if args.endpoint_url else 1
+
+    with dynamodb_backend(args.endpoint_url) as client:
+        from core.dynamodb import create_tables
+        from domains.events.dynamodb_repository import DynamoDBEventRepository
+        from domains.users.dynamodb_repository import DynamoDBUserRepository
+
+        suffix = uuid.uuid4().hex[:8]
+        events_table, users_table = f"bench-events-{suffix}", f"bench-users-{suffix}"
+        create_tables(client, events_table, users_table)
+        user_repo = DynamoDBUserRepository(client, users_table)
+        event_repo = DynamoDBEventRepository(client, events_table, users_table)
+        services = [
+            RegistrationService(user_repo, event_repo, EventLocks())
+            for _ in range(args.instances)
+        ]
+
+        rng = random.Random(args.seed)
+        user_ids = [f"user-{i}" for i in range(args.users)]
+        event_id = "bench-event"
+        print(f"instances={args.instances} threads={args.threads} "
+              f"capacity={args.capacity} registrations={args.registrations}")
+
+        run_phase("create_user", [
+            lambda u=u: user_repo.create(User(userId=u, name=u)) for u in user_ids
+        ], args.threads)
+        EventService(event_repo).create_event(
+            Event(eventId=event_id, capacity=args.capacity, waitlistEnabled=True)
+        )
+
+        registrants = rng.sample(user_ids, min(args.registrations, len(user_ids)))
+        run_phase("register_user", [
+            lambda u=u, i=i: services[i % len(services)].register_user(event_id, u)
+            for i, u in enumerate(registrants)
+        ], args.threads)
+
+        leaving = rng.sample(registrants, len(registrants) // 4)
+        run_phase("unregister_user", [
+            lambda u=u, i=i: services[i % len(services)].unregister_user(event_id, u)
+            for i, u in enumerate(leaving)
+        ], args.threads)
+
+        run_phase("get_user_events", [
+            lambda u=u: services[0].get_user_events(u) for u in registrants
+        ], args.threads)
+
+        event = event_repo.get(event_id)
+        problems: Dict[str, object] = {}
+        if len(event.registered) > event.capacity:
+            problems["overbooked"] = len(event.registered)
+        if set(event.registered) & set(event.waitlist):
+            problems["duplicates"] = set(event.registered) & set(event.waitlist)
+        expected = min(args.capacity, len(registrants) - len(leaving))
+        if len(event.registered) != expected:
+            problems["registered"] = f"{len(event.registered)} != {expected}"
+        print(f"  final: registered={len(event.registered)}/{event.capacity} "
+              f"waitlist={len(event.waitlist)} problems={problems or 'none'}")
+        if problems:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
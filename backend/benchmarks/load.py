@@ -0,0 +1,545 @@
+"""Load-testing suite for the registration API.
+
+Drives realistic request mixes through the full HTTP stack and reports
+throughput, latency percentiles and peak memory per scenario:
+
+- flash_sale: one event opens and every user tries to register at once
+- waitlist_churn: registered users leave (promoting the waitlist) while
+  new users keep joining
+- user_events_reads: heavy GET /users/{userId}/events traffic across
+  many events
+- overload: a registration storm from eight times --concurrency
+  writers, who retry shed requests after Retry-After, while
+  --concurrency / 4 readers poll GET /users/{userId}/events. Only
+  reads are recorded, so the percentiles are read latency under
+  overload. Against a server, the writers run in their own process so
+  their client work does not delay the readers. Compare a server
+  started with LOAD_SHEDDING=on against one without
+
+Targets:
+
+- inprocess: the ASGI app via httpx's ASGITransport; memory is the
+  tracemalloc peak
+- uvicorn: a local `uvicorn main:app` subprocess per scenario; memory
+  is the server's peak RSS
+- url: an already running deployment given by --base-url (ids are
+  prefixed with a run id so repeated runs do not collide)
+
+Each scenario checks the final registration state, so the suite also
+serves as an end-to-end check of the registration workflow.
+
+Run from the backend directory (needs httpx, and uvicorn for that target):
+
+    python -m benchmarks.load --target inprocess --scale 1 --concurrency 32
+    python -m benchmarks.load --target uvicorn --save-baseline baseline.json
+    python -m benchmarks.load --target inprocess --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements from one scenario run."""
+    name: str
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    peak_memory_mb: Optional[float]
+    checks: List[str] = field(default_factory=list)
+
+
+class Recorder:
+    """Collects request latencies and unexpected statuses."""
+
+    def __init__(self):
+        """Initialize empty measurements."""
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    async def send(self, client: httpx.AsyncClient, method: str, url: str,
+                   expected: tuple = (200, 201), **kwargs) -> httpx.Response:
+        """Send a request, recording its latency and whether it failed."""
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.append(time.perf_counter() - start)
+        if response.status_code not in expected:
+            self.errors += 1
+        return response
+
+
+async def run_concurrently(calls: List[Callable[[], Awaitable]], concurrency: int) -> None:
+    """Run calls with at most `concurrency` in flight."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for call in calls:
+        queue.put_nowait(call)
+
+    async def worker() -> None:
+        while not queue.empty():
+            await queue.get_nowait()()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def seed_users(client: httpx.AsyncClient, user_ids: List[str]) -> None:
+    """Create users through the batch endpoint."""
+    for start in range(0, len(user_ids), 1000):
+        chunk = user_ids[start:start + 1000]
+        response = await client.post(
+            "/users:batch", json={"users": [{"userId": u, "name": u} for u in chunk]}
+        )
+        response.raise_for_status()
+
+
+async def seed_event(client: httpx.AsyncClient, event_id: str, capacity: int,
+                     user_ids: List[str] = ()) -> None:
+    """Create a waitlist-enabled event, optionally registering users in bulk."""
+    response = await client.post(
+        "/events", json={"eventId": event_id, "capacity": capacity, "hasWaitlist": True}
+    )
+    response.raise_for_status()
+    for start in range(0, len(user_ids), 1000):
+        response = await client.post(
+            f"/events/{event_id}/registrations:batch",
+            json={"userIds": list(user_ids[start:start + 1000])}
+        )
+        response.raise_for_status()
+
+
+async def flash_sale(client: httpx.AsyncClient, recorder: Recorder, scale: float,
+                     concurrency: int, prefix: str, rng: random.Random) -> List[str]:
+    """Every user registers for one event the moment it opens."""
+    users = [f"{prefix}fs-user-{i}" for i in range(int(2000 * scale))]
+    capacity = max(1, len(users) // 10)
+    event_id = f"{prefix}fs-event"
+    await seed_users(client, users)
+    await seed_event(client, event_id, capacity)
+
+    rng.shuffle(users)
+    await run_concurrently([
+        lambda u=u: recorder.send(client, "POST", f"/events/{event_id}/register", json={"userId": u})
+        for u in users
+    ], concurrency)
+
+    body = (await client.get(f"/events/{event_id}/registrations")).json()
+    checks = []
+    if len(body["registered"]) != capacity:
+        checks.append(f"registered {len(body['registered'])} != capacity {capacity}")
+    if len(body["registered"]) + len(body["waitlist"]) != len(users):
+        checks.append("registered + waitlist does not account for every user")
+    return checks
+
+
+async def waitlist_churn(client: httpx.AsyncClient, recorder: Recorder, scale: float,
+                         concurrency: int, prefix: str, rng: random.Random) -> List[str]:
+    """Registered users leave, promoting the waitlist, while newcomers join."""
+    users = [f"{prefix}wc-user-{i}" for i in range(int(2000 * scale))]
+    capacity = max(1, len(users) // 4)
+    event_id = f"{prefix}wc-event"
+    joined, newcomers = users[:len(users) // 2], users[len(users) // 2:]
+    await seed_users(client, users)
+    await seed_event(client, event_id, capacity, joined)
+
+    leavers = rng.sample(joined, len(joined) // 2)
+    calls = [
+        lambda u=u: recorder.send(client, "DELETE", f"/events/{event_id}/registrations/{u}")
+        for u in leavers
+    ] + [
+        lambda u=u: recorder.send(client, "POST", f"/events/{event_id}/register", json={"userId": u})
+        for u in newcomers
+    ]
+    rng.shuffle(calls)
+    await run_concurrently(calls, concurrency)
+
+    body = (await client.get(f"/events/{event_id}/registrations")).json()
+    remaining = len(joined) - len(leavers) + len(newcomers)
+    checks = []
+    if len(body["registered"]) != min(capacity, remaining):
+        checks.append(f"registered {len(body['registered'])} != {min(capacity, remaining)}")
+    if len(body["registered"]) + len(body["waitlist"]) != remaining:
+        checks.append("registered + waitlist does not account for remaining users")
+    if set(body["registered"]) & set(leavers) or set(body["waitlist"]) & set(leavers):
+        checks.append("a user who left is still on the event")
+    return checks
+
+
+async def user_events_reads(client: httpx.AsyncClient, recorder: Recorder, scale: float,
+                            concurrency: int, prefix: str, rng: random.Random) -> List[str]:
+    """Many users each read their schedule across many events."""
+    users = [f"{prefix}ur-user-{i}" for i in range(int(500 * scale))]
+    events = [f"{prefix}ur-event-{i}" for i in range(int(1000 * scale))]
+    per_event = max(1, len(users) // 10)
+    await seed_users(client, users)
+    expected: Dict[str, int] = {u: 0 for u in users}
+    for event_id in events:
+        attendees = rng.sample(users, per_event)
+        for user_id in attendees:
+            expected[user_id] += 1
+        await seed_event(client, event_id, per_event, attendees)
+
+    readers = [rng.choice(users) for _ in range(int(4000 * scale))]
+    await run_concurrently([
+        lambda u=u: recorder.send(client, "GET", f"/users/{u}/events") for u in readers
+    ], concurrency)
+
+    checks = []
+    for user_id in rng.sample(users, min(20, len(users))):
+        count = len((await client.get(f"/users/{user_id}/events")).json()["events"])
+        if count != expected[user_id]:
+            checks.append(f"{user_id} has {count} events, expected {expected[user_id]}")
+    return checks
+
+
+# Sends one registration; returns (status, Retry-After header) or None if the connection dropped
+PostRegistration = Callable[[str], Awaitable[Optional[Tuple[int, Optional[str]]]]]
+
+
+async def register_storm(connect: Callable[[], PostRegistration], user_ids: List[str],
+                         writers: int) -> Tuple[int, List[int]]:
+    """Register every user, retrying shed requests after Retry-After; returns shed count and failures.
+
+    Each writer gets its own sender from connect().
+    """
+    pending = deque(user_ids)
+    shed = dropped = 0
+    unexpected: List[int] = []
+
+    async def writer() -> None:
+        nonlocal shed, dropped
+        post = connect()
+        while pending:
+            user_id = pending.popleft()
+            response = await post(user_id)
+            if response is None:
+                # The server dropped the connection; a client would retry
+                dropped += 1
+                pending.append(user_id)
+                continue
+            status, retry_after = response
+            if status in (429, 503):
+                shed += 1
+                pending.append(user_id)
+                await asyncio.sleep(float(retry_after or "1"))
+            elif status != 200:
+                unexpected.append(status)
+
+    await asyncio.gather(*(writer() for _ in range(writers)))
+    print(f"    overload: {shed} registrations shed, {dropped} connections dropped, all retried")
+    return shed, unexpected
+
+
+class RawConnection:
+    """Bare keep-alive HTTP/1.1 client for plain http, far cheaper per request than httpx.
+
+    The storm runs on the same machine as the server, so its client cost
+    must stay well below the server's for the server to be overloaded.
+    """
+
+    def __init__(self, host: str, port: int):
+        """Initialize; the connection opens on the first request."""
+        self._host = host
+        self._port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def post(self, path: str, body: bytes) -> Optional[Tuple[int, Dict[str, str]]]:
+        """Send a JSON POST, returning the status and lower-cased headers, or None if it failed."""
+        try:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+            self._writer.write(
+                b"POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (path.encode(), self._host.encode(), len(body), body)
+            )
+            head = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            headers = {}
+            for line in head[1:]:
+                name, _, value = line.partition(":")
+                if name:
+                    headers[name.lower()] = value.strip()
+            await self._reader.readexactly(int(headers.get("content-length", "0")))
+            if headers.get("connection", "").lower() == "close":
+                self.close()
+            return int(head[0].split()[1]), headers
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            self.close()
+            return None
+
+    def close(self) -> None:
+        """Drop the connection; the next request opens a new one."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def run_register_storm(base_url: str, event_id: str, user_ids: List[str],
+                       writers: int) -> Tuple[int, List[int]]:
+    """Run register_storm over raw connections, in a separate process."""
+    url = httpx.URL(base_url)
+    path = f"/events/{event_id}/register"
+
+    def connect() -> PostRegistration:
+        connection = RawConnection(url.host, url.port or 80)
+
+        async def post(user_id: str) -> Optional[Tuple[int, Optional[str]]]:
+            response = await connection.post(path, json.dumps({"userId": user_id}).encode())
+            return None if response is None else (response[0], response[1].get("retry-after"))
+
+        return post
+
+    return asyncio.run(register_storm(connect, user_ids, writers))
+
+
+async def overload(client: httpx.AsyncClient, recorder: Recorder, scale: float,
+                   concurrency: int, prefix: str, rng: random.Random) -> List[str]:
+    """Readers keep polling while far more writers than the server can take register."""
+    users = [f"{prefix}ol-user-{i}" for i in range(int(2000 * scale))]
+    capacity = max(1, len(users) // 10)
+    event_id = f"{prefix}ol-event"
+    await seed_users(client, users)
+    await seed_event(client, event_id, capacity)
+    for i in range(20):
+        await seed_event(client, f"{prefix}ol-read-{i}", capacity, rng.sample(users, capacity))
+
+    rng.shuffle(users)
+    if isinstance(client._transport, httpx.ASGITransport) or client.base_url.scheme != "http":
+
+        def connect() -> PostRegistration:
+            async def post(user_id: str) -> Optional[Tuple[int, Optional[str]]]:
+                try:
+                    response = await client.post(f"/events/{event_id}/register", json={"userId": user_id})
+                except httpx.TransportError:
+                    return None
+                return response.status_code, response.headers.get("retry-after")
+
+            return post
+
+        storm = register_storm(connect, users, concurrency * 8)
+    else:
+        # Spawned, so the child does not inherit this process's event loop and connections
+        pool = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+        storm = asyncio.get_running_loop().run_in_executor(
+            pool, run_register_storm, str(client.base_url), event_id, users, concurrency * 8
+        )
+        storm.add_done_callback(lambda _: pool.shutdown(wait=False))
+    storm = asyncio.ensure_future(storm)
+
+    async def reader() -> None:
+        while not storm.done():
+            await recorder.send(client, "GET", f"/users/{rng.choice(users)}/events")
+            # In process, a request can complete without yielding to the storm
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(reader() for _ in range(max(1, concurrency // 4))))
+    shed, unexpected = await storm
+
+    body = (await client.get(f"/events/{event_id}/registrations")).json()
+    checks = []
+    if unexpected:
+        checks.append(f"{len(unexpected)} registrations failed, e.g. status {unexpected[0]}")
+    if len(body["registered"]) != capacity:
+        checks.append(f"registered {len(body['registered'])} != capacity {capacity}")
+    if len(body["registered"]) + len(body["waitlist"]) != len(users) - len(unexpected):
+        checks.append("registered + waitlist does not account for every user")
+    return checks
+
+
+SCENARIOS = {
+    "flash_sale": flash_sale,
+    "waitlist_churn": waitlist_churn,
+    "user_events_reads": user_events_reads,
+    "overload": overload,
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples in milliseconds."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1e3
+
+
+def free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Read a process's peak resident set size on Linux."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> ScenarioResult:
+    """Run one scenario against a fresh target and collect its results."""
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    server = None
+    prefix = ""
+    timeout = httpx.Timeout(60.0)
+    # Unbounded, so requests queue in the server rather than in the client's pool
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    if args.target == "inprocess":
+        import core.dependencies as dependencies
+        from domains.events.repository import EventRepository
+        from domains.users.repository import UserRepository
+        from main import app
+        dependencies.override_repositories(UserRepository(), EventRepository())
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://inprocess", timeout=timeout,
+            limits=limits
+        )
+    elif args.target == "uvicorn":
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+             "--log-level", "warning"],
+            env=dict(os.environ, STORAGE_BACKEND="memory")
+        )
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits)
+        for _ in range(100):
+            try:
+                await client.get("/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits)
+        prefix = f"{args.run_id}-"
+
+    try:
+        if args.target == "inprocess":
+            tracemalloc.start()
+        start = time.perf_counter()
+        checks = await SCENARIOS[name](client, recorder, args.scale, args.concurrency, prefix, rng)
+        seconds = time.perf_counter() - start
+        peak = None
+        if args.target == "inprocess":
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        elif server is not None:
+            peak = peak_rss_mb(server.pid)
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    samples = recorder.latencies
+    return ScenarioResult(
+        name=name,
+        requests=len(samples),
+        errors=recorder.errors,
+        seconds=seconds,
+        throughput=len(samples) / seconds,
+        p50_ms=percentile(samples, 50),
+        p90_ms=percentile(samples, 90),
+        p99_ms=percentile(samples, 99),
+        max_ms=max(samples) * 1e3,
+        peak_memory_mb=peak,
+        checks=checks,
+    )
+
+
+def compare(results: List[ScenarioResult], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Return regressions of throughput or p99 latency beyond tolerance."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.throughput < previous["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput:.0f} < baseline {previous['throughput']:.0f}"
+            )
+        if result.p99_ms > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p99 {result.p99_ms:.1f}ms > baseline {previous['p99_ms']:.1f}ms"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=["inprocess", "uvicorn", "url"], default="inprocess")
+    parser.add_argument("--base-url", help="deployment URL for --target url")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies users, events and requests")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before failing")
+    args = parser.parse_args()
+    if args.target == "url" and not args.base_url:
+        parser.error("--target url requires --base-url")
+    args.run_id = uuid.uuid4().hex[:8]
+
+    print(f"target={args.target} scale={args.scale} concurrency={args.concurrency}")
+    print(f"{'scenario':<18} {'reqs':>7} {'errs':>5} {'req/s':>8} {'p50':>8} {'p90':>8} "
+          f"{'p99':>8} {'max':>8} {'peak MB':>8}")
+    results = []
+    for name in args.scenarios:
+        result = asyncio.run(run_scenario(name, args))
+        results.append(result)
+        peak = "-" if result.peak_memory_mb is None else f"{result.peak_memory_mb:.1f}"
+        print(f"{name:<18} {result.requests:>7} {result.errors:>5} {result.throughput:>8.0f} "
+              f"{result.p50_ms:>8.2f} {result.p90_ms:>8.2f} {result.p99_ms:>8.2f} "
+              f"{result.max_ms:>8.2f} {peak:>8}")
+        for check in result.checks:
+            print(f"    check failed: {check}")
+
+    failed = any(result.checks for result in results)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as handle:
+            json.dump({
+                "target": args.target, "scale": args.scale, "concurrency": args.concurrency,
+                "results": {result.name: asdict(result) for result in results},
+            }, handle, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"    regression: {regression}")
+        failed = failed or bool(regressions)
+        if not regressions:
+            print(f"no regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Memory per user and per registration in the in-memory repositories.
+
+Creates users and registers them for events through the services, with
+every id decoded from a JSON payload as request bodies are, so each
+request carries its own copy of the id strings. Reports bytes traced by
+tracemalloc per user and per registration once the payloads are freed,
+and again after a waitlist position lookup on every list, which builds
+the lists' position trees. The change feed is bounded by its own
+settings rather than by state size, so it is shrunk out of the way.
+
+The same payloads are also loaded into a baseline of the plain layout
+the repositories used before: a User model per user, and registrant
+lists and reverse indexes holding each request's own copy of the id
+strings, with sequence numbers as a list of ints and a position tree
+per list. Each row is measured in a fresh tracemalloc session.
+
+Run from the backend directory:
+
+    python -m benchmarks.memory --users 20000 --events 200 --per-event 1000
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from core.change_feed import ChangeFeed
+from domains.events.models import Event
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+
+def traced() -> int:
+    """Get the bytes currently traced, after a collection."""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+class PlainRegistrants:
+    """Baseline registrant list: ids as given, int sequence numbers, a position tree from the start."""
+
+    def __init__(self):
+        self.users: List[Optional[str]] = []
+        self.seqs: List[int] = []
+        self.slots: Dict[str, int] = {}
+        self.removed: List[int] = [0]
+        self.pending: List[int] = []
+        self.next_seq = 0
+
+    def append(self, user_id: str) -> None:
+        self.slots[user_id] = len(self.users)
+        self.users.append(user_id)
+        self.seqs.append(self.next_seq)
+        self.next_seq += 1
+
+    def build_positions(self) -> None:
+        self.removed.extend([0] * (len(self.users) + 1 - len(self.removed)))
+
+
+def measure_current(
+    user_payload: str, registration_payloads: List[str], per_event: int, user_ids: List[str]
+) -> Tuple[int, int, int, int]:
+    """Load the payloads through the services; returns traced bytes after users, registrations and positions."""
+    tracemalloc.start()
+    user_repo = UserRepository()
+    event_repo = EventRepository()
+    registrations = RegistrationService(user_repo, event_repo, feed=ChangeFeed(buffer_size=1, max_topics=1))
+    events = EventService(event_repo)
+    start = traced()
+
+    for user in json.loads(user_payload):
+        user_repo.create(User(**user))
+    after_users = traced()
+
+    for i, payload in enumerate(registration_payloads):
+        events.create_event(Event(eventId=f"event-{i}", capacity=per_event // 2, hasWaitlist=True))
+        registrations.register_users(f"event-{i}", json.loads(payload))
+    after_registrations = traced()
+
+    for event in event_repo.list_all():
+        event.registered.position(next(iter(event.registered)))
+        event.waitlist.position(next(iter(event.waitlist)))
+    for user_id in user_ids:
+        registrations.get_user_events(user_id)
+    after_positions = traced()
+    tracemalloc.stop()
+    return start, after_users, after_registrations, after_positions
+
+
+def measure_baseline(
+    user_payload: str, registration_payloads: List[str], per_event: int
+) -> Tuple[int, int, int, int]:
+    """Load the payloads into the baseline layout; returns traced bytes as measure_current does."""
+    tracemalloc.start()
+    users: Dict[str, User] = {}
+    events: Dict[str, Tuple[Event, PlainRegistrants, PlainRegistrants]] = {}
+    registered_by_user: Dict[str, PlainRegistrants] = {}
+    waitlisted_by_user: Dict[str, PlainRegistrants] = {}
+    start = traced()
+
+    for user in json.loads(user_payload):
+        users[user["userId"]] = User(**user)
+    after_users = traced()
+
+    for i, payload in enumerate(registration_payloads):
+        event_id = f"event-{i}"
+        entry = events[event_id] = (
+            Event(eventId=event_id, capacity=per_event // 2, hasWaitlist=True), PlainRegistrants(), PlainRegistrants()
+        )
+        for position, user_id in enumerate(json.loads(payload)):
+            registered = position < per_event // 2
+            (entry[1] if registered else entry[2]).append(user_id)
+            index = registered_by_user if registered else waitlisted_by_user
+            index.setdefault(user_id, PlainRegistrants()).append(event_id)
+    after_registrations = traced()
+
+    for _, registered, waitlist in events.values():
+        registered.build_positions()
+        waitlist.build_positions()
+    after_positions = traced()
+    tracemalloc.stop()
+    return start, after_users, after_registrations, after_positions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--per-event", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    user_ids = [f"user-{i:07d}" for i in range(args.users)]
+    user_payload = json.dumps([{"userId": user_id, "name": f"User {user_id}"} for user_id in user_ids])
+    registration_payloads = [json.dumps(rng.sample(user_ids, args.per_event)) for _ in range(args.events)]
+
+    count = args.events * args.per_event
+    print(f"{args.users} users, {args.events} events x {args.per_event} registrations (half waitlisted)")
+    print(f"{'layout':>9} {'bytes/user':>11} {'bytes/registration':>19} {'with positions':>15} {'total MiB':>10}")
+    for name, (start, after_users, after_registrations, after_positions) in (
+        ("baseline", measure_baseline(user_payload, registration_payloads, args.per_event)),
+        ("current", measure_current(user_payload, registration_payloads, args.per_event, user_ids)),
+    ):
+        per_user = (after_users - start) / args.users
+        per_registration = (after_registrations - after_users) / count
+        with_positions = (after_positions - after_users) / count
+        print(f"{name:>9} {per_user:>11.0f} {per_registration:>19.0f} {with_positions:>15.0f} "
+              f"{(after_positions - start) / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Overhead of the metrics layer.
+
+Times a register/unregister request loop through the full app with
+metrics recording on and off (middleware plus service timers), then
+the raw cost of one histogram observation and of rendering /metrics.
+Runs in-process via Starlette's TestClient (needs httpx).
+
+Run from the backend directory:
+
+    python -m benchmarks.metrics --requests 5000 --events 1000
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+import core.dependencies as dependencies
+from core.metrics import metrics
+from domains.events.repository import EventRepository
+from domains.users.repository import UserRepository
+from main import app
+
+
+def request_loop(client: TestClient, requests: int) -> float:
+    """Register and unregister one user repeatedly, returning microseconds per request."""
+    start = time.perf_counter()
+    for _ in range(requests // 2):
+        client.post("/events/bench-event/registrations", json={"userId": "bench-user"})
+        client.delete("/events/bench-event/registrations/bench-user")
+    return (time.perf_counter() - start) / (requests // 2 * 2) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=1000, help="events counted by the gauges")
+    args = parser.parse_args()
+
+    dependencies.override_repositories(UserRepository(), EventRepository())
+    client = TestClient(app)
+    client.post("/users", json={"userId": "bench-user", "name": "Bench"})
+    for i in range(args.events - 1):
+        client.post("/events", json={"eventId": f"bench-{i}", "capacity": 10})
+    client.post("/events", json={"eventId": "bench-event", "capacity": 10})
+    request_loop(client, 200)
+
+    print(f"{args.requests} requests through the app")
+    metrics.enabled = False
+    disabled = request_loop(client, args.requests)
+    metrics.enabled = True
+    enabled = request_loop(client, args.requests)
+    print(f"  metrics off   {disabled:8.1f} us/request")
+    print(f"  metrics on    {enabled:8.1f} us/request  ({enabled - disabled:+.1f} us)")
+
+    observations = 100_000
+    start = time.perf_counter()
+    for _ in range(observations):
+        metrics.observe("http_request_duration_seconds", 0.003,
+                        route="/events/{eventId}/registrations", method="POST", status="201")
+    print(f"  observe()     {(time.perf_counter() - start) / observations * 1e6:8.2f} us")
+
+    start = time.perf_counter()
+    body = client.get("/metrics").text
+    print(f"  GET /metrics  {(time.perf_counter() - start) * 1e3:8.2f} ms "
+          f"({len(body)} bytes, {args.events} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Offer expiry: timer wheel against scanning every pending offer.
+
+First times the expiry timers alone. It schedules many outstanding
+offers with deadlines spread over the hold time, then advances a fake
+clock one tick at a time until all have expired. It does the same with
+a scan of every pending deadline per tick, the simple alternative. The
+wheel's cost per tick grows only with the offers that expire on it,
+while the scan's grows with all the offers pending. Both must expire
+the same offers on the same ticks.
+
+Then it runs offers through the services under a fake clock. Users
+register for events with offerHoldSeconds, some unregister so that
+waitlisted users are offered seats, some offers are confirmed, and
+the clock advances. It checks that no offer outlives its deadline,
+and that every pending offer holds a seat and has a timer.
+
+Run from the backend directory:
+
+    python -m benchmarks.offers --offers 1000 10000 100000 --hold 300 --events 500 --users 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+
+from core.change_feed import ChangeFeed
+from core.exceptions import BusinessRuleViolationError
+from domains.events.models import Event
+from domains.events.offers import OfferTimers
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+
+def deadlines(count: int, hold: float, seed: int):
+    """Offers with deadlines spread over the hold time, as (eventId, userId, deadline)."""
+    rng = random.Random(seed)
+    return [(f"event-{i % 1000}", f"user-{i}", rng.uniform(1, hold)) for i in range(count)]
+
+
+def time_wheel(offers, hold: float) -> tuple:
+    """Schedule and expire offers on the timer wheel; returns (schedule us, tick us, fired per tick)."""
+    now = [0.0]
+    timers = OfferTimers(clock=lambda: now[0], background=False)
+    fired = []
+    timers.set_handler(lambda event_id, user_id: fired.append((event_id, user_id)))
+    start = time.perf_counter()
+    for event_id, user_id, deadline in offers:
+        timers.schedule(event_id, user_id, deadline)
+    scheduled = time.perf_counter() - start
+    per_tick = []
+    ticks = int(hold) + 1
+    start = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        now[0] = tick
+        timers.expire_due()
+        per_tick.append(sorted(fired))
+        fired.clear()
+    elapsed = time.perf_counter() - start
+    return scheduled / len(offers) * 1e6, elapsed / ticks * 1e6, per_tick
+
+
+def time_scan(offers, hold: float) -> tuple:
+    """Expire offers by scanning every pending deadline each tick; returns (tick us, fired per tick)."""
+    pending = {(event_id, user_id): deadline for event_id, user_id, deadline in offers}
+    per_tick = []
+    ticks = int(hold) + 1
+    start = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        due = [key for key, deadline in pending.items() if deadline <= tick]
+        for key in due:
+            del pending[key]
+        per_tick.append(sorted(due))
+    elapsed = time.perf_counter() - start
+    return elapsed / ticks * 1e6, per_tick
+
+
+def timers(sizes, hold: float, seed: int) -> bool:
+    """Compare the wheel and the scan for each number of outstanding offers; True if they agreed."""
+    ok = True
+    print(f"hold={hold:g}s tick=1s")
+    print(f"{'offers':>8} {'fired/tick':>11} {'schedule us':>12} {'wheel tick us':>14} {'scan tick us':>13} {'match':>6}")
+    for size in sizes:
+        offers = deadlines(size, hold, seed)
+        schedule_us, wheel_us, wheel_fired = time_wheel(offers, hold)
+        scan_us, scan_fired = time_scan(offers, hold)
+        match = wheel_fired == scan_fired
+        ok = ok and match
+        print(f"{size:>8} {size / (int(hold) + 1):>11.0f} {schedule_us:>12.2f} {wheel_us:>14.1f} {scan_us:>13.1f} {'yes' if match else 'NO':>6}")
+    return ok
+
+
+def services(num_events: int, num_users: int, hold: int, steps: int, seed: int) -> bool:
+    """Run registrations and offers through the services under a fake clock; True if consistent."""
+    rng = random.Random(seed)
+    now = [0.0]
+    offers = OfferTimers(clock=lambda: now[0], background=False)
+    feed = ChangeFeed(buffer_size=1, max_topics=1)
+    kinds: Counter = Counter()
+    feed.add_listener(lambda topic, kind, body: topic.startswith("events/") and kinds.update((kind,)))
+    user_repo = UserRepository()
+    event_repo = EventRepository()
+    for i in range(num_users):
+        user_repo.create(User(userId=f"user-{i}", name=f"user-{i}"))
+    events = EventService(event_repo, feed=feed, offers=offers)
+    registrations = RegistrationService(user_repo, event_repo, feed=feed, offers=offers)
+    event_ids = [f"event-{i}" for i in range(num_events)]
+    for event_id in event_ids:
+        events.create_event(Event(
+            eventId=event_id, capacity=rng.randint(1, 20), hasWaitlist=True, offerHoldSeconds=hold
+        ))
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        event_id = rng.choice(event_ids)
+        roll = rng.random()
+        try:
+            if roll < 0.5:
+                registrations.register_user(event_id, f"user-{rng.randrange(num_users)}")
+            elif roll < 0.8:
+                registrations.unregister_user(event_id, f"user-{rng.randrange(num_users)}")
+            elif roll < 0.9:
+                pending = [user_id for e, user_id, _ in event_repo.pending_offers() if e == event_id]
+                if pending:
+                    registrations.confirm_offer(event_id, rng.choice(pending))
+            else:
+                now[0] += rng.random() * hold / 10
+                offers.expire_due()
+        except BusinessRuleViolationError:
+            pass
+    now[0] += hold + 1
+    offers.expire_due()
+    elapsed = time.perf_counter() - start
+
+    ok = True
+    pending = event_repo.pending_offers()
+    for event_id, user_id, deadline in pending:
+        # Only offers made while expiring the last ones may remain, and they are not yet due
+        if deadline <= now[0] or user_id not in event_repo.get(event_id).registered:
+            ok = False
+    ok = ok and len(offers) == len(pending)
+    # Every offer was confirmed, expired, given up by unregistering, taken back by a demotion, or is pending
+    settled = kinds["confirmed"] + kinds["offer_expired"] + len(pending)
+    ok = ok and settled <= kinds["offered"]
+    print(f"\nevents={num_events} users={num_users} hold={hold}s steps={steps} in {elapsed:.2f}s")
+    print("  " + " ".join(f"{kind}={kinds[kind]}" for kind in ("offered", "confirmed", "offer_expired")))
+    print(f"  pending={len(pending)} consistent={'yes' if ok else 'NO'}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, nargs="*", default=[1_000, 10_000, 100_000],
+                        help="outstanding offers to time expiry for")
+    parser.add_argument("--hold", type=int, default=300, help="offer hold time in seconds")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--steps", type=int, default=100_000, help="service operations to run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ok = timers(args.offers, args.hold, args.seed)
+    ok = services(args.events, args.users, args.hold, args.steps, args.seed) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
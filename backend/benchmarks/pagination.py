@@ -0,0 +1,87 @@
+"""Benchmark for paginated registration reads and waitlist positions.
+
+Fills one large event and compares the full GET /events/{eventId}/registrations
+response with a single page, plus waitlist position lookups against a
+linear list.index scan. Drives the app in-process with Starlette's
+TestClient (needs httpx).
+
+Run from the backend directory:
+
+    python -m benchmarks.pagination --registrants 50000 --limit 100
+"""
+
+import argparse
+import random
+import time
+
+from fastapi.testclient import TestClient
+
+import core.dependencies as dependencies
+from domains.events.models import Event
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+from main import app
+
+
+def time_get(client: TestClient, url: str, params: dict, rounds: int):
+    """Return mean seconds per GET and the response size in bytes."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        response = client.get(url, params=params)
+    return (time.perf_counter() - start) / rounds, len(response.content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registrants", type=int, default=50_000)
+    parser.add_argument("--capacity", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+
+    user_repo, event_repo = UserRepository(), EventRepository()
+    dependencies.override_repositories(user_repo, event_repo)
+    user_ids = [f"user-{i}" for i in range(args.registrants)]
+    for user_id in user_ids:
+        user_repo.create(User(userId=user_id, name=user_id))
+    event_id = "big-event"
+    EventService(event_repo).create_event(
+        Event(eventId=event_id, capacity=args.capacity, waitlistEnabled=True)
+    )
+    RegistrationService(user_repo, event_repo).register_users(event_id, user_ids)
+
+    client = TestClient(app)
+    url = f"/events/{event_id}/registrations"
+    full_time, full_bytes = time_get(client, url, {}, args.rounds)
+    page_time, page_bytes = time_get(client, url, {"limit": args.limit}, args.rounds)
+    print(f"registrants={args.registrants} capacity={args.capacity} limit={args.limit}")
+    print(f"  full response  {full_time * 1e3:9.2f} ms  {full_bytes:>10} bytes")
+    print(f"  one page       {page_time * 1e3:9.2f} ms  {page_bytes:>10} bytes")
+
+    event = event_repo.get(event_id)
+    waitlist = list(event.waitlist)
+    probes = random.Random(42).sample(waitlist, min(args.lookups, len(waitlist)))
+    # Churn the front of the waitlist so lookups cover removed slots
+    for user_id in waitlist[:len(waitlist) // 10]:
+        event.waitlist.remove(user_id)
+    probes = [user_id for user_id in probes if user_id in event.waitlist]
+    snapshot = list(event.waitlist)
+
+    start = time.perf_counter()
+    for user_id in probes:
+        snapshot.index(user_id)
+    scan = (time.perf_counter() - start) / len(probes)
+    start = time.perf_counter()
+    for user_id in probes:
+        event.waitlist.position(user_id)
+    indexed = (time.perf_counter() - start) / len(probes)
+    print(f"  position scan  {scan * 1e6:9.2f} us/lookup")
+    print(f"  position tree  {indexed * 1e6:9.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
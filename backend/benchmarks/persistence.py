@@ -0,0 +1,162 @@
+"""Benchmarks for write-ahead log and snapshot persistence.
+
+Recovery: builds states with the given numbers of registrations (1000
+per event, each user registered for 20 events), then times restoring
+them two ways. The first replays a log of JSON event records. The
+second loads a memory-mapped snapshot. The snapshot size and write time
+are reported too.
+
+Write throughput: registers users through RegistrationService over the
+durable repositories with each fsync policy, and over the plain
+in-memory repositories for reference. Point --dir at the disk you
+deploy on; fsync on tmpfs is free.
+
+Run from the backend directory:
+
+    python -m benchmarks.persistence --registrations 100000 1000000
+    python -m benchmarks.persistence --skip-recovery --writes 20000 --threads 1 8 --dir .
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.locking import EventLocks
+from core.persistence import DurableStore
+from domains.events.durable_repository import DurableEventRepository
+from domains.events.models import Event
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.registrations.service import RegistrationService
+from domains.users.durable_repository import DurableUserRepository
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+PER_EVENT = 1000
+EVENTS_PER_USER = 20
+
+
+def open_store(directory: str, fsync: str = "none"):
+    """Open a store and its repositories, returning them with the recovery stats."""
+    store = DurableStore(directory, fsync=fsync, snapshot_every=10**12)
+    users = DurableUserRepository(store)
+    events = DurableEventRepository(store)
+    stats = store.recover()
+    return store, users, events, stats
+
+
+def build_state(directory: str, registrations: int) -> None:
+    """Log a state with the given number of registrations, one record per user and event."""
+    store, users, events, _ = open_store(directory)
+    user_count = max(PER_EVENT, registrations // EVENTS_PER_USER)
+    for i in range(user_count):
+        users.create(User.model_construct(userId=f"user-{i:07d}", name=f"User {i}"))
+    for e in range(registrations // PER_EVENT):
+        first = e * PER_EVENT // EVENTS_PER_USER
+        registered = RegistrantList(
+            f"user-{(first + k) % user_count:07d}" for k in range(PER_EVENT)
+        )
+        events.create(Event(eventId=f"event-{e:06d}", capacity=PER_EVENT, registered=registered))
+    store.close()
+
+
+def directory_size(directory: str, prefix: str) -> int:
+    """Total size of files in a directory starting with prefix."""
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory) if name.startswith(prefix)
+    )
+
+
+def bench_recovery(base: str, registrations: int) -> None:
+    """Compare log replay and snapshot restore for one state size."""
+    directory = tempfile.mkdtemp(prefix="recovery-", dir=base)
+    try:
+        build_state(directory, registrations)
+        log_bytes = directory_size(directory, "wal-")
+
+        start = time.perf_counter()
+        store, _, events, stats = open_store(directory)
+        replay = time.perf_counter() - start
+        assert sum(len(event.registered) for event in events.list_all()) == registrations
+
+        start = time.perf_counter()
+        store.snapshot()
+        write = time.perf_counter() - start
+        store.close()
+        snapshot_bytes = directory_size(directory, "snapshot-")
+
+        start = time.perf_counter()
+        store, _, events, stats = open_store(directory)
+        restore = time.perf_counter() - start
+        store.close()
+        assert stats["replayed"] == 0
+        assert sum(len(event.registered) for event in events.list_all()) == registrations
+
+        print(f"{registrations:>10} {log_bytes / 2**20:>9.1f} {replay:>9.2f} "
+              f"{snapshot_bytes / 2**20:>9.1f} {write:>9.2f} {restore:>9.2f} {replay / restore:>8.1f}x")
+    finally:
+        shutil.rmtree(directory)
+
+
+def bench_writes(base: str, writes: int, threads: int, fsync: str) -> float:
+    """Register `writes` users across events, returning registrations per second."""
+    directory = tempfile.mkdtemp(prefix="writes-", dir=base)
+    try:
+        if fsync == "memory":
+            store, users, events = None, UserRepository(), EventRepository()
+        else:
+            store, users, events, _ = open_store(directory, fsync)
+        for i in range(writes):
+            users._users[f"user-{i}"] = "x"
+        event_count = max(1, writes // PER_EVENT)
+        for e in range(event_count):
+            events.create(Event(eventId=f"event-{e}", capacity=PER_EVENT, hasWaitlist=True))
+        service = RegistrationService(users, events, EventLocks())
+
+        def register(worker: int) -> None:
+            for i in range(worker, writes, threads):
+                service.register_user(f"event-{i % event_count}", f"user-{i}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            for future in [pool.submit(register, worker) for worker in range(threads)]:
+                future.result()
+        if store is not None:
+            store.close()
+        return writes / (time.perf_counter() - start)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registrations", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--writes", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--policies", nargs="+", default=["memory", "none", "interval", "always"])
+    parser.add_argument("--dir", default=None, help="directory for data files (default: system temp)")
+    parser.add_argument("--skip-recovery", action="store_true")
+    parser.add_argument("--skip-writes", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_recovery:
+        print("Recovery (log replays JSON event records; snapshot is memory-mapped arrays)")
+        print(f"{'regs':>10} {'log MB':>9} {'replay s':>9} {'snap MB':>9} {'write s':>9} "
+              f"{'restore s':>9} {'speedup':>9}")
+        for registrations in args.registrations:
+            bench_recovery(args.dir, registrations)
+
+    if not args.skip_writes:
+        print(f"\nWrite throughput, {args.writes} registrations (registrations/s)")
+        print(f"{'policy':>10}" + "".join(f"{f'{t} thr':>12}" for t in args.threads))
+        for policy in args.policies:
+            rates = [bench_writes(args.dir, args.writes, t, policy) for t in args.threads]
+            print(f"{policy:>10}" + "".join(f"{rate:>12.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark for sparse fieldsets on GET /users/{userId}/events.
+
+A user is registered for many events that each have many registrants.
+Compares every field (fields=*, the old response) with the default
+list projection, which leaves out the registrant arrays, and with
+fields=name,date. Reports the response size and the milliseconds per
+request with the body cache disabled, so every request re-serializes.
+Also times serializing the page alone, the full model serializer
+against the compiled projection. Requests ask for identity encoding.
+
+Runs in-process via Starlette's TestClient (needs httpx).
+
+Run from the backend directory:
+
+    python -m benchmarks.projections --user-events 100 --registrants 1000 --requests 200
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+from pydantic_core import to_json
+
+import core.dependencies as dependencies
+import core.http_cache as http_cache
+from domains.events.models import Event
+from domains.events.projections import parse_fields, render_page
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.users.models import User
+from domains.users.repository import UserRepository
+from main import app
+
+PATH = "/users/user-0/events"
+
+
+def per_call(func, repeat: int) -> float:
+    """Time a call, returning milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-events", type=int, default=100)
+    parser.add_argument("--registrants", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    users, events = UserRepository(), EventRepository()
+    for i in range(args.registrants):
+        users.create(User(userId=f"user-{i}", name=f"User {i}"))
+    half = args.registrants // 2
+    for e in range(args.user_events):
+        events.create(Event(
+            eventId=f"event-{e}",
+            title=f"Event {e}",
+            date=f"2024-06-{e % 28 + 1:02d}",
+            location="Main hall",
+            capacity=half,
+            hasWaitlist=True,
+            registered=RegistrantList(f"user-{i}" for i in range(half)),
+            waitlist=RegistrantList(f"user-{i}" for i in range(half, args.registrants)),
+        ))
+    dependencies.override_repositories(users, events)
+    http_cache.response_cache = http_cache.ResponseCache(max_entries=0)
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "identity"}
+    page = {"events": events.list_registered_for_user("user-0")}
+
+    print(f"user registered for {args.user_events} events of {args.registrants} registrants")
+    print(f"{'fields':<12} {'bytes':>10} {'ms/request':>11} {'ms/serialize':>13}")
+    for label, fields in (("*", "*"), ("default", None), ("name,date", "name,date")):
+        params = {} if fields is None else {"fields": fields}
+        size = len(client.get(PATH, params=params, headers=headers).content)
+        request_ms = per_call(lambda: client.get(PATH, params=params, headers=headers), args.requests)
+        projection = parse_fields(fields)
+        if fields == "*":
+            # What the route did before projections: the model's own serializer
+            serialize_ms = per_call(lambda: to_json(page), args.requests)
+        else:
+            serialize_ms = per_call(lambda: render_page(page, projection), args.requests)
+        print(f"{label:<12} {size:>10} {request_ms:>11.3f} {serialize_ms:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
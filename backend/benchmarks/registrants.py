@@ -0,0 +1,55 @@
+"""Benchmark for registrant collection operations.
+
+Compares plain lists against RegistrantList for the operations
+RegistrationService performs: membership checks, removal and FIFO
+promotion from the front of the waitlist.
+
+Run from the backend directory:
+
+    python -m benchmarks.registrants --sizes 1000 10000 50000
+"""
+
+import argparse
+import random
+import time
+
+from domains.events.registrants import RegistrantList
+
+
+def run_ops(collection, user_ids, probes, removals, pops, popleft) -> float:
+    """Time a membership/remove/promote mix, returns seconds."""
+    start = time.perf_counter()
+    for user_id in probes:
+        user_id in collection
+    for user_id in removals:
+        collection.remove(user_id)
+    for _ in range(pops):
+        popleft(collection)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--ops", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'list (ms)':>12} {'registrants (ms)':>18} {'speedup':>9}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        user_ids = [f"user-{i}" for i in range(size)]
+        ops = min(args.ops, size // 3)
+        probes = rng.sample(user_ids, ops)
+        removals = rng.sample(user_ids, ops)
+
+        as_list = run_ops(list(user_ids), user_ids, probes, removals, ops,
+                          lambda c: c.pop(0))
+        as_registrants = run_ops(RegistrantList(user_ids), user_ids, probes, removals, ops,
+                                 lambda c: c.popleft())
+        print(f"{size:>8} {as_list * 1e3:>12.2f} {as_registrants * 1e3:>18.2f} "
+              f"{as_list / as_registrants:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Latency of filtered event listing with secondary indexes versus a full scan.
+
+Fills an in-memory repository with events spread over a year, across
+locations, organizers and statuses, with a share of them full. Each
+filter mix is then queried for its first page through the search
+indexes and through a baseline that scans, filters and sorts every
+event, reporting the median of each. Finally it times indexing further
+events with random dates, which a flat sorted list makes grow with the
+number of events already indexed.
+
+Run from the backend directory:
+
+    python -m benchmarks.search --events 1000 10000 100000 --queries 50
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from domains.events.models import Event, EventFilters
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.events.search_index import _matches
+
+
+FILTER_MIXES: Dict[str, EventFilters] = {
+    "unfiltered": EventFilters(),
+    "one week": EventFilters(dateFrom="2025-06-01", dateTo="2025-06-07"),
+    "location": EventFilters(location="city-7"),
+    "organizer+status": EventFilters(organizer="org-3", status="published"),
+    "available, one month": EventFilters(dateFrom="2025-03-01", dateTo="2025-03-31", hasAvailableSpots=True),
+    "full, one month": EventFilters(dateFrom="2025-03-01", dateTo="2025-03-31", hasAvailableSpots=False),
+    "rare combination": EventFilters(location="city-1", organizer="org-2", status="cancelled"),
+}
+
+
+def generate(start: int, count: int, rng: random.Random) -> List[Event]:
+    """Generate count events numbered from start."""
+    events = []
+    for i in range(start, start + count):
+        capacity = rng.randint(1, 20)
+        # About a quarter of events are full
+        seats = capacity if rng.random() < 0.25 else rng.randint(0, capacity - 1)
+        events.append(Event(
+            eventId=f"event-{i}",
+            date=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(8, 21):02d}:00:00",
+            location=f"city-{rng.randrange(50)}",
+            organizer=f"org-{rng.randrange(200)}",
+            status=rng.choice(("published", "published", "published", "draft", "cancelled")),
+            capacity=capacity,
+            registered=RegistrantList(f"user-{k}" for k in range(seats)),
+        ))
+    return events
+
+
+def build(count: int, seed: int) -> EventRepository:
+    """Create a repository holding count generated events."""
+    repository = EventRepository()
+    for event in generate(0, count, random.Random(seed)):
+        repository.create(event)
+    return repository
+
+
+def insert_us(repository: EventRepository, count: int, seed: int) -> float:
+    """Index count more events with random dates, returning microseconds per event."""
+    events = generate(len(repository.list_all()), count, random.Random(seed + 1))
+    start = time.perf_counter()
+    for event in events:
+        repository._search.add(event)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def full_scan(repository: EventRepository, filters: EventFilters, limit: int) -> List[Event]:
+    """Baseline: filter and sort every event, then take the first page."""
+    matching = [
+        event for event in repository.list_all()
+        if _matches(event, filters)
+        and (filters.dateFrom is None or (event.date or "") >= filters.dateFrom)
+        and (filters.dateTo is None or (event.date or "") <= filters.dateTo + "\U0010ffff")
+        and not ((filters.dateFrom or filters.dateTo) and event.date is None)
+    ]
+    matching.sort(key=lambda event: (event.date or "", event.eventId))
+    return matching[:limit]
+
+
+def median_ms(query: Callable[[], List[Event]], queries: int) -> float:
+    """Run a query repeatedly, returning the median latency in milliseconds."""
+    samples = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        query()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--inserts", type=int, default=2000, help="events indexed for the insert timing")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for count in args.events:
+        start = time.perf_counter()
+        repository = build(count, args.seed)
+        print(f"\n{count} events (built in {time.perf_counter() - start:.1f}s), p50 ms for the first {args.limit}")
+        print(f"{'filters':<24} {'matches':>8} {'indexed':>9} {'scan':>9} {'speedup':>8}")
+        for label, filters in FILTER_MIXES.items():
+            indexed_page, _ = repository.search(filters, None, args.limit)
+            scanned_page = full_scan(repository, filters, args.limit)
+            assert [e.eventId for e in indexed_page] == [e.eventId for e in scanned_page], label
+            indexed = median_ms(lambda: repository.search(filters, None, args.limit), args.queries)
+            scan = median_ms(lambda: full_scan(repository, filters, args.limit), max(1, args.queries // 10))
+            print(f"{label:<24} {len(indexed_page):>8} {indexed:>9.3f} {scan:>9.2f} {scan / indexed:>7.0f}x")
+        print(f"indexing one more event: {insert_us(repository, args.inserts, args.seed):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
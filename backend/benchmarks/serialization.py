@@ -0,0 +1,139 @@
+"""Microbenchmarks for the response serialization path.
+
+Compares FastAPI's default handling of routes annotated `-> Event` /
+`-> dict` (response validation plus jsonable_encoder) with returning a
+FastJSONResponse, on the event-creation and registrations-listing
+endpoints. Both variants share the same services and run in-process via
+Starlette's TestClient (needs httpx), alongside a comparison of Event
+construction through the legacy custom __init__ and the schema-level
+validator.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --requests 2000 --registrants 5000
+"""
+
+import argparse
+import time
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from core.responses import FastJSONResponse
+from domains.events.models import Event
+from domains.events.registrants import RegistrantList
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+
+class LegacyEvent(BaseModel):
+    """Event model with the field mapping done in a custom __init__."""
+    eventId: str
+    title: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[str] = None
+    location: Optional[str] = None
+    capacity: int
+    organizer: Optional[str] = None
+    status: Optional[str] = None
+    waitlistEnabled: Optional[bool] = None
+    hasWaitlist: Optional[bool] = None
+    registered: RegistrantList = Field(default_factory=RegistrantList)
+    waitlist: RegistrantList = Field(default_factory=RegistrantList)
+
+    def __init__(self, **data):
+        if 'title' in data and data['title']:
+            data['name'] = data['title']
+        if 'waitlistEnabled' in data:
+            data['hasWaitlist'] = data['waitlistEnabled']
+        elif 'hasWaitlist' not in data:
+            data['hasWaitlist'] = False
+        super().__init__(**data)
+
+
+def build_app(fast: bool, service: EventService) -> FastAPI:
+    """Build an app exposing the two endpoints with one serialization path."""
+    app = FastAPI()
+    if fast:
+        @app.post("/events", status_code=201, response_model=Event)
+        def create_event(event: Event) -> FastJSONResponse:
+            return FastJSONResponse(service.create_event(event), status_code=201)
+
+        @app.get("/events/{eventId}/registrations")
+        def get_event_registrations(eventId: str) -> FastJSONResponse:
+            return FastJSONResponse(service.get_event_registrations(eventId))
+    else:
+        @app.post("/events", status_code=201)
+        def create_event(event: Event) -> Event:
+            return service.create_event(event)
+
+        @app.get("/events/{eventId}/registrations")
+        def get_event_registrations(eventId: str) -> dict:
+            return service.get_event_registrations(eventId)
+    return app
+
+
+def time_requests(send, count: int) -> float:
+    """Return mean seconds per request."""
+    start = time.perf_counter()
+    for i in range(count):
+        send(i)
+    return (time.perf_counter() - start) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--registrants", type=int, default=5_000)
+    parser.add_argument("--constructions", type=int, default=50_000)
+    args = parser.parse_args()
+
+    payload = {"eventId": "e", "title": "Launch", "description": "x" * 200,
+               "capacity": 100, "waitlistEnabled": True}
+    for model in (LegacyEvent, Event):
+        start = time.perf_counter()
+        for _ in range(args.constructions):
+            model.model_validate(payload)
+        per_call = (time.perf_counter() - start) / args.constructions
+        print(f"  {model.__name__:<12} construct   {per_call * 1e6:8.2f} us")
+
+    for fast in (False, True):
+        user_repo, event_repo = UserRepository(), EventRepository()
+        event_service = EventService(event_repo)
+        client = TestClient(build_app(fast, event_service))
+        label = "fast" if fast else "default"
+
+        create = time_requests(
+            lambda i: client.post("/events", json={**payload, "eventId": f"e{i}"}), args.requests
+        )
+
+        user_ids = [f"user-{i}" for i in range(args.registrants)]
+        for user_id in user_ids:
+            user_repo.create(User(userId=user_id, name=user_id))
+        RegistrationService(user_repo, event_repo).register_users("e0", user_ids)
+        reads = max(1, args.requests // 20)
+        listing = time_requests(lambda i: client.get("/events/e0/registrations"), reads)
+
+        print(f"  {label:<12} POST /events                     {create * 1e6:9.1f} us")
+        print(f"  {label:<12} GET  /events/{{id}}/registrations  {listing * 1e6:9.1f} us "
+              f"({args.registrants} registrants)")
+
+    # Rendering alone, without the HTTP round trip: a user's schedule of 50 events
+    events = {"events": event_repo.list_all()[:50]}
+    renders = max(1, args.requests // 10)
+    default = time_requests(lambda i: JSONResponse(jsonable_encoder(events)).body, renders)
+    fast = time_requests(lambda i: FastJSONResponse(events).body, renders)
+    print(f"  render {{'events': [50 x Event]}}  default {default * 1e6:9.1f} us  "
+          f"fast {fast * 1e6:9.1f} us  ({default / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Cold-start benchmark for the Lambda handler.
+
+Each run starts a fresh interpreter, imports main, then sends API
+Gateway events through main.handler, the same path Lambda takes. It
+reports import time, first and second request latency, and the
+cumulative `python -X importtime` figure for main and its heaviest
+dependencies.
+
+With --storage dynamodb only the import is timed (requests would need
+real tables), which shows what lazy startup saves by not loading boto3
+and building a client during init.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 10 --modes lazy eager
+    python -m benchmarks.startup --storage dynamodb
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# Executed in a fresh interpreter for every run
+_CHILD = r"""
+import json, os, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+if os.environ["STORAGE_BACKEND"] != "memory":
+    print(json.dumps({"import": imported - start}))
+    raise SystemExit
+
+def event(method, path, body=None):
+    return {
+        "resource": "/{proxy+}", "path": path, "httpMethod": method,
+        "headers": {"content-type": "application/json"},
+        "multiValueHeaders": {"content-type": ["application/json"]},
+        "queryStringParameters": None, "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")}, "stageVariables": None,
+        "requestContext": {"resourcePath": "/{proxy+}", "httpMethod": method,
+                           "path": path, "stage": "prod",
+                           "identity": {"sourceIp": "127.0.0.1"}},
+        "body": None if body is None else json.dumps(body), "isBase64Encoded": False,
+    }
+
+latencies = []
+for request in (event("POST", "/users", {"userId": "u1", "name": "U"}),
+                event("GET", "/users/u1/events")):
+    before = time.perf_counter()
+    response = main.handler(request, None)
+    assert response["statusCode"] < 300, response
+    latencies.append(time.perf_counter() - before)
+print(json.dumps({"import": imported - start, "first": latencies[0], "second": latencies[1]}))
+"""
+
+# Modules whose cumulative import time is reported
+_TRACKED = ("main", "fastapi", "pydantic", "mangum", "boto3",
+            "domains.users.routes", "domains.events.routes", "domains.registrations.routes")
+
+
+def child_env(mode: str, storage: str) -> Dict[str, str]:
+    """Environment for a child interpreter."""
+    env = dict(os.environ, STARTUP_MODE=mode, STORAGE_BACKEND=storage)
+    if storage == "dynamodb":
+        # Placeholders so an eager start can build its client offline
+        env.setdefault("DYNAMODB_TABLE_NAME", "bench-events")
+        env.setdefault("USERS_TABLE_NAME", "bench-users")
+        env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    return env
+
+
+def run_child(mode: str, storage: str) -> Dict[str, float]:
+    """Time import and first requests in a fresh interpreter."""
+    env = child_env(mode, storage)
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(mode: str, storage: str) -> Dict[str, float]:
+    """Return cumulative import seconds for tracked modules."""
+    env = child_env(mode, storage)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, check=True, capture_output=True, text=True
+    ).stderr
+    profile = {}
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$", line.rstrip())
+        if match and match.group(2) in _TRACKED:
+            profile[match.group(2)] = int(match.group(1)) / 1e6
+    return profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=["lazy", "eager"], default=["lazy", "eager"])
+    parser.add_argument("--storage", choices=["memory", "dynamodb"], default="memory")
+    args = parser.parse_args()
+
+    # Compile bytecode once so runs measure warm-cache imports
+    run_child("lazy", args.storage)
+    for mode in args.modes:
+        samples: Dict[str, List[float]] = {}
+        for _ in range(args.runs):
+            for key, value in run_child(mode, args.storage).items():
+                samples.setdefault(key, []).append(value)
+        medians = {key: statistics.median(values) * 1e3 for key, values in samples.items()}
+        print(f"STARTUP_MODE={mode} STORAGE_BACKEND={args.storage} (median of {args.runs} runs)")
+        print(f"  import main     {medians['import']:8.1f} ms")
+        if "first" in medians:
+            print(f"  first request   {medians['first']:8.1f} ms")
+            print(f"  second request  {medians['second']:8.1f} ms")
+            print(f"  init + first    {medians['import'] + medians['first']:8.1f} ms")
+        print("  -X importtime (cumulative):")
+        for module, seconds in sorted(import_profile(mode, args.storage).items(), key=lambda kv: -kv[1]):
+            print(f"    {module:<30} {seconds * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
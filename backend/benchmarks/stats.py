@@ -0,0 +1,220 @@
+"""Registration statistics: incremental aggregates against a full recompute.
+
+Runs a random mix of registrations, unregistrations and capacity
+changes from a thread pool, in rounds. After each round it checks the
+statistics the repository maintains incrementally against ones
+recomputed from every event's lists, with the fullest events found by
+sorting, and checks the change counts against the services' results.
+Before that, it replays a fresh app's first requests, an import and an
+unregistration that promotes, before anything builds the event
+service, and checks that GET /stats still counts those changes.
+Then it times reading the statistics both ways for growing numbers of
+events; the incremental read should stay flat as the recompute grows.
+
+Run from the backend directory:
+
+    python -m benchmarks.stats --events 2000 --users 5000 --ops 200000 --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from core import dependencies
+from core.change_feed import ChangeFeed
+from core.exceptions import BusinessRuleViolationError
+from domains.events.models import Event
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.events.stats import CHANGE_KINDS, RegistrationStats
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+# The admin routes are only mounted when opted in
+os.environ.setdefault("ADMIN_API", "on")
+from main import app  # noqa: E402
+
+
+def build(num_events: int, num_users: int, seed: int):
+    """Create users and events of mixed capacity, most with waitlists."""
+    rng = random.Random(seed)
+    user_repo = UserRepository()
+    event_repo = EventRepository()
+    for i in range(num_users):
+        user_repo.create(User(userId=f"user-{i}", name=f"user-{i}"))
+    feed = ChangeFeed(buffer_size=1, max_topics=1)
+    events = EventService(event_repo, feed=feed)
+    for i in range(num_events):
+        events.create_event(Event(
+            eventId=f"event-{i}", capacity=rng.randint(1, 50), hasWaitlist=rng.random() < 0.8
+        ))
+    return event_repo, events, RegistrationService(user_repo, event_repo, feed=feed)
+
+
+def worker(events: EventService, registrations: RegistrationService, event_ids, user_ids,
+           ops: int, seed: int, tally: Counter, lock: threading.Lock) -> None:
+    """Issue random changes, tallying the changes their results report."""
+    rng = random.Random(seed)
+    changes: Counter = Counter()
+    for _ in range(ops):
+        event_id = rng.choice(event_ids)
+        roll = rng.random()
+        try:
+            if roll < 0.6:
+                changes[registrations.register_user(event_id, rng.choice(user_ids))["status"]] += 1
+            elif roll < 0.95:
+                result = registrations.unregister_user(event_id, rng.choice(user_ids))
+                if "removed from waitlist" in result["message"]:
+                    changes["left_waitlist"] += 1
+                else:
+                    changes["unregistered"] += 1
+                    changes["promoted"] += "promoted" in result
+            else:
+                result = events.update_capacity(event_id, rng.randint(1, 50))
+                changes["promoted"] += len(result["promoted"])
+                changes["demoted"] += len(result["demoted"])
+        except BusinessRuleViolationError:
+            pass
+    with lock:
+        tally.update(changes)
+
+
+def recompute(event_repo: EventRepository, top: int) -> dict:
+    """Compute the statistics from scratch from every event's lists."""
+    events = event_repo.list_all()
+    per_user: Counter = Counter()
+    for event in events:
+        per_user.update(event.registered)
+    stats = RegistrationStats.from_counts(
+        ((event.eventId, event.capacity, len(event.registered), len(event.waitlist)) for event in events),
+        per_user.values(),
+    ).summary(0)
+    fullest = sorted(
+        events, key=lambda event: (-len(event.registered) / event.capacity, -len(event.waitlist), event.eventId)
+    )[:top]
+    stats["fullest"] = [
+        {
+            "eventId": event.eventId,
+            "capacity": event.capacity,
+            "registeredCount": len(event.registered),
+            "waitlistCount": len(event.waitlist),
+            "fillRate": len(event.registered) / event.capacity,
+        }
+        for event in fullest
+    ]
+    return stats
+
+
+def startup_check() -> bool:
+    """Make changes through a fresh app before GET /stats first builds the event service; True if counted.
+
+    Must run before anything else publishes on the app's change feed,
+    since its counts are cumulative.
+    """
+    event_repo = EventRepository()
+    dependencies.override_repositories(UserRepository(), event_repo)
+    client = TestClient(app)
+    for user_id in ("a", "b"):
+        client.post("/users", json={"userId": user_id, "name": user_id})
+    client.post("/admin/import", content=json.dumps({
+        "type": "event", "eventId": "e1", "name": "e1", "capacity": 1, "hasWaitlist": True,
+        "registered": ["a"], "waitlist": ["b"],
+    }))
+    client.delete("/events/e1/registrations/a")
+    stats = client.get("/stats", params={"top": 10}).json()
+    changes = stats.pop("changes")
+    expected = {kind: 0 for kind in CHANGE_KINDS}
+    expected.update(unregistered=1, promoted=1)
+    match = stats == recompute(event_repo, 10) and changes == expected
+    print(f"startup: changes counted before the event service was built: {'yes' if match else 'NO'}")
+    if not match:
+        print(f"    changes {changes!r} != {expected!r}")
+    return match
+
+
+def check(args) -> bool:
+    """Run the random changes in rounds, comparing the statistics after each; True if all matched."""
+    event_repo, events, registrations = build(args.events, args.users, args.seed)
+    event_ids = [f"event-{i}" for i in range(args.events)]
+    user_ids = [f"user-{i}" for i in range(args.users)]
+    tally: Counter = Counter()
+    lock = threading.Lock()
+    per_thread = args.ops // args.rounds // args.threads
+    ok = True
+
+    print(f"events={args.events} users={args.users} threads={args.threads} ops/round={per_thread * args.threads}")
+    print(f"{'round':>6} {'registered':>11} {'waitlisted':>11} {'fill':>6} {'match':>6}")
+    for round_ in range(args.rounds):
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for t in range(args.threads):
+                pool.submit(worker, events, registrations, event_ids, user_ids, per_thread,
+                            args.seed + round_ * args.threads + t, tally, lock)
+        incremental = events.get_registration_stats(args.top)
+        changes = incremental.pop("changes")
+        expected = recompute(event_repo, args.top)
+        match = incremental == expected and all(changes[kind] == tally[kind] for kind in CHANGE_KINDS)
+        ok = ok and match
+        print(f"{round_ + 1:>6} {incremental['registered']:>11} {incremental['waitlisted']:>11} "
+              f"{incremental['fillRate']:>6.2f} {'yes' if match else 'NO':>6}")
+        if not match:
+            for key in expected:
+                if incremental[key] != expected[key]:
+                    print(f"    {key}: incremental {incremental[key]!r} != recomputed {expected[key]!r}")
+            for kind in CHANGE_KINDS:
+                if changes[kind] != tally[kind]:
+                    print(f"    changes[{kind}]: counted {changes[kind]} != reported {tally[kind]}")
+    return ok
+
+
+def timed_reads(sizes, per_event: int, top: int, seed: int) -> None:
+    """Time reading the statistics incrementally and by recompute for each event count."""
+    print(f"\n{'events':>8} {'incremental us':>15} {'recompute ms':>13}")
+    for size in sizes:
+        rng = random.Random(seed)
+        event_repo = EventRepository()
+        for i in range(size):
+            event = Event(eventId=f"event-{i}", capacity=per_event, hasWaitlist=True)
+            event.registered.extend(f"user-{j}" for j in range(rng.randint(0, per_event)))
+            event_repo.create(event)
+        reads = 1000
+        start = time.perf_counter()
+        for _ in range(reads):
+            event_repo.registration_stats(top)
+        incremental = (time.perf_counter() - start) / reads
+        start = time.perf_counter()
+        recompute(event_repo, top)
+        full = time.perf_counter() - start
+        print(f"{size:>8} {incremental * 1e6:>15.1f} {full * 1e3:>13.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--ops", type=int, default=200_000, help="total operations across all rounds")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000],
+                        help="event counts to time reads at")
+    parser.add_argument("--per-event", type=int, default=20, help="capacity of the timed events")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ok = startup_check()
+    ok = check(args) and ok
+    timed_reads(args.sizes, args.per_event, args.top, args.seed)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
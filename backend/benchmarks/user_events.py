@@ -0,0 +1,93 @@
+"""Benchmark for GET /users/{userId}/events lookups.
+
+Compares the original full scan over every event against the reverse
+user -> events index kept by EventRepository.
+
+Run from the backend directory:
+
+    python -m benchmarks.user_events --events 10000 --users 1000 --per-event 100
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from domains.events.models import Event
+from domains.events.repository import EventRepository
+from domains.events.service import EventService
+from domains.registrations.service import RegistrationService
+from domains.users.models import User
+from domains.users.repository import UserRepository
+
+
+def scan_user_events(event_repo: EventRepository, user_id: str) -> List[Event]:
+    """Baseline lookup: scan every event's registered list."""
+    return [event for event in event_repo.list_all() if user_id in event.registered]
+
+
+def build(num_events: int, num_users: int, per_event: int, seed: int):
+    """Populate repositories through the services."""
+    rng = random.Random(seed)
+    user_repo = UserRepository()
+    event_repo = EventRepository()
+    event_service = EventService(event_repo)
+    registrations = RegistrationService(user_repo, event_repo)
+
+    user_ids = [f"user-{i}" for i in range(num_users)]
+    for user_id in user_ids:
+        user_repo.create(User(userId=user_id, name=user_id))
+
+    for i in range(num_events):
+        event_id = f"event-{i}"
+        event_service.create_event(Event(eventId=event_id, capacity=per_event))
+        for user_id in rng.sample(user_ids, per_event):
+            registrations.register_user(event_id, user_id)
+
+    return event_repo, registrations, user_ids
+
+
+def time_lookups(fn, user_ids: List[str], rounds: int) -> float:
+    """Return mean seconds per lookup."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for user_id in user_ids:
+            fn(user_id)
+    return (time.perf_counter() - start) / (rounds * len(user_ids))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--per-event", type=int, default=100)
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    per_event = min(args.per_event, args.users)
+    print(f"Building {args.events} events x {per_event} registrants "
+          f"from {args.users} users...")
+    start = time.perf_counter()
+    event_repo, registrations, user_ids = build(args.events, args.users, per_event, args.seed)
+    print(f"  built in {time.perf_counter() - start:.2f}s")
+
+    sample = random.Random(args.seed).sample(user_ids, min(args.lookups, len(user_ids)))
+
+    # Both paths must agree before timing them
+    for user_id in sample:
+        expected = {e.eventId for e in scan_user_events(event_repo, user_id)}
+        actual = {e.eventId for e in registrations.get_user_events(user_id)}
+        assert expected == actual, f"index mismatch for {user_id}"
+
+    scan = time_lookups(lambda u: scan_user_events(event_repo, u), sample, args.rounds)
+    indexed = time_lookups(registrations.get_user_events, sample, args.rounds)
+
+    print(f"  full scan: {scan * 1e3:9.3f} ms/lookup")
+    print(f"  indexed:   {indexed * 1e3:9.3f} ms/lookup")
+    print(f"  speedup:   {scan / indexed:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
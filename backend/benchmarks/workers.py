@@ -0,0 +1,153 @@
+"""HTTP throughput against worker process count, with invariant checks.
+
+Starts the API as a single uvicorn process, then through
+`python -m core.state_server --workers N` for each N, and drives it
+from several client processes. Each client registers fresh users for a
+handful of small, waitlisted events and reads registration pages in
+between, so every worker handles writes to the same events.
+
+After each run the events are checked: no event has more registered
+users than capacity, nobody is both registered and waitlisted, and
+every successful registration is accounted for exactly once. The
+single process is the baseline; worker throughput can only scale with
+the cores the machine has, minus those the clients use.
+
+Run from the backend directory (needs httpx and uvicorn):
+
+    python -m benchmarks.workers --workers 1 2 4 --requests 4000 --clients 2
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import httpx
+
+
+def free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: Optional[int], port: int) -> subprocess.Popen:
+    """Start plain uvicorn (workers None) or the state server with uvicorn workers."""
+    if workers is None:
+        command = ["-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+    else:
+        command = ["-m", "core.state_server", "--workers", str(workers), "--port", str(port)]
+    env = dict(os.environ, STORAGE_BACKEND="memory", STATE_SERVER_AUTHKEY=secrets.token_hex(16))
+    env.pop("STATE_SERVER_ADDRESS", None)
+    env.pop("PERSISTENCE_DIR", None)
+    server = subprocess.Popen(
+        [sys.executable, *command], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(200):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+
+def seed(base_url: str, events: int, capacity: int, user_ids: List[str]) -> None:
+    """Create the events and users."""
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for i in range(events):
+            client.post("/events", json={"eventId": f"e{i}", "capacity": capacity, "waitlistEnabled": True})
+        for start in range(0, len(user_ids), 1000):
+            batch = [{"userId": user_id, "name": user_id} for user_id in user_ids[start:start + 1000]]
+            client.post("/users:batch", json={"users": batch})
+
+
+def drive(base_url: str, user_ids: List[str], events: int, concurrency: int) -> Tuple[int, int, List[str]]:
+    """Register each user and read a page after each; returns requests, errors and registered users."""
+
+    async def run() -> Tuple[int, int, List[str]]:
+        requests = errors = 0
+        registered: List[str] = []
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+            async def worker(index: int) -> None:
+                nonlocal requests, errors
+                for n in range(index, len(user_ids), concurrency):
+                    event_id = f"e{n % events}"
+                    response = await client.post(
+                        f"/events/{event_id}/registrations", json={"userId": user_ids[n]}
+                    )
+                    if response.status_code == 201:
+                        registered.append(f"{event_id}/{user_ids[n]}")
+                    else:
+                        errors += 1
+                    page = await client.get(f"/events/{event_id}/registrations", params={"limit": 20})
+                    errors += page.status_code != 200
+                    requests += 2
+
+            await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return requests, errors, registered
+
+    return asyncio.run(run())
+
+
+def check(base_url: str, events: int, capacity: int, registered: List[str]) -> None:
+    """Fail if any event broke its capacity or lost, duplicated or invented registrations."""
+    seen = []
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for i in range(events):
+            data = client.get(f"/events/e{i}/registrations").json()
+            assert len(data["registered"]) <= capacity, f"e{i} is over capacity"
+            assert not set(data["registered"]) & set(data["waitlist"]), f"e{i} has users in both lists"
+            seen.extend(f"e{i}/{user_id}" for user_id in data["registered"] + data["waitlist"])
+    assert sorted(seen) == sorted(registered), "registrations were lost or duplicated"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=4000, help="requests per run, half registrations")
+    parser.add_argument("--clients", type=int, default=2, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight per client")
+    parser.add_argument("--events", type=int, default=8)
+    parser.add_argument("--capacity", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests from {args.clients} clients x {args.concurrency}, {os.cpu_count()} CPUs")
+    print(f"{'server':>12} {'req/s':>9} {'errors':>7}")
+    for workers in [None, *args.workers]:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(workers, port)
+        try:
+            users = [f"u{i}" for i in range(args.requests // 2)]
+            seed(base_url, args.events, args.capacity, users)
+            shares = [users[i::args.clients] for i in range(args.clients)]
+            with ProcessPoolExecutor(args.clients) as pool:
+                start = time.perf_counter()
+                results = list(pool.map(
+                    drive, [base_url] * args.clients, shares,
+                    [args.events] * args.clients, [args.concurrency] * args.clients
+                ))
+                seconds = time.perf_counter() - start
+            requests = sum(result[0] for result in results)
+            errors = sum(result[1] for result in results)
+            check(base_url, args.events, args.capacity, [entry for result in results for entry in result[2]])
+        finally:
+            server.terminate()
+            server.wait()
+        label = "single" if workers is None else f"{workers} workers"
+        print(f"{label:>12} {requests / seconds:>9.0f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Running service calls from async route handlers.
+
+Route handlers are async, so a request no longer takes a threadpool hop
+just to run its handler. Repositories declare whether their calls block
+on I/O with a `blocking_io` attribute. Service calls over non-blocking
+repositories (in memory) run inline on the event loop at no extra
+cost. Calls that reach a blocking repository (DynamoDB, or the
+write-ahead log with fsync always) run on a dedicated executor, so
+they never stall the event loop and concurrency is bounded by
+ASYNC_IO_WORKERS rather than the default 40-thread pool. The DynamoDB
+client's connection pool is sized to match.
+
+Configuration:
+
+- ASYNC_IO_WORKERS (default 128): threads for blocking repository calls
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def io_workers() -> int:
+    """Get the number of threads for blocking repository calls."""
+    return int(os.environ.get("ASYNC_IO_WORKERS", "128"))
+
+
+class ServiceRunner:
+    """Runs sync service methods for async callers, inline or on an executor."""
+
+    def __init__(self, blocking: bool, executor: Optional[Executor] = None):
+        """Initialize the runner; blocking runners need an executor."""
+        if blocking and executor is None:
+            raise ValueError("blocking runners need an executor")
+        self.blocking = blocking
+        self._executor = executor
+
+    async def __call__(self, func: Callable[..., T], *args: Any) -> T:
+        """Run func(*args), off the event loop if it may block."""
+        if not self.blocking:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+
+def create_io_executor() -> Executor:
+    """Create the executor for blocking repository calls."""
+    return ThreadPoolExecutor(max_workers=io_workers(), thread_name_prefix="io")
@@ -0,0 +1,283 @@
+"""In-process change feed of registration updates, streamed as server-sent events.
+
+Services publish each change to topics such as `events/{eventId}` and
+`users/{userId}`. Each topic keeps its most recent changes in a
+bounded ring buffer, stamped with ids of the form `<epoch>-<seq>`
+where seq increases across the whole process. A subscriber remembers
+only the last id it sent and is woken when its topic changes, so it
+costs O(1) memory however far behind it is.
+
+A subscriber whose position has been overwritten in the ring, because
+it (or its connection) did not keep up, is dropped: its stream ends.
+When the client reconnects with Last-Event-ID it gets a `reset` event,
+telling it to refetch state, and continues from the newest change. A
+Last-Event-ID from another process or an evicted topic gets the same
+treatment.
+
+Changes made by other processes (e.g. other Lambda instances) are not
+seen; the feed complements polling, it does not replace the store.
+Multi-worker deployments forward the state process's changes to every
+worker's feed (see core.state_server).
+
+Configuration:
+
+- CHANGE_FEED_BUFFER (default 256): changes retained per topic
+- CHANGE_FEED_TOPICS (default 10000): topics retained; the least
+  recently published topics without subscribers are evicted first
+- CHANGE_FEED_HEARTBEAT (default 15): seconds between keepalive
+  comments on an idle stream
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+
+# (seq, kind, serialized data)
+Change = Tuple[int, str, bytes]
+
+
+class SlowConsumerError(Exception):
+    """Raised when a subscriber's next change has been overwritten in the ring buffer."""
+
+
+class _Topic:
+    """Ring buffer of a topic's recent changes and its live subscribers."""
+
+    __slots__ = ("changes", "floor", "subscribers")
+
+    def __init__(self, capacity: int, floor: int):
+        self.changes: Deque[Change] = deque(maxlen=capacity)
+        # Highest seq that may have been published here but is no longer retained
+        self.floor = floor
+        self.subscribers: Set["Subscription"] = set()
+
+
+class ChangeFeed:
+    """Thread-safe publisher of changes to per-topic ring buffers."""
+
+    def __init__(self, buffer_size: int = 256, max_topics: int = 10000, heartbeat: float = 15.0):
+        """Initialize an empty feed."""
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be greater than zero")
+        self.epoch = uuid.uuid4().hex[:8]
+        self.heartbeat = heartbeat
+        self._buffer_size = buffer_size
+        self._max_topics = max_topics
+        self._topics: "OrderedDict[str, _Topic]" = OrderedDict()
+        self._seq = 0
+        # Changes of evicted topics are unknown up to here
+        self._evicted_floor = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str, bytes], None]] = []
+
+    @classmethod
+    def from_env(cls) -> "ChangeFeed":
+        """Build a feed sized by the CHANGE_FEED_* environment variables."""
+        return cls(
+            buffer_size=int(os.environ.get("CHANGE_FEED_BUFFER", "256")),
+            max_topics=int(os.environ.get("CHANGE_FEED_TOPICS", "10000")),
+            heartbeat=float(os.environ.get("CHANGE_FEED_HEARTBEAT", "15")),
+        )
+
+    def add_listener(self, listener: Callable[[str, str, bytes], None]) -> None:
+        """Call listener(topic, kind, serialized data) for every change published from now on."""
+        self._listeners.append(listener)
+
+    def publish(self, topic: str, kind: str, data: Any) -> None:
+        """Append a change to a topic and wake its subscribers."""
+        self.publish_serialized(topic, kind, to_json(data))
+
+    def publish_serialized(self, topic: str, kind: str, body: bytes) -> None:
+        """Publish a change whose data is already serialized to JSON."""
+        for listener in self._listeners:
+            listener(topic, kind, body)
+        with self._lock:
+            self._seq += 1
+            entry = self._topic(topic)
+            self._topics.move_to_end(topic)
+            if len(entry.changes) == entry.changes.maxlen:
+                entry.floor = entry.changes[0][0]
+            entry.changes.append((self._seq, kind, body))
+            subscribers = list(entry.subscribers)
+        # One thread-safe callback per event loop, however many readers it serves
+        wakeups: Dict[asyncio.AbstractEventLoop, List[asyncio.Event]] = {}
+        for subscription in subscribers:
+            wakeups.setdefault(subscription.loop, []).append(subscription.wakeup)
+        for loop, events in wakeups.items():
+            try:
+                loop.call_soon_threadsafe(_set_all, events)
+            except RuntimeError:
+                # The loop has closed; its subscribers are unsubscribing
+                pass
+
+    def subscribe(self, topic: str, last_event_id: Optional[str] = None) -> "Subscription":
+        """Subscribe to a topic from the caller's event loop.
+
+        Without last_event_id only changes published from now on are
+        delivered. With one, retained changes after it are replayed, or
+        the subscription starts with a reset if they are not all retained.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._topic(topic)
+            latest = entry.changes[-1][0] if entry.changes else entry.floor
+            after, reset = latest, False
+            if last_event_id is not None:
+                seq = self._parse_id(last_event_id)
+                if seq is None or seq < entry.floor or seq > self._seq:
+                    reset = True
+                else:
+                    after = seq
+            subscription = Subscription(self, entry, after, reset, loop)
+            entry.subscribers.add(subscription)
+        return subscription
+
+    def format_id(self, seq: int) -> str:
+        """Render a change's seq as an SSE event id."""
+        return f"{self.epoch}-{seq}"
+
+    def _parse_id(self, event_id: str) -> Optional[int]:
+        """Get the seq of an id from this feed, or None if it is foreign or malformed."""
+        epoch, _, seq = event_id.strip().partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _topic(self, topic: str) -> _Topic:
+        """Get or create a topic, evicting idle ones beyond max_topics; callers hold the lock."""
+        entry = self._topics.get(topic)
+        if entry is not None:
+            return entry
+        entry = self._topics[topic] = _Topic(self._buffer_size, self._evicted_floor)
+        if len(self._topics) > self._max_topics:
+            for name, candidate in list(islice(self._topics.items(), len(self._topics) - self._max_topics)):
+                if not candidate.subscribers and candidate is not entry:
+                    if candidate.changes:
+                        self._evicted_floor = max(self._evicted_floor, candidate.changes[-1][0])
+                    del self._topics[name]
+        return entry
+
+    def _read(self, subscription: "Subscription") -> List[Change]:
+        """Take the changes a subscription has not seen, raising if some were lost."""
+        with self._lock:
+            entry = subscription.topic
+            if subscription.after < entry.floor:
+                raise SlowConsumerError("subscriber fell behind the change buffer")
+            pending: List[Change] = []
+            for change in reversed(entry.changes):
+                if change[0] <= subscription.after:
+                    break
+                pending.append(change)
+            if not pending:
+                subscription.wakeup.clear()
+                return pending
+            pending.reverse()
+            subscription.after = pending[-1][0]
+            return pending
+
+    def _unsubscribe(self, subscription: "Subscription") -> None:
+        """Detach a subscription from its topic."""
+        with self._lock:
+            subscription.topic.subscribers.discard(subscription)
+
+
+class Subscription:
+    """One subscriber's position in a topic, read from a single event loop."""
+
+    def __init__(self, feed: ChangeFeed, topic: _Topic, after: int, reset: bool, loop: asyncio.AbstractEventLoop):
+        self.topic = topic
+        self.after = after
+        self.reset = reset
+        self.wakeup = asyncio.Event()
+        self.loop = loop
+        self._feed = feed
+
+    async def next(self, timeout: float) -> List[Change]:
+        """Wait up to timeout for unseen changes, raising SlowConsumerError if some were lost."""
+        deadline = self.loop.time() + timeout
+        while True:
+            changes = self._feed._read(self)
+            if changes:
+                return changes
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                return changes
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+
+    def close(self) -> None:
+        """Stop receiving changes."""
+        self._feed._unsubscribe(self)
+
+
+# Shared by every service and stream route
+change_feed = ChangeFeed.from_env()
+
+
+def event_stream_response(
+    topic: str, last_event_id: Optional[str], feed: Optional[ChangeFeed] = None
+) -> StreamingResponse:
+    """Stream a topic's changes as server-sent events until the client leaves or falls behind."""
+    if feed is None:
+        feed = change_feed
+
+    async def stream() -> AsyncIterator[bytes]:
+        subscription = feed.subscribe(topic, last_event_id)
+        try:
+            if subscription.reset:
+                yield _format_event(feed.format_id(subscription.after), "reset", b"{}")
+            else:
+                # Flushes headers so clients see the stream open before the first change
+                yield b": connected\n\n"
+            while True:
+                try:
+                    changes = await subscription.next(feed.heartbeat)
+                except SlowConsumerError:
+                    # The client reconnects with Last-Event-ID and gets a reset
+                    return
+                if not changes:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"".join(
+                    _format_event(feed.format_id(seq), kind, data) for seq, kind, data in changes
+                )
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def publish_registration_change(feed: ChangeFeed, event: Any, user_id: str, change: str) -> None:
+    """Announce a change to a user's registration on the event's and the user's topics."""
+    data = {
+        "eventId": event.eventId,
+        "userId": user_id,
+        "registeredCount": len(event.registered),
+        "waitlistCount": len(event.waitlist)
+    }
+    feed.publish(f"events/{event.eventId}", change, data)
+    feed.publish(f"users/{user_id}", change, data)
+
+
+def _set_all(events: List[asyncio.Event]) -> None:
+    """Wake several readers from their event loop."""
+    for event in events:
+        event.set()
+
+
+def _format_event(event_id: str, kind: str, data: bytes) -> bytes:
+    """Encode one server-sent event."""
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), kind.encode(), data)
@@ -1,37 +1,262 @@
-"""Dependency injection for services and repositories."""
+"""Dependency injection for services and repositories.
 
+Repositories are created on first use rather than at import time, so a
+cold start only pays for the storage backend (and boto3) once a request
+needs it. Services are stateless and cached after their first build.
+Set STARTUP_MODE=eager to build everything up front instead, e.g. when
+Lambda init time is pre-paid by provisioned concurrency.
+
+Route handlers are async and depend on the Async* services, which run
+the sync services inline or on the I/O executor (see
+core.async_support). The providers for them are async themselves, as
+FastAPI runs sync dependencies in its threadpool.
+
+With STATE_SERVER_ADDRESS set the process is one of several workers:
+services are proxies to the state process that owns the repositories
+(see core.state_server), and this process builds no repositories.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
 from domains.users.repository import UserRepository
-from domains.users.service import UserService
+from domains.users.service import AsyncUserService, UserService
+from domains.events.offers import OfferTimers
 from domains.events.repository import EventRepository
-from domains.events.service import EventService
-from domains.registrations.service import RegistrationService
+from domains.events.service import AsyncEventService, EventService
+from domains.events.stats import change_counts
+from domains.registrations.service import AsyncRegistrationService, RegistrationService
+from domains.admin.service import AdminService, AsyncAdminService
+from core.async_support import ServiceRunner, create_io_executor
+from core.change_feed import change_feed
+from core.locking import EventLocks
+from core.state_server import RemoteService, StateClient
+
+
+def _create_repositories() -> Tuple[UserRepository, EventRepository]:
+    """Build the repositories selected by STORAGE_BACKEND."""
+    backend = os.environ.get("STORAGE_BACKEND", "memory").lower()
+    if backend == "memory":
+        if not os.environ.get("PERSISTENCE_DIR"):
+            return UserRepository(), EventRepository()
+        from core.persistence import DurableStore
+        from domains.users.durable_repository import DurableUserRepository
+        from domains.events.durable_repository import DurableEventRepository
+        store = DurableStore.from_env()
+        repositories = DurableUserRepository(store), DurableEventRepository(store)
+        store.recover()
+        return repositories
+    if backend == "dynamodb":
+        # Imported lazily so the in-memory backend never loads boto3
+        from core.dynamodb import create_client
+        from domains.users.dynamodb_repository import DynamoDBUserRepository
+        from domains.events.dynamodb_repository import DynamoDBEventRepository
+        client = create_client()
+        events_table = os.environ["DYNAMODB_TABLE_NAME"]
+        users_table = os.environ["USERS_TABLE_NAME"]
+        return (
+            DynamoDBUserRepository(client, users_table),
+            DynamoDBEventRepository(client, events_table, users_table),
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'")
+
+
+# Singleton repositories, created on first use
+_repositories: Optional[Tuple[UserRepository, EventRepository]] = None
+_repositories_lock = threading.Lock()
+
+# Shared per-event locks so every service instance serializes on the same event
+_event_locks = EventLocks.from_env()
+
+# Shared offer expiry timers, so offers made by either service expire through one wheel
+_offer_timers = OfferTimers.from_env()
+
+# Count registration changes from startup rather than from when the event
+# service is first built, which may be after other routes have made changes
+change_counts(change_feed)
+
+# Threads for blocking repository calls, started on first use
+_io_executor = None
 
 
-# Singleton instances for repositories
-_user_repository = UserRepository()
-_event_repository = EventRepository()
+def _get_repositories() -> Tuple[UserRepository, EventRepository]:
+    """Get the singleton repositories, creating them exactly once."""
+    global _repositories
+    if _repositories is None:
+        with _repositories_lock:
+            if _repositories is None:
+                if get_state_client() is not None:
+                    raise RuntimeError("Workers forward service calls; the state process owns the repositories")
+                _repositories = _create_repositories()
+                _restore_offers(_repositories[1])
+    return _repositories
+
+
+def _restore_offers(event_repository: EventRepository) -> None:
+    """Build the registration service now if recovered offers await expiry.
+    
+    It schedules them on the offer timers and expires them, so they do
+    not wait for the first registration request to build it.
+    """
+    if event_repository.offer_holds_supported and event_repository.pending_offers():
+        get_registration_service()
+
+
+@lru_cache(maxsize=None)
+def get_state_client() -> Optional[StateClient]:
+    """Get the client for the state process when running as a worker, else None.
+    
+    Creating it also starts republishing the state process's changes
+    on this worker's change feed.
+    """
+    client = StateClient.from_env()
+    if client is not None:
+        client.follow_feed(change_feed)
+    return client
 
 
 def get_user_repository() -> UserRepository:
     """Get the singleton user repository instance."""
-    return _user_repository
+    return _get_repositories()[0]
 
 
 def get_event_repository() -> EventRepository:
     """Get the singleton event repository instance."""
-    return _event_repository
+    return _get_repositories()[1]
+
+
+def get_event_locks() -> EventLocks:
+    """Get the singleton per-event lock set."""
+    return _event_locks
 
 
+@lru_cache(maxsize=None)
 def get_user_service() -> UserService:
-    """Get a user service instance."""
+    """Get the shared user service instance."""
+    client = get_state_client()
+    if client is not None:
+        return RemoteService(client, "users")
     return UserService(get_user_repository())
 
 
+@lru_cache(maxsize=None)
 def get_event_service() -> EventService:
-    """Get an event service instance."""
-    return EventService(get_event_repository())
+    """Get the shared event service instance."""
+    client = get_state_client()
+    if client is not None:
+        return RemoteService(client, "events")
+    return EventService(get_event_repository(), get_event_locks(), offers=_offer_timers)
 
 
+@lru_cache(maxsize=None)
 def get_registration_service() -> RegistrationService:
-    """Get a registration service instance."""
-    return RegistrationService(get_user_repository(), get_event_repository())
+    """Get the shared registration service instance."""
+    client = get_state_client()
+    if client is not None:
+        return RemoteService(client, "registrations")
+    return RegistrationService(
+        get_user_repository(), get_event_repository(), get_event_locks(), offers=_offer_timers
+    )
+
+
+@lru_cache(maxsize=None)
+def get_admin_service() -> AdminService:
+    """Get the shared admin service instance."""
+    client = get_state_client()
+    if client is not None:
+        return RemoteService(client, "admin")
+    return AdminService(get_user_repository(), get_event_repository(), get_event_locks())
+
+
+@lru_cache(maxsize=None)
+def get_service_runner() -> ServiceRunner:
+    """Get the runner for service calls, blocking if they leave the process or block on I/O."""
+    global _io_executor
+    if get_state_client() is None:
+        user_repository, event_repository = _get_repositories()
+        if not (user_repository.blocking_io or event_repository.blocking_io):
+            return ServiceRunner(blocking=False)
+    with _repositories_lock:
+        if _io_executor is None:
+            _io_executor = create_io_executor()
+    return ServiceRunner(blocking=True, executor=_io_executor)
+
+
+@lru_cache(maxsize=None)
+def _get_async_user_service() -> AsyncUserService:
+    """Build the shared async user service."""
+    return AsyncUserService(get_user_service(), get_service_runner())
+
+
+@lru_cache(maxsize=None)
+def _get_async_event_service() -> AsyncEventService:
+    """Build the shared async event service."""
+    return AsyncEventService(get_event_service(), get_service_runner())
+
+
+@lru_cache(maxsize=None)
+def _get_async_registration_service() -> AsyncRegistrationService:
+    """Build the shared async registration service."""
+    return AsyncRegistrationService(get_registration_service(), get_service_runner())
+
+
+@lru_cache(maxsize=None)
+def _get_async_admin_service() -> AsyncAdminService:
+    """Build the shared async admin service."""
+    return AsyncAdminService(get_admin_service(), get_service_runner())
+
+
+async def get_async_user_service() -> AsyncUserService:
+    """Get the shared async user service instance."""
+    return _get_async_user_service()
+
+
+async def get_async_event_service() -> AsyncEventService:
+    """Get the shared async event service instance."""
+    return _get_async_event_service()
+
+
+async def get_async_registration_service() -> AsyncRegistrationService:
+    """Get the shared async registration service instance."""
+    return _get_async_registration_service()
+
+
+async def get_async_admin_service() -> AsyncAdminService:
+    """Get the shared async admin service instance."""
+    return _get_async_admin_service()
+
+
+def override_repositories(
+    user_repository: UserRepository,
+    event_repository: EventRepository
+) -> None:
+    """Replace the singleton repositories, e.g. for benchmarks and local seeding."""
+    global _repositories
+    with _repositories_lock:
+        _repositories = (user_repository, event_repository)
+    get_user_service.cache_clear()
+    get_event_service.cache_clear()
+    get_registration_service.cache_clear()
+    get_admin_service.cache_clear()
+    get_service_runner.cache_clear()
+    _get_async_user_service.cache_clear()
+    _get_async_event_service.cache_clear()
+    _get_async_registration_service.cache_clear()
+    _get_async_admin_service.cache_clear()
+    _restore_offers(event_repository)
+
+
+def warm_up() -> None:
+    """Build repositories and services ahead of the first request."""
+    _get_async_user_service()
+    _get_async_event_service()
+    _get_async_registration_service()
+
+
+def is_eager_startup() -> bool:
+    """Check whether STARTUP_MODE asks for dependencies to be built at import."""
+    mode = os.environ.get("STARTUP_MODE", "lazy").lower()
+    if mode not in ("lazy", "eager"):
+        raise ValueError(f"Unknown STARTUP_MODE '{mode}'")
+    return mode == "eager"
@@ -0,0 +1,80 @@
+"""DynamoDB client setup and item conversion helpers."""
+
+import os
+from typing import Any, Dict, Optional
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from core.async_support import io_workers
+
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def create_client(endpoint_url: Optional[str] = None):
+    """Create a DynamoDB client, honoring DYNAMODB_ENDPOINT_URL for local testing.
+    
+    The connection pool matches the async I/O executor, so every
+    executor thread can hold a connection instead of queueing for one.
+    """
+    endpoint_url = endpoint_url or os.environ.get("DYNAMODB_ENDPOINT_URL") or None
+    return boto3.client(
+        "dynamodb",
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=io_workers())
+    )
+
+
+def to_item(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a plain dict to a DynamoDB item, dropping None values."""
+    return {key: _serializer.serialize(value) for key, value in data.items() if value is not None}
+
+
+def from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a DynamoDB item to a plain dict."""
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def to_value(value: Any) -> Dict[str, Any]:
+    """Convert a single value to its DynamoDB attribute representation."""
+    return _serializer.serialize(value)
+
+
+def is_conditional_failure(error: ClientError) -> bool:
+    """Check whether a client error was caused by a failed condition."""
+    return error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def is_write_conflict(error: ClientError) -> bool:
+    """Check whether a write lost a race: a failed condition or a cancelled transaction.
+    
+    Concurrent transactions touching the same item are cancelled with a
+    TransactionConflict reason, which is retryable just like a condition
+    that no longer holds.
+    """
+    code = error.response.get("Error", {}).get("Code")
+    if code == "ConditionalCheckFailedException":
+        return True
+    if code == "TransactionCanceledException":
+        reasons = error.response.get("CancellationReasons", [])
+        return any(
+            reason.get("Code") in ("ConditionalCheckFailed", "TransactionConflict")
+            for reason in reasons
+        )
+    return False
+
+
+def create_tables(client, events_table: str, users_table: str) -> None:
+    """Create the events and users tables, used for DynamoDB Local and moto."""
+    for table_name, key in ((events_table, "eventId"), (users_table, "userId")):
+        client.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        client.get_waiter("table_exists").wait(TableName=table_name)
@@ -24,3 +24,13 @@ class BusinessRuleViolationError(DomainException):
 class ValidationError(DomainException):
     """Raised when validation fails."""
     pass
+
+
+class ConcurrentModificationError(BusinessRuleViolationError):
+    """Raised when a conditional write loses a race with another writer."""
+    pass
+
+
+class IdempotencyKeyReusedError(DomainException):
+    """Raised when an idempotency key is sent again with a different request."""
+    pass
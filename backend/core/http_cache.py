@@ -0,0 +1,125 @@
+"""Conditional GET support: ETags, 304 responses and a serialized-body cache.
+
+Read routes pass a version token that changes whenever their response
+would, computed from repository change counters. The token becomes a
+weak ETag, so a matching If-None-Match gets an empty 304. Other
+requests take the serialized body from a bounded LRU keyed by
+(resource, token), so polling an unchanged resource skips
+serialization entirely.
+
+Configuration:
+
+- RESPONSE_CACHE_ENTRIES (default 1024): maximum cached bodies
+- RESPONSE_CACHE_BYTES (default 67108864): maximum total cached bytes
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized response bodies bounded by count and size."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 2**20):
+        """Initialize an empty cache."""
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache sized by the RESPONSE_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.environ.get("RESPONSE_CACHE_ENTRIES", "1024")),
+            max_bytes=int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 * 2**20))),
+        )
+
+    def get(self, resource: str, version: str) -> Optional[bytes]:
+        """Get a cached body, marking it most recently used."""
+        key = (resource, version)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, resource: str, version: str, body: bytes) -> None:
+        """Cache a body, evicting least recently used entries to stay within bounds."""
+        if len(body) > self._max_bytes or self._max_entries <= 0:
+            return
+        key = (resource, version)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop every cached body."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by every read route
+response_cache = ResponseCache.from_env()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag using weak comparison."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+async def conditional_json_response(
+    request: Request,
+    version: str,
+    build: Callable[[], Awaitable[Any]],
+    cache: Optional[ResponseCache] = None,
+    serialize: Callable[[Any], bytes] = to_json
+) -> Response:
+    """Respond with 304 if the client has this version, else cached or fresh JSON.
+
+    build() is awaited only on a cache miss, and its result rendered
+    with serialize. The version must be read before build() reads the
+    data it describes, so a cached body is never older than its
+    version. Bodies are cached by path and query, so a serializer must
+    depend on nothing else.
+    """
+    if cache is None:
+        cache = response_cache
+    etag = f'W/"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    resource = request.url.path + "?" + request.url.query
+    body = cache.get(resource, version)
+    if body is None:
+        body = serialize(await build())
+        cache.put(resource, version, body)
+    return Response(body, media_type="application/json", headers=headers)
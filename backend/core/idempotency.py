@@ -0,0 +1,189 @@
+"""Idempotency keys: run a mutation once per key and replay its outcome.
+
+Clients and gateways retry requests whose response they never saw. A
+request that carries an `Idempotency-Key` header runs its service call
+through an IdempotencyStore, which remembers the outcome under the key:
+the result, or the conflict the route turns into a 4xx. A repeat
+with the same key gets that outcome again without the service logic
+running a second time, and a repeat that arrives while the first call
+is still running waits for it instead of racing it.
+
+Only outcomes that a retry would not change are remembered: results
+and terminal conflicts such as "already registered" or "event is
+full". A missing user or event, a validation failure, a lost write
+race or an unexpected error (e.g. a DynamoDB timeout) forgets the key,
+so the next retry runs the call again once the cause is fixed. Reusing
+a key for a different request is an error.
+
+Keys whose first call is still running are kept apart from completed
+ones and are never evicted, so however small the store, a repeat never
+runs a call that is in flight. Each waiter re-raises its own copy of a
+remembered error.
+
+Keys are kept per process. Multi-worker deployments share the state
+process's store, since service calls run there; separate Lambda
+instances do not share keys, so a retry that lands on another instance
+runs again and gets the plain duplicate-request outcome.
+
+Configuration:
+
+- IDEMPOTENCY_KEYS (default 100000): completed keys remembered
+- IDEMPOTENCY_TTL (default 86400): seconds a completed key is remembered
+"""
+
+import copy
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+from core.exceptions import (
+    BusinessRuleViolationError,
+    ConcurrentModificationError,
+    DomainException,
+    EntityAlreadyExistsError,
+    IdempotencyKeyReusedError,
+)
+
+T = TypeVar("T")
+
+
+class _Entry:
+    """One key's request and, once its call has finished, the outcome."""
+
+    __slots__ = ("request", "done", "result", "error", "forgotten", "expires")
+
+    def __init__(self, request: Hashable):
+        self.request = request
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[DomainException] = None
+        # Set when the call failed in a way a retry might not
+        self.forgotten = False
+        self.expires = math.inf
+
+
+class IdempotencyStore:
+    """Thread-safe LRU of completed call outcomes by idempotency key, bounded by count and age.
+
+    Keys whose call is still running wait outside the LRU until it completes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        ttl: float = 86400.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize an empty store."""
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than zero")
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        # Completed entries, least recently used first
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Entries whose first call is still running
+        self._running: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyStore":
+        """Build a store sized by the IDEMPOTENCY_* environment variables."""
+        return cls(
+            max_entries=int(os.environ.get("IDEMPOTENCY_KEYS", "100000")),
+            ttl=float(os.environ.get("IDEMPOTENCY_TTL", "86400")),
+        )
+
+    def run(self, key: str, request: Hashable, operation: Callable[[], T]) -> T:
+        """Run operation once for a key, replaying its result or conflict to repeats.
+
+        request identifies what the key was first used for; a repeat
+        with a different one raises IdempotencyKeyReusedError.
+        """
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                owner = entry is None
+                if owner:
+                    entry = self._running[key] = _Entry(request)
+            if entry.request != request:
+                raise IdempotencyKeyReusedError(
+                    f"Idempotency-Key '{key}' was already used for a different request"
+                )
+            if owner:
+                return self._complete(key, entry, operation)
+            entry.done.wait()
+            if entry.forgotten:
+                # The first call failed transiently; run it again, or wait for whoever does
+                continue
+            if entry.error is not None:
+                # Waiters may raise concurrently, so each gets its own exception object
+                raise copy.copy(entry.error)
+            return entry.result
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._running)
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        """Get a running or live completed entry, marking it most recently used; callers hold the lock."""
+        running = self._running.get(key)
+        if running is not None:
+            return running
+        now = self._clock()
+        # Least recently used entries sit at the front, so expired ones usually do too
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires > now:
+                break
+            self._entries.popitem(last=False)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _complete(self, key: str, entry: _Entry, operation: Callable[[], T]) -> T:
+        """Run the first call for a key and record its outcome for repeats."""
+        try:
+            entry.result = operation()
+        except ConcurrentModificationError:
+            self._forget(key, entry)
+            raise
+        except (BusinessRuleViolationError, EntityAlreadyExistsError) as e:
+            entry.error = e
+            self._finish(key, entry)
+            raise
+        except BaseException:
+            self._forget(key, entry)
+            raise
+        self._finish(key, entry)
+        return entry.result
+
+    def _finish(self, key: str, entry: _Entry) -> None:
+        """Move a completed entry into the LRU, start its time to live and release its waiters."""
+        with self._lock:
+            entry.expires = self._clock() + self._ttl
+            if self._running.get(key) is entry:
+                del self._running[key]
+                self._entries[key] = entry
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        entry.done.set()
+
+    def _forget(self, key: str, entry: _Entry) -> None:
+        """Drop an entry whose call should run again, releasing its waiters."""
+        with self._lock:
+            if self._running.get(key) is entry:
+                del self._running[key]
+        entry.forgotten = True
+        entry.done.set()
+
+
+# Shared by every service that accepts idempotency keys
+idempotency_store = IdempotencyStore.from_env()
@@ -0,0 +1,322 @@
+"""Adaptive load shedding and per-client rate limits for the HTTP API.
+
+During a ticket drop, registrations can arrive faster than the process
+serves them. Without a limit every request waits its turn on the same
+event loop, so reads such as /users/{userId}/events slow down as much
+as the registrations do. LoadSheddingMiddleware sheds each route class
+separately instead:
+
+- writes: POST, PUT, PATCH and DELETE
+- reads: GET and HEAD, apart from the exempt paths
+- exempt: /, /health, /metrics, change streams and /admin routes,
+  which are never limited (streams and bulk transfers stay open far
+  longer than any target, so they would hold a slot and back it off)
+
+Each class has a concurrency limit that adapts to two congestion
+signals:
+
+- Observed latency: a request of the class took longer than the
+  class's target, e.g. because it waited on blocking I/O.
+- Queue depth: requests waiting for the event loop are not visible to
+  the app, but they make it run timers late, so the loop's lag is
+  sampled every 10 ms and compared with the class's lag threshold.
+  Writes have a lower threshold than reads, so a registration storm
+  throttles writes while reads keep their slots.
+
+A request that completes without congestion raises the limit by about
+one per limit's worth of requests, up to the configured maximum.
+Congestion cuts it by a tenth, at most once per target interval, down
+to an eighth of the maximum, so a throttled class still makes progress. Requests
+over the limit wait in a bounded queue without using the CPU. They are
+shed with 503 and Retry-After when the queue is full, or after waiting
+longer than the target. A shed request never reaches the route, so it
+costs much less than a served one.
+
+Optionally, each client also gets a token bucket per class. A client
+over its rate gets 429 with Retry-After. Clients are identified by the
+socket peer address, or by a header such as X-Forwarded-For when
+behind a proxy that sets it.
+
+State is per process. Under Lambda each instance serves one request
+at a time, so use API Gateway throttling there instead.
+
+Configuration:
+
+- LOAD_SHEDDING (default off): on enables concurrency limits and
+  adaptive shedding
+- LOAD_SHED_WRITE_CONCURRENCY (default 64), LOAD_SHED_READ_CONCURRENCY
+  (default 256): maximum requests in flight per class
+- LOAD_SHED_WRITE_TARGET_MS (default 100), LOAD_SHED_READ_TARGET_MS
+  (default 50): latency each class's limit adapts to, and the longest
+  a request waits for a slot
+- LOAD_SHED_WRITE_LAG_MS (default 20), LOAD_SHED_READ_LAG_MS (default
+  250): event loop lag above which the class is congested
+- LOAD_SHED_QUEUE (default 128): requests waiting per class before
+  new ones are shed
+- RATE_LIMIT_WRITES, RATE_LIMIT_READS (default 0, off): requests per
+  second per client; bursts of up to one second's worth are allowed
+- RATE_LIMIT_CLIENT_HEADER: header identifying the client, first
+  comma-separated value; default is the peer address
+- RATE_LIMIT_CLIENTS (default 100000): clients tracked; the least
+  recently seen are forgotten first
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+# Paths that are never limited; change streams and admin routes are matched by suffix and prefix
+EXEMPT_PATHS = frozenset(("/", "/health", "/metrics"))
+
+_WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+# Factor applied to a class's limit when a request misses the target
+_BACKOFF = 0.9
+
+# Lowest limit as a fraction of the maximum; slots are held for at least
+# the loop's lag, so much lower limits throttle a class below what it can serve
+_MIN_LIMIT_FRACTION = 0.125
+
+# Seconds between event loop lag samples
+_LAG_INTERVAL = 0.01
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Get a request's route class, "write" or "read", or None when exempt."""
+    if path in EXEMPT_PATHS or path.endswith("/stream") or path.startswith("/admin/"):
+        return None
+    return "write" if method in _WRITE_METHODS else "read"
+
+
+class AdaptiveLimiter:
+    """Concurrency limit for one route class that backs off when latency misses a target.
+
+    Used from a single event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_concurrency: int, target: float, max_queue: int, max_lag: float = math.inf):
+        """Initialize the limiter fully open; target and max_lag are in seconds."""
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than zero")
+        self.max_concurrency = max_concurrency
+        self.target = target
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.limit = float(max_concurrency)
+        self.min_limit = max(1.0, max_concurrency * _MIN_LIMIT_FRACTION)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_backoff = -math.inf
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to the target for one; False means shed."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        granted = False
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.target)
+            granted = True
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if not granted and waiter.done():
+                # Granted just as the wait ended, or the request went away; hand the slot on
+                self.in_flight -= 1
+                self._wake()
+            elif not granted:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+        return granted
+
+    def release(self, latency: float, lag: float = 0.0) -> None:
+        """Return a slot and adapt the limit to the request's latency and the loop's lag, in seconds."""
+        self.in_flight -= 1
+        if latency > self.target or lag > self.max_lag:
+            now = time.monotonic()
+            if now - self._last_backoff >= self.target:
+                self._last_backoff = now
+                self.limit = max(self.min_limit, self.limit * _BACKOFF)
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant free slots to waiters in arrival order."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class LoopLag:
+    """Samples how late the running event loop fires a timer."""
+
+    def __init__(self, interval: float = _LAG_INTERVAL):
+        """Initialize; sampling starts on the first call from a loop."""
+        self.interval = interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lag = 0.0
+        self._due = 0.0
+
+    def current(self) -> float:
+        """Get the loop's lag in seconds, counting a sample that is overdue right now."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._lag = 0.0
+            self._schedule(loop.time())
+        return max(self._lag, loop.time() - self._due)
+
+    def _sample(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Record how late this sample ran and schedule the next."""
+        if loop is not self._loop:
+            return
+        now = loop.time()
+        self._lag = now - self._due
+        self._schedule(now)
+
+    def _schedule(self, now: float) -> None:
+        self._due = now + self.interval
+        self._loop.call_at(self._due, self._sample, self._loop)
+
+
+class TokenBuckets:
+    """Per-client token buckets for one route class, bounded by client count."""
+
+    def __init__(self, rate: float, max_clients: int = 100000):
+        """Initialize empty buckets refilling at rate tokens per second."""
+        self.rate = rate
+        self.burst = max(1.0, rate)
+        self._max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, client: str, now: float) -> float:
+        """Take a token, returning 0, or the seconds until one is available."""
+        tokens, stamp = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self._max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class LoadShedder:
+    """Per-class adaptive limiters and per-client rate limits."""
+
+    def __init__(
+        self,
+        limiters: Optional[Dict[str, AdaptiveLimiter]] = None,
+        rate_limits: Optional[Dict[str, TokenBuckets]] = None,
+        client_header: Optional[str] = None
+    ):
+        """Initialize with limiters and rate limits by route class; missing classes are unlimited."""
+        self.limiters = limiters or {}
+        self.rate_limits = rate_limits or {}
+        self.client_header = client_header.lower() if client_header else None
+        self.loop_lag = LoopLag()
+
+    @classmethod
+    def from_env(cls) -> "LoadShedder":
+        """Build a shedder from the LOAD_SHED* and RATE_LIMIT_* environment variables."""
+        limiters = {}
+        if os.environ.get("LOAD_SHEDDING", "off").lower() == "on":
+            max_queue = int(os.environ.get("LOAD_SHED_QUEUE", "128"))
+            for name, concurrency, target, lag in (("write", "64", "100", "20"), ("read", "256", "50", "250")):
+                prefix = f"LOAD_SHED_{name.upper()}"
+                limiters[name] = AdaptiveLimiter(
+                    int(os.environ.get(f"{prefix}_CONCURRENCY", concurrency)),
+                    float(os.environ.get(f"{prefix}_TARGET_MS", target)) / 1000,
+                    max_queue,
+                    float(os.environ.get(f"{prefix}_LAG_MS", lag)) / 1000,
+                )
+        rate_limits = {}
+        max_clients = int(os.environ.get("RATE_LIMIT_CLIENTS", "100000"))
+        for name in ("write", "read"):
+            rate = float(os.environ.get(f"RATE_LIMIT_{name.upper()}S", "0"))
+            if rate > 0:
+                rate_limits[name] = TokenBuckets(rate, max_clients)
+        return cls(limiters, rate_limits, os.environ.get("RATE_LIMIT_CLIENT_HEADER"))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.limiters or self.rate_limits)
+
+    def client_id(self, scope) -> str:
+        """Identify the client of a request for rate limiting."""
+        if self.client_header is not None:
+            for name, value in scope["headers"]:
+                if name.decode("latin-1") == self.client_header:
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+
+class LoadSheddingMiddleware:
+    """ASGI middleware rejecting requests with 429 or 503 before they reach the routes."""
+
+    def __init__(self, app, shedder: Optional[LoadShedder] = None):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.shedder = shedder or LoadShedder.from_env()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.shedder.enabled:
+            await self.app(scope, receive, send)
+            return
+        name = route_class(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        buckets = self.shedder.rate_limits.get(name)
+        if buckets is not None:
+            wait = buckets.take(self.shedder.client_id(scope), time.monotonic())
+            if wait:
+                await _reject(send, 429, "Rate limit exceeded", wait)
+                return
+
+        limiter = self.shedder.limiters.get(name)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        if not await limiter.acquire():
+            await _reject(send, 503, "Server is overloaded", limiter.target)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start, self.shedder.loop_lag.current())
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    """Send a JSON error with a Retry-After of whole seconds, at least one."""
+    body = b'{"detail":"%s"}' % detail.encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,61 @@
+"""Per-event locking for registration state changes."""
+
+import os
+import threading
+from typing import Callable, List, TypeVar
+
+from core.exceptions import ConcurrentModificationError
+
+
+T = TypeVar("T")
+
+# Attempts before a conditional write conflict is surfaced to the caller
+MAX_CONFLICT_ATTEMPTS = 5
+
+
+class EventLocks:
+    """Lock-striped mutexes keyed by eventId.
+
+    Each eventId hashes to one of a fixed number of stripes, so state
+    changes to the same event are serialized while unrelated events
+    rarely contend. Global mode maps every event to a single lock,
+    which is useful when debugging suspected concurrency issues.
+    """
+
+    def __init__(self, stripes: int = 64, global_mode: bool = False):
+        """Initialize the lock stripes."""
+        if stripes <= 0:
+            raise ValueError("stripes must be greater than zero")
+        count = 1 if global_mode else stripes
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(count)]
+        self.global_mode = global_mode
+    
+    @classmethod
+    def from_env(cls) -> "EventLocks":
+        """Build locks from EVENT_LOCK_MODE and EVENT_LOCK_STRIPES."""
+        mode = os.environ.get("EVENT_LOCK_MODE", "striped").lower()
+        if mode not in ("striped", "global"):
+            raise ValueError(f"Unknown EVENT_LOCK_MODE '{mode}'")
+        stripes = int(os.environ.get("EVENT_LOCK_STRIPES", "64"))
+        return cls(stripes=stripes, global_mode=mode == "global")
+    
+    def for_event(self, event_id: str) -> threading.Lock:
+        """Get the lock guarding an event's registration state."""
+        return self._locks[hash(event_id) % len(self._locks)]
+    
+    def run_atomically(self, event_id: str, operation: Callable[[], T]) -> T:
+        """Run an operation under the event's lock, retrying lost write races.
+        
+        The lock serializes requests within this process; persistent
+        repositories also use conditional writes and raise
+        ConcurrentModificationError when another process got there first,
+        in which case the operation re-reads the event and tries again.
+        """
+        for attempt in range(MAX_CONFLICT_ATTEMPTS):
+            try:
+                with self.for_event(event_id):
+                    return operation()
+            except ConcurrentModificationError:
+                if attempt == MAX_CONFLICT_ATTEMPTS - 1:
+                    raise
+        raise AssertionError("unreachable")
@@ -0,0 +1,261 @@
+"""In-process metrics: latency histograms, service timers and gauges.
+
+Observations are kept in fixed-bucket histograms keyed by metric name
+and labels. The registry renders them in the Prometheus text format
+for GET /metrics. Under Lambda, where each container only sees its own
+traffic, it can also emit them as CloudWatch embedded metric format
+(EMF) log lines after each invocation.
+
+Configuration:
+
+- METRICS_ENABLED (default true): set to false to skip recording
+- METRICS_EMF (default false): buffer observations for EMF log lines
+- METRICS_NAMESPACE (default UserRegistrationAPI): EMF namespace
+- METRICS_EMF_GAUGE_INTERVAL (default 60): seconds between EMF gauge
+  lines, 0 disables them (gauges may scan the events table)
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, covering in-memory calls through slow DynamoDB retries
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# EMF allows at most 100 values per metric in one log line
+_EMF_MAX_VALUES = 100
+
+_HELP = {
+    "http_request_duration_seconds": "HTTP request latency by route, method and status",
+    "service_method_duration_seconds": "Service method latency",
+    "events": "Number of events",
+    "registered_users": "Registered seats across all events",
+    "waitlisted_users": "Waitlist entries across all events",
+    "max_waitlist_depth": "Longest waitlist of any event",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _env_flag(name: str, default: str) -> bool:
+    """Read a true/false environment variable."""
+    return os.environ.get(name, default).lower() in ("1", "true", "yes")
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        """Initialize empty buckets, the last one catching overflow."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store of histograms plus gauges computed at collection time."""
+
+    def __init__(self, enabled: bool = True, emf: bool = False,
+                 namespace: str = "UserRegistrationAPI", emf_gauge_interval: float = 60.0):
+        """Initialize an empty registry."""
+        self.enabled = enabled
+        self.emf = emf
+        self.namespace = namespace
+        self.emf_gauge_interval = emf_gauge_interval
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._gauge_sources: List[Callable[[], Dict[str, float]]] = []
+        self._emf_pending: Dict[Tuple[str, Labels], List[float]] = {}
+        self._last_emf_gauges = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "MetricsRegistry":
+        """Build a registry configured by the METRICS_* environment variables."""
+        return cls(
+            enabled=_env_flag("METRICS_ENABLED", "true"),
+            emf=_env_flag("METRICS_EMF", "false"),
+            namespace=os.environ.get("METRICS_NAMESPACE", "UserRegistrationAPI"),
+            emf_gauge_interval=float(os.environ.get("METRICS_EMF_GAUGE_INTERVAL", "60")),
+        )
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value in the histogram for a metric name and labels."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+            if self.emf:
+                self._emf_pending.setdefault(key, []).append(value)
+
+    def register_gauges(self, source: Callable[[], Dict[str, float]]) -> None:
+        """Add a callback returning gauge values, called on each collection."""
+        self._gauge_sources.append(source)
+
+    def collect_gauges(self) -> Dict[str, float]:
+        """Compute current gauge values from every registered source."""
+        gauges: Dict[str, float] = {}
+        for source in self._gauge_sources:
+            gauges.update(source())
+        return gauges
+
+    def reset(self) -> None:
+        """Drop all recorded observations."""
+        with self._lock:
+            self._histograms.clear()
+            self._emf_pending.clear()
+
+    def render_prometheus(self) -> str:
+        """Render histograms and gauges in the Prometheus text exposition format."""
+        with self._lock:
+            snapshot = [
+                (name, labels, list(h.counts), h.sum, h.count)
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        lines: List[str] = []
+        current = None
+        for name, labels, counts, total, count in snapshot:
+            if name != current:
+                current = name
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS + (float("inf"),), counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        for name, value in self.collect_gauges().items():
+            lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def drain_emf(self) -> List[str]:
+        """Return EMF log lines for observations since the last drain.
+
+        Gauges are included at most once per emf_gauge_interval seconds.
+        """
+        with self._lock:
+            pending, self._emf_pending = self._emf_pending, {}
+        timestamp = int(time.time() * 1000)
+        lines = []
+        for (name, labels), values in pending.items():
+            for start in range(0, len(values), _EMF_MAX_VALUES):
+                record = dict(labels)
+                record[name] = values[start:start + _EMF_MAX_VALUES]
+                record["_aws"] = {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [{
+                        "Namespace": self.namespace,
+                        "Dimensions": [[key for key, _ in labels]],
+                        "Metrics": [{"Name": name, "Unit": "Seconds"}],
+                    }],
+                }
+                lines.append(json.dumps(record, separators=(",", ":")))
+        now = time.monotonic()
+        if self.emf_gauge_interval and now - self._last_emf_gauges >= self.emf_gauge_interval:
+            self._last_emf_gauges = now
+            gauges = self.collect_gauges()
+            if gauges:
+                record = dict(gauges)
+                record["_aws"] = {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [{
+                        "Namespace": self.namespace,
+                        "Dimensions": [[]],
+                        "Metrics": [{"Name": name, "Unit": "Count"} for name in gauges],
+                    }],
+                }
+                lines.append(json.dumps(record, separators=(",", ":")))
+        return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    """Format labels as a Prometheus label set."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+# Process-wide registry shared by the middleware, service timers and /metrics
+metrics = MetricsRegistry.from_env()
+
+
+def timed(func: Callable) -> Callable:
+    """Decorator recording a service method's latency, including failures."""
+    method = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not metrics.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe(
+                "service_method_duration_seconds", time.perf_counter() - start, method=method
+            )
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template, method and status.
+
+    Routes are labelled by their path template (e.g. /events/{eventId})
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route on the shared scope
+            route = scope.get("route")
+            self.registry.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - start,
+                route=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=str(status),
+            )
@@ -0,0 +1,27 @@
+"""Opaque cursor encoding for paginated endpoints."""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from core.exceptions import ValidationError
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(position: Any) -> str:
+    """Encode a JSON-serializable resume position as an opaque cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Decode a cursor produced by encode_cursor, raises ValidationError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValidationError("cursor is invalid") from None
@@ -0,0 +1,508 @@
+"""Write-ahead log and snapshot persistence for the in-memory repositories.
+
+Durable repositories wrap each mutation in DurableStore.mutation(),
+which applies it and appends a compact binary record to the current log
+file. Changes to one event are ordered by the per-event lock callers
+already hold, so mutations of different events apply in parallel and
+only the append is serialized. Creations are the exception: they are
+applied and logged under the store lock, so nothing that depends on a
+new user or event can reach the log before it does. The fsync policy
+decides when a record is durable:
+
+- always: the request waits for an fsync. Concurrent requests share one
+  fsync (group commit), so throughput scales with concurrency rather
+  than with disk flush latency.
+- interval: a background thread fsyncs every few milliseconds, so a
+  power loss may lose the last interval. Records still reach the OS
+  immediately and survive a process crash.
+- none: the OS decides when to flush.
+
+Every `snapshot_every` records a snapshot of all repositories is
+written and the log rotates. A snapshot is a flat file of typed arrays
+over one interned string table. Restoring one memory-maps the file and
+rebuilds registrant lists with C-level bulk operations, so the Python
+work grows with the number of events and users, not with the number of
+registrations.
+
+Files in the directory are `snapshot-<gen>.bin` and `wal-<gen>.log`.
+Snapshot g contains everything logged in generations below g. Recovery
+loads the newest snapshot and then replays logs from its generation
+onwards. A torn record at the end of a log, left by a crash mid-write,
+ends replay of that file.
+"""
+
+import gc
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager, nullcontext
+from itertools import accumulate
+from sys import intern
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Log record opcodes
+USER_CREATED = 1
+EVENT_CREATED = 2
+EVENT_UPDATED = 3
+REGISTERED = 4
+UNREGISTERED = 5
+WAITLISTED = 6
+UNWAITLISTED = 7
+SEAT_RELEASED = 8
+CAPACITY_CHANGED = 9
+OFFER_HELD = 10
+OFFER_CONFIRMED = 11
+
+FSYNC_POLICIES = ("always", "interval", "none")
+
+# Record: body length and CRC32, then opcode byte and length-prefixed UTF-8 fields
+_RECORD_HEADER = struct.Struct("<II")
+_FIELD_LENGTH = struct.Struct("<I")
+
+# Snapshot: magic, generation and CRC32 of the rest, then length-prefixed chunks
+_SNAPSHOT_MAGIC = b"REGSNAP1"
+_SNAPSHOT_HEADER = struct.Struct("<QI")
+_CHUNK_LENGTH = struct.Struct("<Q")
+
+_FILE_PATTERN = re.compile(r"^(wal|snapshot)-(\d+)\.(log|bin)$")
+
+Field = Union[str, bytes]
+
+
+def encode_record(opcode: int, fields: Sequence[Field]) -> bytes:
+    """Encode one log record."""
+    parts = [bytes((opcode,))]
+    for field in fields:
+        data = field.encode() if isinstance(field, str) else field
+        parts.append(_FIELD_LENGTH.pack(len(data)))
+        parts.append(data)
+    body = b"".join(parts)
+    return _RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def read_log(path: str) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (opcode, fields) from a log file, stopping at a torn or corrupt record."""
+    with open(path, "rb") as log:
+        data = log.read()
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        length, crc = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        body = data[start:start + length]
+        if len(body) < length or zlib.crc32(body) != crc:
+            return
+        fields = []
+        position = 1
+        while position < length:
+            (size,) = _FIELD_LENGTH.unpack_from(body, position)
+            position += _FIELD_LENGTH.size
+            fields.append(body[position:position + size].decode())
+            position += size
+        yield body[0], fields
+        offset = start + length
+
+
+class WriteAheadLog:
+    """Append-only record file with a configurable fsync policy."""
+
+    def __init__(self, path: str, fsync: str = "always", interval: float = 0.01):
+        """Open the log for appending and start the fsync thread if needed."""
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'")
+        self.path = path
+        self._fsync = fsync
+        # Unbuffered, so every append reaches the OS and survives a process crash
+        self._file = open(path, "ab", buffering=0)
+        self._appended = 0
+        self._durable = 0
+        self._sync_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        if fsync == "interval":
+            self._thread = threading.Thread(target=self._sync_periodically, args=(interval,), daemon=True)
+            self._thread.start()
+
+    def append(self, record: bytes) -> int:
+        """Write a record, returning its sequence number; callers serialize appends."""
+        self._file.write(record)
+        self._appended += 1
+        return self._appended
+
+    def commit(self, lsn: int) -> None:
+        """Wait until a record is durable, as far as the fsync policy requires."""
+        if self._fsync == "always":
+            self.sync(lsn)
+
+    def sync(self, lsn: Optional[int] = None) -> None:
+        """Fsync until at least lsn (default: everything appended) is durable.
+
+        Whoever holds the sync lock fsyncs every record appended so far,
+        so callers queued behind it usually find their record already
+        covered and return without another fsync.
+        """
+        target = self._appended if lsn is None else lsn
+        if self._durable >= target:
+            return
+        with self._sync_lock:
+            if self._durable >= target:
+                return
+            covered = self._appended
+            os.fsync(self._file.fileno())
+            self._durable = covered
+
+    def close(self) -> None:
+        """Make every appended record durable and close the file."""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sync()
+        self._file.close()
+
+    def _sync_periodically(self, interval: float) -> None:
+        """Fsync on a fixed interval until closed."""
+        while not self._closed.wait(interval):
+            self.sync()
+
+
+class SnapshotWriter:
+    """Builds a snapshot from typed chunks that share one string table."""
+
+    def __init__(self):
+        """Initialize an empty string table and chunk list."""
+        self._strings: Dict[str, int] = {}
+        self._chunks: List[bytes] = []
+
+    def write_strings(self, values: Sequence[str]) -> None:
+        """Add a chunk of strings, stored as indexes into the string table."""
+        table = self._strings
+        setdefault = table.setdefault
+        self._chunks.append(array("I", [setdefault(value, len(table)) for value in values]).tobytes())
+
+    def write_ints(self, values: Sequence[int]) -> None:
+        """Add a chunk of signed 64-bit integers."""
+        self._chunks.append(array("q", values).tobytes())
+
+    def write_bytes(self, value: bytes) -> None:
+        """Add an opaque chunk, e.g. models serialized to JSON."""
+        self._chunks.append(value)
+
+    def to_bytes(self, generation: int) -> bytes:
+        """Encode the snapshot file contents."""
+        strings = list(self._strings)
+        lengths = array("I", map(len, strings)).tobytes()
+        chunks = [lengths, "".join(strings).encode()] + self._chunks
+        payload = b"".join(
+            part for chunk in chunks for part in (_CHUNK_LENGTH.pack(len(chunk)), chunk)
+        )
+        return _SNAPSHOT_MAGIC + _SNAPSHOT_HEADER.pack(generation, zlib.crc32(payload)) + payload
+
+
+class SnapshotReader:
+    """Reads the chunks of a memory-mapped snapshot in the order they were written."""
+
+    def __init__(self, path: str):
+        """Map the file, verify it, and decode the string table."""
+        with open(path, "rb") as snapshot:
+            self._map = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        header_end = len(_SNAPSHOT_MAGIC) + _SNAPSHOT_HEADER.size
+        if bytes(self._view[:len(_SNAPSHOT_MAGIC)]) != _SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot")
+        self.generation, crc = _SNAPSHOT_HEADER.unpack_from(self._map, len(_SNAPSHOT_MAGIC))
+        if zlib.crc32(self._view[header_end:]) != crc:
+            self.close()
+            raise ValueError(f"{path} is corrupt")
+        self._offset = header_end
+
+        lengths = array("I")
+        lengths.frombytes(self._next_chunk())
+        text = str(self._next_chunk(), "utf-8")
+        ends = list(accumulate(lengths))
+        # Interned so ids restored into several lists and indexes share one object
+        self._strings = list(map(intern, map(text.__getitem__, map(slice, [0] + ends[:-1], ends))))
+
+    def read_strings(self) -> List[str]:
+        """Read the next chunk of strings."""
+        indexes = array("I")
+        indexes.frombytes(self._next_chunk())
+        return list(map(self._strings.__getitem__, indexes))
+
+    def read_ints(self) -> Sequence[int]:
+        """Read the next chunk of integers, as an int64 array."""
+        values = array("q")
+        values.frombytes(self._next_chunk())
+        return values
+
+    def read_bytes(self) -> bytes:
+        """Read the next opaque chunk."""
+        return bytes(self._next_chunk())
+
+    def at_end(self) -> bool:
+        """Whether every chunk has been read, e.g. when a snapshot predates chunks added since."""
+        return self._offset >= len(self._map)
+
+    def close(self) -> None:
+        """Release the mapping."""
+        self._view.release()
+        self._map.close()
+
+    def _next_chunk(self) -> memoryview:
+        """Get a view of the next chunk and advance past it."""
+        (length,) = _CHUNK_LENGTH.unpack_from(self._map, self._offset)
+        start = self._offset + _CHUNK_LENGTH.size
+        self._offset = start + length
+        return self._view[start:start + length]
+
+
+class DurableStore:
+    """Write-ahead log and snapshots shared by a set of durable repositories.
+
+    Participants provide OPCODES, replay(opcode, fields),
+    dump_snapshot(writer) and load_snapshot(reader). Attach every
+    participant, then call recover() before serving requests.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync: str = "always",
+        fsync_interval: float = 0.01,
+        snapshot_every: int = 100_000
+    ):
+        """Initialize the store over a data directory."""
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._snapshot_every = snapshot_every
+        self._participants: List[Any] = []
+        self._handlers: Dict[int, Callable[[int, List[str]], None]] = {}
+        self._wal: Optional[WriteAheadLog] = None
+        self._generation = 0
+        self._since_snapshot = 0
+        self._replaying = False
+        # Serializes log appends, creations, and log rotation; creations re-enter it to append
+        self._lock = threading.RLock()
+        # Snapshots wait for mutations in flight and hold off new ones
+        self._gate = threading.Condition()
+        self._in_flight = 0
+        self._capturing = False
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._local = threading.local()
+
+    @property
+    def blocking_io(self) -> bool:
+        """Whether mutations wait for an fsync before returning."""
+        return self._fsync == "always"
+
+    @classmethod
+    def from_env(cls) -> "DurableStore":
+        """Build a store configured by the PERSISTENCE_* environment variables."""
+        return cls(
+            os.environ["PERSISTENCE_DIR"],
+            fsync=os.environ.get("PERSISTENCE_FSYNC", "always").lower(),
+            fsync_interval=int(os.environ.get("PERSISTENCE_FSYNC_INTERVAL_MS", "10")) / 1000,
+            snapshot_every=int(os.environ.get("PERSISTENCE_SNAPSHOT_EVERY", "100000")),
+        )
+
+    def attach(self, participant: Any) -> None:
+        """Register a repository whose state this store persists."""
+        self._participants.append(participant)
+        for opcode in participant.OPCODES:
+            self._handlers[opcode] = participant.replay
+
+    def recover(self) -> Dict[str, int]:
+        """Load the newest snapshot, replay newer logs, and open a fresh log.
+
+        Returns the snapshot generation loaded (0 for none) and the
+        number of log records replayed.
+        """
+        files = self._list_files()
+        snapshots = sorted(gen for kind, gen in files if kind == "snapshot")
+        base = snapshots[-1] if snapshots else 0
+        replayed = 0
+        self._replaying = True
+        # Restoring allocates millions of long-lived objects; collections would only rescan them
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if base:
+                reader = SnapshotReader(self._path("snapshot", base))
+                try:
+                    for participant in self._participants:
+                        participant.load_snapshot(reader)
+                finally:
+                    reader.close()
+            for gen in sorted(gen for kind, gen in files if kind == "wal" and gen >= base):
+                for opcode, fields in read_log(self._path("wal", gen)):
+                    self._handlers[opcode](opcode, fields)
+                    replayed += 1
+        finally:
+            self._replaying = False
+            if gc_was_enabled:
+                gc.enable()
+        self._generation = max([gen for _, gen in files] + [0]) + 1
+        self._wal = WriteAheadLog(self._path("wal", self._generation), self._fsync, self._fsync_interval)
+        self._since_snapshot = replayed
+        return {"snapshot": base, "replayed": replayed}
+
+    @contextmanager
+    def mutation(self, opcode: int, *fields: Field, creates: bool = False) -> Iterator[None]:
+        """Apply the enclosed mutation and log it as one record.
+
+        Callers hold the lock of the event they change, which orders
+        its records; mutations that create a user or event pass
+        creates=True instead and are applied under the store lock.
+        Mutations nested inside another, such as the removal and
+        promotion that make up a seat release, are covered by the outer
+        record. Nothing is logged while recovering or if the mutation
+        raises.
+        """
+        if self._replaying or getattr(self._local, "active", False):
+            yield
+            return
+        with self._gate:
+            while self._capturing:
+                self._gate.wait()
+            self._in_flight += 1
+        try:
+            with self._lock if creates else nullcontext():
+                self._local.active = True
+                try:
+                    yield
+                finally:
+                    self._local.active = False
+                with self._lock:
+                    wal = self._wal
+                    lsn = wal.append(encode_record(opcode, fields))
+                    self._since_snapshot += 1
+                    snapshot_due = self._since_snapshot >= self._snapshot_every
+        finally:
+            with self._gate:
+                self._in_flight -= 1
+                if not self._in_flight:
+                    self._gate.notify_all()
+        if getattr(self._local, "deferred", None) is not None:
+            self._local.deferred.append((wal, lsn))
+        else:
+            wal.commit(lsn)
+        if snapshot_due:
+            self._start_background_snapshot()
+
+    @contextmanager
+    def group_commit(self) -> Iterator[None]:
+        """Defer the commit waits of enclosed mutations to one wait on exit.
+
+        A thread applying many mutations in a row, such as a batch of
+        registrations, then pays for one fsync instead of one each.
+        Nested calls join the outermost group.
+        """
+        if getattr(self._local, "deferred", None) is not None:
+            yield
+            return
+        self._local.deferred = []
+        try:
+            yield
+        finally:
+            deferred, self._local.deferred = self._local.deferred, None
+            # Only the newest record per log needs waiting for; a rotated log syncs on close
+            latest: Dict[int, Tuple[WriteAheadLog, int]] = {}
+            for wal, lsn in deferred:
+                latest[id(wal)] = (wal, lsn)
+            for wal, lsn in latest.values():
+                wal.commit(lsn)
+
+    def snapshot(self) -> str:
+        """Write a snapshot of every participant and rotate the log.
+
+        Writers are blocked while state is captured; encoding and
+        writing the file happen after they resume. Returns the path.
+        """
+        with self._snapshot_lock:
+            # Every applied mutation must be logged before the log rotates
+            with self._gate:
+                self._capturing = True
+                while self._in_flight:
+                    self._gate.wait()
+            try:
+                writer = SnapshotWriter()
+                for participant in self._participants:
+                    participant.dump_snapshot(writer)
+                with self._lock:
+                    previous = self._wal
+                    self._generation += 1
+                    generation = self._generation
+                    self._wal = WriteAheadLog(
+                        self._path("wal", generation), self._fsync, self._fsync_interval
+                    )
+                    self._since_snapshot = 0
+            finally:
+                with self._gate:
+                    self._capturing = False
+                    self._gate.notify_all()
+            previous.close()
+
+            path = self._path("snapshot", generation)
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as snapshot:
+                snapshot.write(writer.to_bytes(generation))
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temporary, path)
+            self._fsync_directory()
+            for kind, gen in self._list_files():
+                if gen < generation:
+                    os.remove(self._path(kind, gen))
+            return path
+
+    def sync(self) -> None:
+        """Fsync everything logged so far, regardless of policy."""
+        self._wal.sync()
+
+    def close(self) -> None:
+        """Wait for a running snapshot, then sync and close the log."""
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        self._wal.close()
+
+    def _start_background_snapshot(self) -> None:
+        """Snapshot on a background thread unless one is already running."""
+        with self._lock:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                return
+            self._snapshot_thread = threading.Thread(target=self.snapshot, daemon=True)
+            self._snapshot_thread.start()
+
+    def _path(self, kind: str, generation: int) -> str:
+        """Get the path of a log or snapshot file."""
+        extension = "log" if kind == "wal" else "bin"
+        return os.path.join(self._directory, f"{kind}-{generation:010d}.{extension}")
+
+    def _list_files(self) -> List[Tuple[str, int]]:
+        """List (kind, generation) for log and snapshot files, removing stale temporaries."""
+        files = []
+        for name in os.listdir(self._directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self._directory, name))
+                continue
+            match = _FILE_PATTERN.match(name)
+            if match:
+                files.append((match.group(1), int(match.group(2))))
+        return files
+
+    def _fsync_directory(self) -> None:
+        """Make renames and new files in the directory durable."""
+        descriptor = os.open(self._directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
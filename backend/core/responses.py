@@ -0,0 +1,64 @@
+"""Response classes for the API."""
+
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response serialized straight to bytes by pydantic-core.
+    
+    Accepts stored models, and dicts or lists containing them, and
+    renders them with each model's compiled serializer. Returning this
+    from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass; output is byte-identical to JSONResponse.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        """Serialize content to compact UTF-8 JSON."""
+        return to_json(content)
+
+
+async def route_status_code(request: Request) -> int:
+    """Dependency giving the status code declared on the matched route.
+    
+    Routes that return a response directly bypass the decorator's
+    status_code, so handlers registered under several paths with
+    different codes use this to pick the right one. Async, so
+    resolving it does not take a threadpool hop.
+    """
+    route = request.scope.get("route")
+    return getattr(route, "status_code", None) or 200
+
+
+class _EventStreamAwareGZipResponder(GZipResponder):
+    """GZip responder that passes text/event-stream responses through unchanged."""
+    
+    async def send_with_gzip(self, message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith("text/event-stream"):
+                # Treated like an already-encoded body: forwarded as is
+                self.content_encoding_set = True
+
+
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves server-sent event streams uncompressed.
+    
+    The compressor holds back small writes until enough bytes pile up,
+    which would stall each event until many more had been sent.
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = _EventStreamAwareGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,285 @@
+"""Shared state for serving the API from several worker processes.
+
+Repositories live in process memory, so `uvicorn --workers N` would
+give every worker its own diverging users and events. In multi-worker
+mode one state process owns the repositories and services instead, and
+workers forward each service call to it over a Unix socket: the route
+handler's arguments go one way, the service's result or domain
+exception comes back. Every state change still runs in one process
+under the same per-event locks, so capacity and waitlist invariants
+hold exactly as with a single process. Workers keep the HTTP parsing,
+validation, serialization and compression, which is most of a
+request's CPU time, so throughput scales with workers until the state
+process's own core is saturated.
+
+The state process also forwards every change published on its change
+feed to each worker, which republishes it to its own streams. Stream
+event ids are per worker, so a client that reconnects to another
+worker gets a reset event.
+
+Workers authenticate with a shared key, and the socket lives in a
+directory only the owner can access.
+
+Run from the backend directory:
+
+    python -m core.state_server --workers 4 --port 8000
+
+which starts the state server in this process and uvicorn with four
+workers pointed at it. With gunicorn or another process manager, run
+`python -m core.state_server --address PATH` on its own and give the
+workers its address and key.
+
+Configuration:
+
+- STATE_SERVER_ADDRESS: path of the state server's Unix socket; when
+  set, the process is a worker that forwards service calls there
+- STATE_SERVER_AUTHKEY: hex-encoded key shared by server and workers
+- STATE_FEED_BACKLOG (default 10000): changes queued for a worker's
+  feed before it is considered stuck and disconnected; it reconnects,
+  but its open streams miss the changes in between
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import queue
+import secrets
+import tempfile
+import threading
+import time
+from functools import partial
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.change_feed import ChangeFeed
+
+logger = logging.getLogger(__name__)
+
+# First message on a connection that carries change feed updates instead of calls
+_FEED_HELLO = ("feed",)
+
+# Seconds between reconnection attempts of a worker's feed follower
+_FEED_RETRY_SECONDS = 1.0
+
+
+class StateServer:
+    """Serves service calls and change feed updates to worker processes."""
+
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        services: Dict[str, Any],
+        feed: ChangeFeed,
+        feed_backlog: int = 10000
+    ):
+        """Initialize the server; call start() to accept workers."""
+        self.address = address
+        self._authkey = authkey
+        self._services = services
+        self._feed_backlog = feed_backlog
+        self._followers: Dict[Connection, "queue.Queue[Optional[Tuple[str, str, bytes]]]"] = {}
+        self._followers_lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._closed = False
+        feed.add_listener(self._forward)
+
+    def start(self) -> None:
+        """Listen on the socket and accept workers in a background thread."""
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self._authkey)
+        threading.Thread(target=self._accept, name="state-accept", daemon=True).start()
+
+    def close(self) -> None:
+        """Stop accepting workers and remove the socket."""
+        self._closed = True
+        if self._listener is not None:
+            self._listener.close()
+
+    def _accept(self) -> None:
+        """Hand each authenticated connection to its own thread."""
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                # Closed, or a client failed authentication
+                if self._closed:
+                    return
+                continue
+            threading.Thread(target=self._serve, args=(conn,), name="state-conn", daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        """Answer one worker thread's calls until it disconnects."""
+        try:
+            message = conn.recv()
+            if message == _FEED_HELLO:
+                self._follow(conn)
+                return
+            while True:
+                reply = self._call(*message)
+                try:
+                    conn.send(reply)
+                except (pickle.PicklingError, TypeError, AttributeError) as e:
+                    # The result or exception could not be pickled
+                    conn.send(("error", RuntimeError(f"Unsendable reply: {e}")))
+                message = conn.recv()
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _call(self, service: str, method: str, args: tuple) -> Tuple[str, Any]:
+        """Run one service call, returning ("ok", result) or ("error", exception)."""
+        target = self._services.get(service)
+        if target is None or method.startswith("_") or not callable(getattr(target, method, None)):
+            return "error", AttributeError(f"Unknown service call {service}.{method}")
+        try:
+            return "ok", getattr(target, method)(*args)
+        except Exception as e:
+            return "error", e
+
+    def _follow(self, conn: Connection) -> None:
+        """Stream change feed updates to a worker until it disconnects or falls behind."""
+        updates: "queue.Queue[Optional[Tuple[str, str, bytes]]]" = queue.Queue(self._feed_backlog)
+        with self._followers_lock:
+            self._followers[conn] = updates
+        try:
+            while True:
+                update = updates.get()
+                if update is None:
+                    logger.warning("Disconnecting a worker's change feed that fell behind")
+                    return
+                conn.send(update)
+        finally:
+            with self._followers_lock:
+                self._followers.pop(conn, None)
+
+    def _forward(self, topic: str, kind: str, body: bytes) -> None:
+        """Queue a published change for every worker, never blocking the publisher."""
+        with self._followers_lock:
+            for conn, updates in list(self._followers.items()):
+                try:
+                    updates.put_nowait((topic, kind, body))
+                except queue.Full:
+                    # Drop its backlog and stop it; nothing else is queued for it after this
+                    del self._followers[conn]
+                    while True:
+                        try:
+                            updates.get_nowait()
+                        except queue.Empty:
+                            break
+                    updates.put_nowait(None)
+
+
+class StateClient:
+    """Forwards service calls to a state server, one connection per thread."""
+
+    def __init__(self, address: str, authkey: bytes):
+        """Initialize the client; connections are opened on first use."""
+        self._address = address
+        self._authkey = authkey
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> Optional["StateClient"]:
+        """Build a client from STATE_SERVER_ADDRESS, or None when not a worker."""
+        address = os.environ.get("STATE_SERVER_ADDRESS")
+        if not address:
+            return None
+        return cls(address, bytes.fromhex(os.environ["STATE_SERVER_AUTHKEY"]))
+
+    def call(self, service: str, method: str, *args: Any) -> Any:
+        """Call a service method in the state process, re-raising its exception."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self._address, family="AF_UNIX", authkey=self._authkey)
+        try:
+            conn.send((service, method, args))
+            status, value = conn.recv()
+        except (EOFError, OSError):
+            # The call may or may not have run, so it is not retried
+            self._local.conn = None
+            conn.close()
+            raise
+        if status == "error":
+            raise value
+        return value
+
+    def follow_feed(self, feed: ChangeFeed) -> None:
+        """Republish the state process's changes on a local feed from a background thread."""
+        threading.Thread(target=self._follow, args=(feed,), name="state-feed", daemon=True).start()
+
+    def _follow(self, feed: ChangeFeed) -> None:
+        """Receive changes for the life of the process, reconnecting if the server drops us."""
+        while True:
+            try:
+                with Client(self._address, family="AF_UNIX", authkey=self._authkey) as conn:
+                    conn.send(_FEED_HELLO)
+                    while True:
+                        feed.publish_serialized(*conn.recv())
+            except (EOFError, OSError):
+                time.sleep(_FEED_RETRY_SECONDS)
+
+
+class RemoteService:
+    """Stands in for a service, forwarding its public methods to the state process."""
+
+    def __init__(self, client: StateClient, name: str):
+        """Initialize the proxy for the service registered under name."""
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method: str) -> Callable[..., Any]:
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return partial(self._client.call, self._name, method)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the state server, and optionally uvicorn workers using it.")
+    parser.add_argument("--address", help="socket path; default is a new private directory")
+    parser.add_argument("--workers", type=int, default=0, help="uvicorn workers to start; 0 serves workers started elsewhere")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if os.environ.get("STATE_SERVER_ADDRESS"):
+        parser.error("STATE_SERVER_ADDRESS is set; the state server must own the repositories")
+    # Imported here so workers importing this module do not build services
+    import core.dependencies as dependencies
+    from core.change_feed import change_feed
+
+    authkey = os.environ.get("STATE_SERVER_AUTHKEY")
+    if not authkey:
+        if not args.workers:
+            parser.error("set STATE_SERVER_AUTHKEY so separately started workers can share it")
+        authkey = secrets.token_hex(32)
+    address = args.address or os.path.join(tempfile.mkdtemp(prefix="registrations-"), "state.sock")
+    services = {
+        "users": dependencies.get_user_service(),
+        "events": dependencies.get_event_service(),
+        "registrations": dependencies.get_registration_service(),
+        "admin": dependencies.get_admin_service(),
+    }
+    server = StateServer(
+        address, bytes.fromhex(authkey), services, change_feed,
+        feed_backlog=int(os.environ.get("STATE_FEED_BACKLOG", "10000")),
+    )
+    server.start()
+    logging.basicConfig(level=logging.INFO)
+    logger.info("State server listening on %s", address)
+    try:
+        if args.workers:
+            import uvicorn
+            # Inherited by the worker processes uvicorn spawns
+            os.environ.update(STATE_SERVER_ADDRESS=address, STATE_SERVER_AUTHKEY=authkey)
+            uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+        else:
+            logger.info("Start workers with STATE_SERVER_ADDRESS=%s and the same STATE_SERVER_AUTHKEY", address)
+            threading.Event().wait()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Hierarchical timer wheel for large numbers of deadlines.
+
+A TimerWheel holds keyed deadlines and reports the ones that have
+passed as time advances. Time is divided into ticks of a fixed length,
+and timers are kept in levels of 64 slots:
+
+- level 0 has one slot per tick for the next 64 ticks
+- level 1 has one slot per 64 ticks for the next 4096 ticks
+- and so on, each level 64 times coarser than the one below
+
+Scheduling or cancelling a timer is O(1). Advancing one tick looks at
+one level 0 slot; every 64 ticks the next level 1 slot is cascaded,
+i.e. its timers are moved into the finer levels, and likewise for
+higher levels. Each timer moves at most once per level, so advancing
+costs O(1) per tick plus O(1) per timer fired, however many timers
+are pending, and never scans them. Ticks before the next cascade are
+skipped while the finer levels are empty, so a long jump, e.g. after a
+restart, does not visit every tick. Timers beyond the top level's range
+wait in its slots and are placed again whenever they are cascaded.
+
+The wheel has no clock of its own: callers pass times in and decide
+when to advance, so it behaves the same under a fake clock. It is not
+thread-safe.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Slots per level, as a power of two
+_SLOT_BITS = 6
+_SLOTS = 1 << _SLOT_BITS
+_SLOT_MASK = _SLOTS - 1
+
+
+class TimerWheel:
+    """Keyed deadlines in hierarchical slots, fired in tick order."""
+
+    def __init__(self, tick: float = 1.0, start: float = 0.0, levels: int = 4):
+        """Initialize an empty wheel at time start; tick is the resolution, in the callers' time unit."""
+        if tick <= 0:
+            raise ValueError("tick must be greater than zero")
+        self.tick = tick
+        # Every timer due at or before this tick has fired
+        self._current = math.floor(start / tick)
+        # slot: key -> (due tick, deadline)
+        self._levels: List[List[Dict[Hashable, Tuple[int, float]]]] = [
+            [{} for _ in range(_SLOTS)] for _ in range(levels)
+        ]
+        # key -> (level, slot) holding its timer
+        self._slots: Dict[Hashable, Tuple[int, Dict[Hashable, Tuple[int, float]]]] = {}
+        self._counts = [0] * levels
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Fire key once deadline has passed, replacing any timer it already has.
+
+        Timers fire at tick granularity, on the first advance into a tick
+        at or after the deadline's. A deadline at or before the current
+        tick therefore fires once time reaches the next tick, not on an
+        advance that stays within the current one.
+        """
+        self.cancel(key)
+        due = max(math.ceil(deadline / self.tick), self._current + 1)
+        self._place(key, due, deadline)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop key's timer; returns whether it had one."""
+        place = self._slots.pop(key, None)
+        if place is None:
+            return False
+        level, slot = place
+        del slot[key]
+        self._counts[level] -= 1
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, float]]:
+        """Move time forward to now, returning the (key, deadline) of each timer that fired.
+
+        Timers fire in tick order; within a tick the order is unspecified.
+        """
+        target = math.floor(now / self.tick)
+        fired: List[Tuple[Hashable, float]] = []
+        levels = self._levels
+        while self._current < target:
+            if not self._slots:
+                # Nothing pending, so the ticks in between need no visits
+                self._current = target
+                break
+            lowest = next(level for level, count in enumerate(self._counts) if count)
+            if lowest:
+                # Finer levels are empty until the lowest occupied one next cascades
+                span = 1 << (_SLOT_BITS * lowest)
+                skip_to = min(target, (self._current // span + 1) * span - 1)
+                if skip_to > self._current:
+                    self._current = skip_to
+                    continue
+            tick = self._current + 1
+            # Cascade coarser slots whose span starts at this tick, highest first
+            level = 1
+            while level < len(levels) and tick & ((1 << (_SLOT_BITS * level)) - 1) == 0:
+                level += 1
+            for level in range(level - 1, 0, -1):
+                slot = levels[level][(tick >> (_SLOT_BITS * level)) & _SLOT_MASK]
+                if slot:
+                    timers = list(slot.items())
+                    slot.clear()
+                    self._counts[level] -= len(timers)
+                    for key, (due, deadline) in timers:
+                        self._place(key, due, deadline, tick)
+            self._current = tick
+            slot = levels[0][tick & _SLOT_MASK]
+            if slot:
+                for key, (_, deadline) in slot.items():
+                    del self._slots[key]
+                    fired.append((key, deadline))
+                self._counts[0] -= len(slot)
+                slot.clear()
+        return fired
+
+    def _place(self, key: Hashable, due: int, deadline: float, current: Optional[int] = None) -> None:
+        """Put a timer in the finest level whose range covers it, relative to current."""
+        if current is None:
+            current = self._current
+        delta = due - current
+        top = len(self._levels) - 1
+        level = 0
+        while level < top and delta >= 1 << (_SLOT_BITS * (level + 1)):
+            level += 1
+        slot = self._levels[level][(due >> (_SLOT_BITS * level)) & _SLOT_MASK]
+        slot[key] = (due, deadline)
+        self._slots[key] = (level, slot)
+        self._counts[level] += 1
@@ -0,0 +1,32 @@
+"""Admin API routes."""
+
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.responses import StreamingResponse
+from .service import AsyncAdminService
+from core.dependencies import get_async_admin_service
+from core.exceptions import ValidationError
+from core.responses import FastJSONResponse
+
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_state(service: AsyncAdminService = Depends(get_async_admin_service)) -> StreamingResponse:
+    """Stream all users, events and registrations as NDJSON."""
+    return StreamingResponse(service.export(), media_type="application/x-ndjson")
+
+
+@router.post("/import", status_code=status.HTTP_200_OK)
+async def import_state(
+    request: Request,
+    service: AsyncAdminService = Depends(get_async_admin_service)
+) -> FastJSONResponse:
+    """Load users, events and registrations from an NDJSON export, skipping existing ones."""
+    try:
+        return FastJSONResponse(await service.import_stream(request.stream()))
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
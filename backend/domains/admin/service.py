@@ -0,0 +1,212 @@
+"""Admin service for bulk export and import of all state as NDJSON.
+
+An export is one JSON object per line: every user, then every event
+with its registered list and waitlist in order.
+
+    {"type":"user","userId":"u1","name":"Ada"}
+    {"type":"event","eventId":"e1","capacity":1,"hasWaitlist":true,"registered":["u1"],"waitlist":["u2"]}
+
+It is produced a chunk of users or events at a time, so memory does
+not grow with the total state. It is not a point-in-time snapshot:
+each event is consistent, but changes made during the export may be
+missed, and events created during it are included.
+
+An import reads the same format incrementally and loads each record
+straight into the repositories, in batches that are persisted with a
+single group commit. Records already present are skipped, so a failed
+import can be retried with the same file. Each event is checked
+before it is loaded: its settings pass the checks of a created event
+(positive capacity and offer hold time), registered users fit within
+it, a waitlist only exists on a full event that has one, and every
+registrant is a known user listed once.
+"""
+
+import json
+from itertools import chain
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from domains.events.models import Event
+from domains.events.repository import EventRepository
+from domains.events.service import check_event_settings
+from domains.users.models import User
+from domains.users.repository import UserRepository
+from core.async_support import ServiceRunner
+from core.exceptions import ValidationError
+from core.locking import EventLocks
+from core.metrics import timed
+
+# Records per export chunk; event records carry their registrants
+EXPORT_USER_CHUNK = 1000
+EXPORT_EVENT_CHUNK = 10
+
+# Import lines handed to the service per call, whichever limit is hit first
+IMPORT_BATCH_LINES = 1000
+IMPORT_BATCH_BYTES = 1 << 20
+
+# Counters reported by an import
+_IMPORT_COUNTS = ("users", "events", "registered", "waitlisted", "skippedUsers", "skippedEvents")
+
+
+class AdminService:
+    """Service for bulk export and import of users, events and registrations."""
+
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        event_repository: EventRepository,
+        locks: Optional[EventLocks] = None
+    ):
+        """Initialize the service with repositories and per-event locks."""
+        self._users = user_repository
+        self._events = event_repository
+        self._locks = locks or EventLocks()
+
+    @timed
+    def export_users(self, after: Optional[Any], limit: int = EXPORT_USER_CHUNK) -> Tuple[bytes, Optional[Any]]:
+        """Get a chunk of user records and the cursor of the next, which is None after the last."""
+        users, next_after = self._users.page_all(after, limit)
+        return b"".join(_record("user", user) for user in users), next_after
+
+    @timed
+    def export_events(self, after: Optional[Any], limit: int = EXPORT_EVENT_CHUNK) -> Tuple[bytes, Optional[Any]]:
+        """Get a chunk of event records and the cursor of the next, which is None after the last."""
+        events, next_after = self._events.page_all(after, limit)
+        lines = []
+        for event in events:
+            # Under the event's lock, so a promotion cannot show up in both lists
+            with self._locks.for_event(event.eventId):
+                lines.append(_record("event", event))
+        return b"".join(lines), next_after
+
+    @timed
+    def import_records(self, lines: List[bytes], first_line: int = 1) -> Dict[str, int]:
+        """Load NDJSON records, skipping blank lines and users or events that already exist.
+        
+        Returns counts of what was loaded and skipped. An invalid record
+        raises ValidationError naming its line; the records before it
+        stay loaded.
+        """
+        counts = dict.fromkeys(_IMPORT_COUNTS, 0)
+        # One store for both repositories, so this also covers the users
+        with self._events.group_commit():
+            for number, line in enumerate(lines, first_line):
+                if not line.strip():
+                    continue
+                try:
+                    self._import_record(json.loads(line), counts)
+                except (ValueError, ValidationError) as e:
+                    # Pydantic and JSON decoding errors are ValueErrors
+                    raise ValidationError(f"line {number}: {e}") from None
+        return counts
+
+    def _import_record(self, record: Any, counts: Dict[str, int]) -> None:
+        """Load one decoded record unless it already exists."""
+        if not isinstance(record, dict):
+            raise ValidationError("expected a JSON object")
+        kind = record.pop("type", None)
+        if kind == "user":
+            user = User.model_validate(record)
+            if self._users.exists(user.userId):
+                counts["skippedUsers"] += 1
+                return
+            self._users.create(user)
+            counts["users"] += 1
+        elif kind == "event":
+            event = Event.model_validate(record)
+            if self._events.exists(event.eventId):
+                counts["skippedEvents"] += 1
+                return
+            self._check_registrants(event, record)
+            self._events.create(event)
+            counts["events"] += 1
+            counts["registered"] += len(event.registered)
+            counts["waitlisted"] += len(event.waitlist)
+        else:
+            raise ValidationError(f"unknown record type {kind!r}")
+
+    def _check_registrants(self, event: Event, record: Dict[str, Any]) -> None:
+        """Check an imported event's lists against the invariants registration maintains."""
+        registered, waitlist = event.registered, event.waitlist
+        check_event_settings(event)
+        # Validation drops repeated userIds, so compare with the raw lists
+        if len(registered) != len(record.get("registered", ())) or len(waitlist) != len(record.get("waitlist", ())):
+            raise ValidationError(f"event '{event.eventId}' lists a user more than once")
+        if len(registered) > event.capacity:
+            raise ValidationError(
+                f"event '{event.eventId}' has {len(registered)} registered users for capacity {event.capacity}"
+            )
+        if waitlist:
+            if not event.hasWaitlist:
+                raise ValidationError(f"event '{event.eventId}' has a waitlist but hasWaitlist is not set")
+            if len(registered) < event.capacity:
+                raise ValidationError(f"event '{event.eventId}' has waitlisted users while seats are free")
+            if any(user_id in registered for user_id in waitlist):
+                raise ValidationError(f"event '{event.eventId}' has users both registered and waitlisted")
+        if not all(map(self._users.exists, chain(registered, waitlist))):
+            missing = next(user_id for user_id in chain(registered, waitlist) if not self._users.exists(user_id))
+            raise ValidationError(f"event '{event.eventId}' lists unknown user '{missing}'")
+
+
+class AsyncAdminService:
+    """Awaitable AdminService for async route handlers."""
+
+    def __init__(self, service: AdminService, run: ServiceRunner):
+        """Initialize with the sync service and the runner for its calls."""
+        self._service = service
+        self._run = run
+
+    async def export(self) -> AsyncIterator[bytes]:
+        """Stream every user, then every event, as NDJSON chunks."""
+        for export_chunk in (self._service.export_users, self._service.export_events):
+            after = None
+            while True:
+                chunk, after = await self._run(export_chunk, after)
+                if chunk:
+                    yield chunk
+                if after is None:
+                    break
+
+    async def import_stream(self, chunks: AsyncIterable[bytes]) -> Dict[str, int]:
+        """Load NDJSON records from a byte stream in batches, returning the total counts."""
+        totals = dict.fromkeys(_IMPORT_COUNTS, 0)
+        batch: List[bytes] = []
+        batch_bytes = 0
+        first_line = 1
+
+        async def flush() -> None:
+            nonlocal batch, batch_bytes, first_line
+            counts = await self._run(self._service.import_records, batch, first_line)
+            for name, count in counts.items():
+                totals[name] += count
+            first_line += len(batch)
+            batch, batch_bytes = [], 0
+
+        buffer = bytearray()
+        async for chunk in chunks:
+            # Only new bytes are searched, so a long line costs one pass
+            scanned = len(buffer)
+            buffer += chunk
+            start = 0
+            end = buffer.find(b"\n", scanned)
+            while end != -1:
+                batch.append(bytes(buffer[start:end]))
+                batch_bytes += end - start
+                start = end + 1
+                if len(batch) >= IMPORT_BATCH_LINES or batch_bytes >= IMPORT_BATCH_BYTES:
+                    await flush()
+                end = buffer.find(b"\n", start)
+            del buffer[:start]
+        if buffer:
+            batch.append(bytes(buffer))
+        if batch:
+            await flush()
+        return totals
+
+
+def _record(kind: str, model: BaseModel) -> bytes:
+    """Serialize a model as one NDJSON line tagged with its record type."""
+    # Splices the tag into the model's own JSON rather than copying it into a dict
+    return b'{"type":"%s",%s\n' % (kind.encode(), to_json(model, exclude_none=True)[1:])
@@ -0,0 +1,215 @@
+"""Event repository persisted through a write-ahead log and snapshots."""
+
+import json
+from typing import ContextManager, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from .models import Event
+from .registrants import RegistrantList
+from .repository import EventRepository
+from core.persistence import (
+    CAPACITY_CHANGED,
+    EVENT_CREATED,
+    EVENT_UPDATED,
+    OFFER_CONFIRMED,
+    OFFER_HELD,
+    REGISTERED,
+    SEAT_RELEASED,
+    UNREGISTERED,
+    UNWAITLISTED,
+    WAITLISTED,
+    DurableStore,
+    SnapshotReader,
+    SnapshotWriter,
+)
+
+
+# Registrant collections are persisted separately from the scalar fields
+_REGISTRANT_FIELDS = {"registered", "waitlist"}
+
+# Validates a whole snapshot's events in one pydantic-core call
+_EVENT_LIST = TypeAdapter(List[Event])
+
+
+class DurableEventRepository(EventRepository):
+    """In-memory event repository whose mutations are logged to a DurableStore.
+
+    Like the DynamoDB repository, update() persists scalar fields only;
+    registrant changes go through the add/remove/release methods.
+    Snapshots store registrant lists with their join sequence numbers,
+    so pagination cursors stay valid across restarts.
+    """
+
+    OPCODES = (
+        EVENT_CREATED, EVENT_UPDATED, REGISTERED, UNREGISTERED,
+        WAITLISTED, UNWAITLISTED, SEAT_RELEASED, CAPACITY_CHANGED,
+        OFFER_HELD, OFFER_CONFIRMED,
+    )
+
+    def __init__(self, store: DurableStore):
+        """Initialize empty storage and attach to the store."""
+        super().__init__()
+        self._store = store
+        self.blocking_io = store.blocking_io
+        # With fsync always, queued registrations share one fsync per batch
+        self.admission_queue_supported = store.blocking_io
+        store.attach(self)
+
+    def create(self, event: Event) -> Event:
+        """Create a new event in storage."""
+        # Dropping unset fields keeps revalidation from remapping hasWaitlist
+        with self._store.mutation(EVENT_CREATED, to_json(event, exclude_none=True), creates=True):
+            return super().create(event)
+
+    def update(self, event: Event) -> Event:
+        """Update an existing event in storage."""
+        fields = event.model_dump(exclude=_REGISTRANT_FIELDS)
+        with self._store.mutation(EVENT_UPDATED, to_json(fields)):
+            return super().update(event)
+
+    def add_registered(self, event: Event, user_id: str) -> None:
+        """Append a user to an event's registered list."""
+        with self._store.mutation(REGISTERED, event.eventId, user_id):
+            super().add_registered(event, user_id)
+
+    def remove_registered(self, event: Event, user_id: str) -> None:
+        """Remove a user from an event's registered list."""
+        with self._store.mutation(UNREGISTERED, event.eventId, user_id):
+            super().remove_registered(event, user_id)
+
+    def add_waitlisted(self, event: Event, user_id: str) -> None:
+        """Append a user to the end of an event's waitlist."""
+        with self._store.mutation(WAITLISTED, event.eventId, user_id):
+            super().add_waitlisted(event, user_id)
+
+    def remove_waitlisted(self, event: Event, user_id: str) -> None:
+        """Remove a user from an event's waitlist."""
+        with self._store.mutation(UNWAITLISTED, event.eventId, user_id):
+            super().remove_waitlisted(event, user_id)
+
+    def release_seat(self, event: Event, user_id: str) -> Optional[str]:
+        """Remove a registered user and promote the head of the waitlist."""
+        with self._store.mutation(SEAT_RELEASED, event.eventId, user_id):
+            return super().release_seat(event, user_id)
+
+    def set_capacity(self, event: Event, capacity: int) -> Tuple[List[str], List[str]]:
+        """Change an event's capacity, promoting or demoting users to fit."""
+        with self._store.mutation(CAPACITY_CHANGED, event.eventId, str(capacity)):
+            return super().set_capacity(event, capacity)
+
+    def hold_offer(self, event: Event, user_id: str, deadline: float) -> None:
+        """Mark a registered user's seat as an offer they must confirm by deadline."""
+        with self._store.mutation(OFFER_HELD, event.eventId, user_id, repr(deadline)):
+            super().hold_offer(event, user_id, deadline)
+
+    def confirm_offer(self, event: Event, user_id: str) -> None:
+        """Turn a user's offer into a plain registration."""
+        with self._store.mutation(OFFER_CONFIRMED, event.eventId, user_id):
+            super().confirm_offer(event, user_id)
+
+    def group_commit(self) -> ContextManager[None]:
+        """Wait for the enclosed changes to become durable once, on exit."""
+        return self._store.group_commit()
+
+    def replay(self, opcode: int, fields: List[str]) -> None:
+        """Apply a logged mutation during recovery."""
+        if opcode == EVENT_CREATED:
+            self.create(Event.model_validate_json(fields[0]))
+            return
+        if opcode == EVENT_UPDATED:
+            # Assigned as logged; validation would remap already-mapped fields
+            data = json.loads(fields[0])
+            event = self._events[data["eventId"]]
+            for field, value in data.items():
+                setattr(event, field, value)
+            self.update(event)
+            return
+        event = self._events[fields[0]]
+        if opcode == CAPACITY_CHANGED:
+            self.set_capacity(event, int(fields[1]))
+            return
+        user_id = fields[1]
+        if opcode == REGISTERED:
+            self.add_registered(event, user_id)
+        elif opcode == UNREGISTERED:
+            self.remove_registered(event, user_id)
+        elif opcode == WAITLISTED:
+            self.add_waitlisted(event, user_id)
+        elif opcode == UNWAITLISTED:
+            self.remove_waitlisted(event, user_id)
+        elif opcode == SEAT_RELEASED:
+            self.release_seat(event, user_id)
+        elif opcode == OFFER_HELD:
+            self.hold_offer(event, user_id, float(fields[2]))
+        elif opcode == OFFER_CONFIRMED:
+            self.confirm_offer(event, user_id)
+
+    def dump_snapshot(self, writer: SnapshotWriter) -> None:
+        """Write events, registrant lists, reverse indexes and pending offers to a snapshot."""
+        events = list(self._events.values())
+        # Dropping unset fields keeps revalidation from remapping hasWaitlist
+        writer.write_bytes(to_json(events, exclude={"__all__": _REGISTRANT_FIELDS}, exclude_none=True))
+        _dump_lists(writer, [event.registered for event in events])
+        _dump_lists(writer, [event.waitlist for event in events])
+        for index in (self._registered_by_user, self._waitlisted_by_user):
+            writer.write_strings(list(index))
+            _dump_lists(writer, list(index.values()))
+        writer.write_bytes(to_json(self.pending_offers()))
+
+    def load_snapshot(self, reader: SnapshotReader) -> None:
+        """Replace all events, indexes and offers with those read from a snapshot."""
+        events = _EVENT_LIST.validate_json(reader.read_bytes())
+        for event, registered, waitlist in zip(events, _load_lists(reader), _load_lists(reader)):
+            event.registered = registered
+            event.waitlist = waitlist
+        self._events = {event.eventId: event for event in events}
+        self._created = list(self._events)
+        self._event_versions = dict.fromkeys(self._events, 1)
+        self._search.rebuild(events)
+        self._registered_by_user = _load_index(reader)
+        self._waitlisted_by_user = _load_index(reader)
+        self._offers = {}
+        # Events are the last participant, so snapshots from before offers end here
+        if not reader.at_end():
+            for event_id, user_id, deadline in json.loads(reader.read_bytes()):
+                self._offers.setdefault(event_id, {})[user_id] = deadline
+        self._rebuild_stats()
+
+
+def _dump_lists(writer: SnapshotWriter, lists: List[RegistrantList]) -> None:
+    """Write registrant lists as flat id/sequence arrays plus per-list counts."""
+    user_ids: List[str] = []
+    seqs: List[int] = []
+    counts: List[int] = []
+    next_seqs: List[int] = []
+    for registrants in lists:
+        ids, list_seqs, next_seq = registrants.to_arrays()
+        user_ids.extend(ids)
+        seqs.extend(list_seqs)
+        counts.append(len(ids))
+        next_seqs.append(next_seq)
+    writer.write_strings(user_ids)
+    writer.write_ints(seqs)
+    writer.write_ints(counts)
+    writer.write_ints(next_seqs)
+
+
+def _load_lists(reader: SnapshotReader) -> List[RegistrantList]:
+    """Read registrant lists written by _dump_lists."""
+    user_ids = reader.read_strings()
+    seqs = reader.read_ints()
+    counts = reader.read_ints()
+    next_seqs = reader.read_ints()
+    lists = []
+    start = 0
+    for count, next_seq in zip(counts, next_seqs):
+        end = start + count
+        lists.append(RegistrantList.from_arrays(user_ids[start:end], seqs[start:end], next_seq))
+        start = end
+    return lists
+
+
+def _load_index(reader: SnapshotReader) -> Dict[str, RegistrantList]:
+    """Read a userId -> eventIds reverse index."""
+    user_ids = reader.read_strings()
+    return dict(zip(user_ids, _load_lists(reader)))
@@ -0,0 +1,658 @@
+"""Event repository backed by DynamoDB."""
+
+from bisect import bisect_right
+from contextlib import nullcontext
+from itertools import islice
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from .models import Event, EventFilters
+from .registrants import RegistrantList
+from .stats import RegistrationStats
+from core.dynamodb import from_item, is_conditional_failure, is_write_conflict, to_item, to_value
+from core.exceptions import ConcurrentModificationError, EntityAlreadyExistsError, ValidationError
+
+
+# Event attributes stored as plain item attributes
+_SCALAR_FIELDS = (
+    "title", "name", "description", "date", "location", "capacity",
+    "organizer", "status", "waitlistEnabled", "hasWaitlist", "admissionQueue",
+    "offerHoldSeconds",
+)
+
+# BatchGetItem accepts at most 100 keys per request
+_BATCH_GET_LIMIT = 100
+
+# TransactWriteItems accepts at most 100 items, one of them the event update
+_TRANSACT_USER_LIMIT = 99
+
+
+class DynamoDBEventRepository:
+    """Repository for managing event data in DynamoDB.
+    
+    Implements the same interface as EventRepository. Each event is one
+    item holding its registrants as maps of userId -> join sequence,
+    alongside registeredCount/waitlistCount counters and a sequence
+    counter that orders joins. Registrant changes are single conditional
+    updates on those attributes, so capacity and duplicate checks hold
+    across Lambda instances without rewriting the whole item. The user
+    -> events index lives on the user item and is updated in the same
+    transaction.
+    
+    Every change also bumps a `version` counter on the event item and
+    an `eventsVersion` counter on affected user items; they persist, so
+    conditional GET validators agree across Lambda instances.
+    
+    Because registrants share the event item, an event is bounded by
+    DynamoDB's 400 KB item limit (roughly 10k registrants).
+    """
+    
+    def __init__(self, client, events_table: str, users_table: str):
+        """Initialize the repository with a DynamoDB client and tables."""
+        self._client = client
+        self._table = events_table
+        self._users_table = users_table
+        self.version_epoch = "ddb"
+        # Lambda instances serve one request at a time, so there is no queue to batch
+        self.admission_queue_supported = False
+        # Nothing outlives a Lambda invocation to expire offers, so seats are promoted directly
+        self.offer_holds_supported = False
+        self.blocking_io = True
+    
+    def create(self, event: Event) -> Event:
+        """Create a new event in storage."""
+        registered = list(event.registered)
+        waitlist = list(event.waitlist)
+        data = {field: getattr(event, field) for field in _SCALAR_FIELDS}
+        data.update(
+            eventId=event.eventId,
+            registered={user_id: seq for seq, user_id in enumerate(registered)},
+            waitlist={user_id: len(registered) + seq for seq, user_id in enumerate(waitlist)},
+            registeredCount=len(registered),
+            waitlistCount=len(waitlist),
+            seq=len(registered) + len(waitlist),
+            version=1,
+        )
+        try:
+            self._client.put_item(
+                TableName=self._table,
+                Item=to_item(data),
+                ConditionExpression="attribute_not_exists(eventId)"
+            )
+        except ClientError as e:
+            if is_conditional_failure(e):
+                raise EntityAlreadyExistsError(
+                    f"Event with eventId '{event.eventId}' already exists"
+                ) from e
+            raise
+        
+        # Pre-populated registrants (bulk loads) are indexed outside the put
+        for user_id in registered:
+            self._client.update_item(**self._user_update(user_id, event.eventId, "ADD registeredEvents :event"))
+        for user_id in waitlist:
+            self._client.update_item(**self._user_update(user_id, event.eventId, "ADD waitlistedEvents :event"))
+        return event
+    
+    def get(self, event_id: str) -> Optional[Event]:
+        """Get an event by ID, returns None if not found."""
+        response = self._client.get_item(
+            TableName=self._table,
+            Key=to_item({"eventId": event_id}),
+            ConsistentRead=True
+        )
+        item = response.get("Item")
+        return self._to_event(item) if item else None
+    
+    def exists(self, event_id: str) -> bool:
+        """Check if an event exists."""
+        response = self._client.get_item(
+            TableName=self._table,
+            Key=to_item({"eventId": event_id}),
+            ProjectionExpression="eventId"
+        )
+        return "Item" in response
+    
+    def update(self, event: Event) -> Event:
+        """Update an existing event's attributes, leaving registrants untouched."""
+        names: Dict[str, str] = {}
+        values: Dict[str, Any] = {}
+        assignments, removals = [], []
+        for i, field in enumerate(_SCALAR_FIELDS):
+            names[f"#f{i}"] = field
+            value = getattr(event, field)
+            if value is None:
+                removals.append(f"#f{i}")
+            else:
+                values[f":f{i}"] = to_value(value)
+                assignments.append(f"#f{i} = :f{i}")
+        expression = "SET " + ", ".join(assignments)
+        if removals:
+            expression += " REMOVE " + ", ".join(removals)
+        names["#version"] = "version"
+        values[":one"] = to_value(1)
+        expression += " ADD #version :one"
+        self._client.update_item(
+            TableName=self._table,
+            Key=to_item({"eventId": event.eventId}),
+            UpdateExpression=expression,
+            ConditionExpression="attribute_exists(eventId)",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+        return event
+    
+    def list_all(self) -> List[Event]:
+        """Get all events."""
+        events = []
+        paginator = self._client.get_paginator("scan")
+        for page in paginator.paginate(TableName=self._table):
+            events.extend(self._to_event(item) for item in page["Items"])
+        return events
+    
+    def page_all(
+        self, after: Optional[Dict[str, Any]], limit: int
+    ) -> Tuple[List[Event], Optional[Dict[str, Any]]]:
+        """Get a page of all events in scan order, for bulk export.
+        
+        Returns the events and the key to resume after, which is None on
+        the last page.
+        """
+        request = {"TableName": self._table, "Limit": limit, "ConsistentRead": True}
+        if after is not None:
+            request["ExclusiveStartKey"] = after
+        response = self._client.scan(**request)
+        events = [self._to_event(item) for item in response["Items"]]
+        return events, response.get("LastEvaluatedKey")
+    
+    def registrant_totals(self) -> Dict[str, int]:
+        """Count events, registered seats, waitlist entries and the longest waitlist.
+        
+        Scans only the counter attributes, but still reads every item.
+        """
+        totals = {"events": 0, "registered": 0, "waitlisted": 0, "max_waitlist": 0}
+        paginator = self._client.get_paginator("scan")
+        for page in paginator.paginate(
+            TableName=self._table,
+            ProjectionExpression="registeredCount, waitlistCount"
+        ):
+            for item in page["Items"]:
+                counts = from_item(item)
+                waitlisted = int(counts.get("waitlistCount", 0))
+                totals["events"] += 1
+                totals["registered"] += int(counts.get("registeredCount", 0))
+                totals["waitlisted"] += waitlisted
+                totals["max_waitlist"] = max(totals["max_waitlist"], waitlisted)
+        return totals
+    
+    def registration_stats(self, top: int) -> dict:
+        """Get aggregate registration statistics and the top fullest events.
+        
+        Tables hold no aggregates, so this scans the counters of every
+        event and the registered events of every user: O(n) reads per call.
+        """
+        paginator = self._client.get_paginator("scan")
+        
+        def events():
+            for page in paginator.paginate(
+                TableName=self._table,
+                ProjectionExpression="eventId, #capacity, registeredCount, waitlistCount",
+                ExpressionAttributeNames={"#capacity": "capacity"}
+            ):
+                for item in page["Items"]:
+                    counts = from_item(item)
+                    yield (
+                        counts["eventId"],
+                        int(counts["capacity"]),
+                        int(counts.get("registeredCount", 0)),
+                        int(counts.get("waitlistCount", 0)),
+                    )
+        
+        def per_user():
+            for page in paginator.paginate(
+                TableName=self._users_table,
+                ProjectionExpression="registeredEvents"
+            ):
+                for item in page["Items"]:
+                    yield len(from_item(item).get("registeredEvents", ()))
+        
+        return RegistrationStats.from_counts(events(), per_user()).summary(top)
+    
+    def search(
+        self, filters: EventFilters, after: Optional[str], limit: int
+    ) -> Tuple[List[Event], Optional[str]]:
+        """Get a page of events matching filters, in table scan order.
+        
+        The table has no secondary indexes, so this is a filtered Scan
+        resumed from the last evaluated eventId: each page still reads
+        items the filters reject, and results are not ordered by date.
+        Returns the events and the eventId to resume after, which is
+        None on the last page.
+        """
+        if after is not None and not isinstance(after, str):
+            raise ValidationError("cursor is invalid")
+        names: Dict[str, str] = {}
+        values: Dict[str, Any] = {}
+        conditions = []
+        if filters.dateFrom is not None:
+            names["#date"] = "date"
+            values[":dateFrom"] = to_value(filters.dateFrom)
+            conditions.append("#date >= :dateFrom")
+        if filters.dateTo is not None:
+            names["#date"] = "date"
+            # Inclusive of any time on the dateTo day, matching the in-memory index
+            values[":dateTo"] = to_value(filters.dateTo + chr(0x10FFFF))
+            conditions.append("#date < :dateTo")
+        for field in ("location", "status", "organizer"):
+            value = getattr(filters, field)
+            if value is not None:
+                names[f"#{field}"] = field
+                values[f":{field}"] = to_value(value)
+                conditions.append(f"#{field} = :{field}")
+        if filters.hasAvailableSpots is not None:
+            names["#capacity"] = "capacity"
+            conditions.append(
+                "registeredCount < #capacity" if filters.hasAvailableSpots
+                else "registeredCount >= #capacity"
+            )
+        
+        events: List[Event] = []
+        start_key = None if after is None else to_item({"eventId": after})
+        while len(events) < limit:
+            request: Dict[str, Any] = {"TableName": self._table, "Limit": limit - len(events)}
+            if conditions:
+                request["FilterExpression"] = " AND ".join(conditions)
+                request["ExpressionAttributeNames"] = names
+            if values:
+                request["ExpressionAttributeValues"] = values
+            if start_key is not None:
+                request["ExclusiveStartKey"] = start_key
+            response = self._client.scan(**request)
+            events.extend(self._to_event(item) for item in response["Items"])
+            start_key = response.get("LastEvaluatedKey")
+            if start_key is None:
+                return events, None
+        return events, from_item(start_key)["eventId"]
+    
+    def add_registered(self, event: Event, user_id: str) -> None:
+        """Take a seat for a user, failing if the event filled up meanwhile."""
+        self._transact(
+            event.eventId,
+            self._event_update(
+                event.eventId,
+                "SET registered.#user = #seq, #seq = #seq + :one, "
+                "registeredCount = registeredCount + :one",
+                "registeredCount < #capacity AND attribute_not_exists(registered.#user) "
+                "AND attribute_not_exists(waitlist.#user)",
+                {"#user": user_id, "#seq": "seq", "#capacity": "capacity"},
+                {":one": to_value(1)}
+            ),
+            self._user_update(user_id, event.eventId, "ADD registeredEvents :event"),
+        )
+        event.registered.append(user_id)
+    
+    def remove_registered(self, event: Event, user_id: str) -> None:
+        """Give up a user's seat without promoting anyone."""
+        self._transact(
+            event.eventId,
+            self._event_update(
+                event.eventId,
+                "SET registeredCount = registeredCount - :one REMOVE registered.#user",
+                "attribute_exists(registered.#user)",
+                {"#user": user_id},
+                {":one": to_value(1)}
+            ),
+            self._user_update(user_id, event.eventId, "DELETE registeredEvents :event"),
+        )
+        event.registered.remove(user_id)
+    
+    def add_waitlisted(self, event: Event, user_id: str) -> None:
+        """Append a user to the waitlist, failing if a seat opened meanwhile."""
+        self._transact(
+            event.eventId,
+            self._event_update(
+                event.eventId,
+                "SET waitlist.#user = #seq, #seq = #seq + :one, "
+                "waitlistCount = waitlistCount + :one",
+                "registeredCount >= #capacity AND attribute_not_exists(registered.#user) "
+                "AND attribute_not_exists(waitlist.#user)",
+                {"#user": user_id, "#seq": "seq", "#capacity": "capacity"},
+                {":one": to_value(1)}
+            ),
+            self._user_update(user_id, event.eventId, "ADD waitlistedEvents :event"),
+        )
+        event.waitlist.append(user_id)
+    
+    def remove_waitlisted(self, event: Event, user_id: str) -> None:
+        """Remove a user from the waitlist."""
+        self._transact(
+            event.eventId,
+            self._event_update(
+                event.eventId,
+                "SET waitlistCount = waitlistCount - :one REMOVE waitlist.#user",
+                "attribute_exists(waitlist.#user)",
+                {"#user": user_id},
+                {":one": to_value(1)}
+            ),
+            self._user_update(user_id, event.eventId, "DELETE waitlistedEvents :event"),
+        )
+        event.waitlist.remove(user_id)
+    
+    def release_seat(self, event: Event, user_id: str) -> Optional[str]:
+        """Remove a registered user and promote the head of the waitlist.
+        
+        The seat changes hands in one transaction, so a concurrent
+        registration cannot take it ahead of the waitlist. Returns the
+        promoted userId, or None if the waitlist was empty.
+        """
+        promoted_user = next(iter(event.waitlist), None)
+        if promoted_user is None:
+            self._transact(
+                event.eventId,
+                self._event_update(
+                    event.eventId,
+                    "SET registeredCount = registeredCount - :one REMOVE registered.#user",
+                    "attribute_exists(registered.#user) AND waitlistCount = :zero",
+                    {"#user": user_id},
+                    {":one": to_value(1), ":zero": to_value(0)}
+                ),
+                self._user_update(user_id, event.eventId, "DELETE registeredEvents :event"),
+            )
+            event.registered.remove(user_id)
+            return None
+        
+        # Waitlist entries join at the tail except when a capacity cut
+        # demotes users to the head, so the head we read is still the
+        # head as long as it is still waitlisted and capacity is unchanged
+        self._transact(
+            event.eventId,
+            self._event_update(
+                event.eventId,
+                "SET registered.#promoted = #seq, #seq = #seq + :one, "
+                "waitlistCount = waitlistCount - :one "
+                "REMOVE registered.#user, waitlist.#promoted",
+                "attribute_exists(registered.#user) AND attribute_exists(waitlist.#promoted) "
+                "AND #capacity = :capacity",
+                {"#user": user_id, "#promoted": promoted_user, "#seq": "seq", "#capacity": "capacity"},
+                {":one": to_value(1), ":capacity": to_value(event.capacity)}
+            ),
+            self._user_update(user_id, event.eventId, "DELETE registeredEvents :event"),
+            self._user_update(
+                promoted_user, event.eventId,
+                "ADD registeredEvents :event DELETE waitlistedEvents :event"
+            ),
+        )
+        event.registered.remove(user_id)
+        event.waitlist.popleft()
+        event.registered.append(promoted_user)
+        return promoted_user
+    
+    def set_capacity(self, event: Event, capacity: int) -> Tuple[List[str], List[str]]:
+        """Change an event's capacity, moving users between its lists to fit.
+        
+        Follows the in-memory policy: promotions come from the head of
+        the waitlist, and demotions take the most recent registrants to
+        the head of the waitlist. A transaction holds at most 99 user
+        updates, so users move in chunks, each one transaction that also
+        steps capacity to match and leaves the event consistent. Each is
+        conditioned on the capacity and counts it read, so a concurrent
+        change raises ConcurrentModificationError; retrying with the
+        re-read event picks up from the last completed chunk.
+        """
+        promoted: List[str] = []
+        demoted: List[str] = []
+        promote = min(capacity - len(event.registered), len(event.waitlist))
+        if promote > 0:
+            users = list(islice(event.waitlist, promote))
+            for start in range(0, promote, _TRANSACT_USER_LIMIT):
+                chunk = users[start:start + _TRANSACT_USER_LIMIT]
+                final = start + len(chunk) == promote
+                self._move_users(
+                    event, chunk, "waitlist", "registered", range(len(chunk)),
+                    capacity if final else len(event.registered) + len(chunk)
+                )
+                promoted.extend(chunk)
+        demote = len(event.registered) - capacity
+        if demote > 0:
+            users = list(event.registered)[-demote:]
+            # Below every waitlist entry, so the demoted users lead the waitlist
+            if event.waitlist:
+                base = event.waitlist.seq_of(next(iter(event.waitlist))) - demote
+            else:
+                base = event.registered.seq_of(users[-1]) + 1 - demote
+            # Chunks are taken from the tail, each going ahead of the last
+            for end in range(demote, 0, -_TRANSACT_USER_LIMIT):
+                start = max(0, end - _TRANSACT_USER_LIMIT)
+                chunk = users[start:end]
+                self._move_users(
+                    event, chunk, "registered", "waitlist",
+                    range(base + start, base + end),
+                    capacity if start == 0 else len(event.registered) - len(chunk)
+                )
+                demoted[:0] = chunk
+        if not promoted and not demoted and event.capacity != capacity:
+            self._move_users(event, [], "registered", "waitlist", range(0), capacity)
+        return promoted, demoted
+    
+    def group_commit(self) -> ContextManager[None]:
+        """Group the persistence of enclosed changes; each update is already durable."""
+        return nullcontext()
+    
+    def event_version(self, event_id: str) -> Optional[int]:
+        """Get an event's change counter, or None if the event does not exist."""
+        response = self._client.get_item(
+            TableName=self._table,
+            Key=to_item({"eventId": event_id}),
+            ProjectionExpression="eventId, #version",
+            ExpressionAttributeNames={"#version": "version"},
+            ConsistentRead=True
+        )
+        item = response.get("Item")
+        return int(from_item(item).get("version", 0)) if item else None
+    
+    def user_events_version(self, user_id: str) -> Tuple[int, int]:
+        """Get a user's registration-set counter and the sum of their events' counters.
+        
+        Reads only the counters: one user item and a projected batch get.
+        """
+        response = self._client.get_item(
+            TableName=self._users_table,
+            Key=to_item({"userId": user_id}),
+            ProjectionExpression="registeredEvents, eventsVersion",
+            ConsistentRead=True
+        )
+        item = from_item(response.get("Item", {}))
+        event_ids = sorted(item.get("registeredEvents", ()))
+        total = 0
+        for start in range(0, len(event_ids), _BATCH_GET_LIMIT):
+            keys = [to_item({"eventId": event_id}) for event_id in event_ids[start:start + _BATCH_GET_LIMIT]]
+            request = {self._table: {
+                "Keys": keys,
+                "ProjectionExpression": "#version",
+                "ExpressionAttributeNames": {"#version": "version"},
+                "ConsistentRead": True,
+            }}
+            while request:
+                response = self._client.batch_get_item(RequestItems=request)
+                for version_item in response["Responses"].get(self._table, []):
+                    total += int(from_item(version_item).get("version", 0))
+                request = response.get("UnprocessedKeys") or None
+        return int(item.get("eventsVersion", 0)), total
+    
+    def list_registered_for_user(self, user_id: str) -> List[Event]:
+        """Get the events a user is registered for, ordered by eventId."""
+        return self._batch_get(self._user_event_ids(user_id, "registeredEvents"))
+    
+    def list_waitlisted_for_user(self, user_id: str) -> List[Event]:
+        """Get the events a user is waitlisted for, ordered by eventId."""
+        return self._batch_get(self._user_event_ids(user_id, "waitlistedEvents"))
+    
+    def page_registered_for_user(
+        self, user_id: str, after: Optional[str], limit: int
+    ) -> Tuple[List[Event], Optional[str]]:
+        """Get a page of the events a user is registered for, ordered by eventId.
+        
+        Returns the events and the eventId to resume after, which is
+        None on the last page.
+        """
+        if after is not None and not isinstance(after, str):
+            raise ValidationError("cursor is invalid")
+        event_ids = self._user_event_ids(user_id, "registeredEvents")
+        start = 0 if after is None else bisect_right(event_ids, after)
+        page = event_ids[start:start + limit]
+        next_after = page[-1] if start + limit < len(event_ids) else None
+        return self._batch_get(page), next_after
+    
+    def _event_update(
+        self,
+        event_id: str,
+        update: str,
+        condition: str,
+        names: Dict[str, str],
+        values: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a conditional update on an event item, bumping its version."""
+        return {
+            "TableName": self._table,
+            "Key": to_item({"eventId": event_id}),
+            "UpdateExpression": update + " ADD #version :one",
+            "ConditionExpression": condition,
+            "ExpressionAttributeNames": {**names, "#version": "version"},
+            "ExpressionAttributeValues": {**values, ":one": to_value(1)},
+        }
+    
+    def _move_users(
+        self,
+        event: Event,
+        user_ids: List[str],
+        source: str,
+        target: str,
+        seqs: range,
+        capacity: int
+    ) -> None:
+        """Move users between an event's lists and set its capacity in one transaction.
+        
+        Promoted users (into registered) take fresh join sequences from
+        the event counter, as joins do; demoted users take the given seqs.
+        """
+        names = {"#capacity": "capacity"}
+        values: Dict[str, Any] = {
+            ":capacity": to_value(capacity),
+            ":old": to_value(event.capacity),
+            ":registered": to_value(len(event.registered)),
+            ":waitlisted": to_value(len(event.waitlist)),
+        }
+        assignments = ["#capacity = :capacity"]
+        removals = []
+        conditions = [
+            "#capacity = :old", "registeredCount = :registered", "waitlistCount = :waitlisted"
+        ]
+        for i, (user_id, seq) in enumerate(zip(user_ids, seqs)):
+            names[f"#u{i}"] = user_id
+            if target == "registered":
+                values[f":o{i}"] = to_value(seq)
+                assignments.append(f"{target}.#u{i} = #seq + :o{i}")
+            else:
+                values[f":s{i}"] = to_value(seq)
+                assignments.append(f"{target}.#u{i} = :s{i}")
+            removals.append(f"{source}.#u{i}")
+            conditions.append(f"attribute_exists({source}.#u{i})")
+        if user_ids:
+            values[":moved"] = to_value(len(user_ids))
+            sign = ("+", "-") if target == "registered" else ("-", "+")
+            assignments.append(f"registeredCount = registeredCount {sign[0]} :moved")
+            assignments.append(f"waitlistCount = waitlistCount {sign[1]} :moved")
+            if target == "registered":
+                names["#seq"] = "seq"
+                assignments.append("#seq = #seq + :moved")
+        update = "SET " + ", ".join(assignments)
+        if removals:
+            update += " REMOVE " + ", ".join(removals)
+        index_update = (
+            "ADD registeredEvents :event DELETE waitlistedEvents :event" if target == "registered"
+            else "ADD waitlistedEvents :event DELETE registeredEvents :event"
+        )
+        self._transact(
+            event.eventId,
+            self._event_update(event.eventId, update, " AND ".join(conditions), names, values),
+            *(self._user_update(user_id, event.eventId, index_update) for user_id in user_ids),
+        )
+        event.capacity = capacity
+        if target == "registered":
+            for user_id in event.waitlist.popleft_many(len(user_ids)):
+                event.registered.append(user_id)
+        else:
+            event.registered.pop_many(len(user_ids))
+            event.waitlist.prepend(user_ids)
+    
+    def _user_update(self, user_id: str, event_id: str, update: str) -> Dict[str, Any]:
+        """Build an update to a user's eventId index sets, bumping their version."""
+        return {
+            "TableName": self._users_table,
+            "Key": to_item({"userId": user_id}),
+            "UpdateExpression": (
+                "SET eventsVersion = if_not_exists(eventsVersion, :zero) + :one " + update
+            ),
+            "ConditionExpression": "attribute_exists(userId)",
+            "ExpressionAttributeValues": {
+                ":event": to_value({event_id}),
+                ":zero": to_value(0),
+                ":one": to_value(1),
+            },
+        }
+    
+    def _transact(self, event_id: str, *updates: Dict[str, Any]) -> None:
+        """Apply updates atomically, raising on a lost race."""
+        try:
+            self._client.transact_write_items(
+                TransactItems=[{"Update": update} for update in updates]
+            )
+        except ClientError as e:
+            if is_write_conflict(e):
+                raise ConcurrentModificationError(
+                    f"Event '{event_id}' was modified concurrently"
+                ) from e
+            raise
+    
+    def _user_event_ids(self, user_id: str, attribute: str) -> List[str]:
+        """Read one of a user's eventId index sets."""
+        response = self._client.get_item(
+            TableName=self._users_table,
+            Key=to_item({"userId": user_id}),
+            ProjectionExpression=attribute,
+            ConsistentRead=True
+        )
+        item = from_item(response.get("Item", {}))
+        return sorted(item.get(attribute, ()))
+    
+    def _batch_get(self, event_ids: List[str]) -> List[Event]:
+        """Fetch events by ID, preserving the order of event_ids."""
+        found: Dict[str, Event] = {}
+        for start in range(0, len(event_ids), _BATCH_GET_LIMIT):
+            keys = [to_item({"eventId": event_id}) for event_id in event_ids[start:start + _BATCH_GET_LIMIT]]
+            request = {self._table: {"Keys": keys, "ConsistentRead": True}}
+            while request:
+                response = self._client.batch_get_item(RequestItems=request)
+                for item in response["Responses"].get(self._table, []):
+                    event = self._to_event(item)
+                    found[event.eventId] = event
+                request = response.get("UnprocessedKeys") or None
+        return [found[event_id] for event_id in event_ids if event_id in found]
+    
+    @staticmethod
+    def _to_event(item: Dict[str, Any]) -> Event:
+        """Convert an event item to an Event model."""
+        data = from_item(item)
+        fields = {field: data[field] for field in _SCALAR_FIELDS if field in data}
+        fields["capacity"] = int(fields["capacity"])
+        return Event(
+            eventId=data["eventId"],
+            **fields,
+            registered=DynamoDBEventRepository._to_registrants(data.get("registered", {})),
+            waitlist=DynamoDBEventRepository._to_registrants(data.get("waitlist", {}))
+        )
+    
+    @staticmethod
+    def _to_registrants(entries: Dict[str, Any]) -> RegistrantList:
+        """Convert a userId -> join sequence map, keeping stored sequences as cursors."""
+        return RegistrantList.from_sequenced(
+            sorted((int(seq), user_id) for user_id, seq in entries.items())
+        )
@@ -1,7 +1,8 @@
 """Event domain models."""
 
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Any, Optional
+from .registrants import RegistrantList
 
 
 class Event(BaseModel):
@@ -16,18 +17,41 @@ class Event(BaseModel):
     organizer: Optional[str] = None
     status: Optional[str] = None
     waitlistEnabled: Optional[bool] = None
-    hasWaitlist: Optional[bool] = None
-    registered: List[str] = []
-    waitlist: List[str] = []
+    hasWaitlist: Optional[bool] = False
+    admissionQueue: Optional[bool] = None
+    offerHoldSeconds: Optional[int] = None
+    registered: RegistrantList = Field(default_factory=RegistrantList)
+    waitlist: RegistrantList = Field(default_factory=RegistrantList)
     
-    def __init__(self, **data):
-        """Initialize event with field mapping."""
-        # Map title to name if title is provided
-        if 'title' in data and data['title']:
-            data['name'] = data['title']
-        # Map waitlistEnabled to hasWaitlist
-        if 'waitlistEnabled' in data:
-            data['hasWaitlist'] = data['waitlistEnabled']
-        elif 'hasWaitlist' not in data:
-            data['hasWaitlist'] = False
-        super().__init__(**data)
+    @model_validator(mode="before")
+    @classmethod
+    def map_fields(cls, data: Any) -> Any:
+        """Map title to name and waitlistEnabled to hasWaitlist."""
+        if not isinstance(data, dict):
+            return data
+        if data.get('title') or 'waitlistEnabled' in data:
+            data = dict(data)
+            # Map title to name if title is provided
+            if data.get('title'):
+                data['name'] = data['title']
+            # Map waitlistEnabled to hasWaitlist
+            if 'waitlistEnabled' in data:
+                data['hasWaitlist'] = data['waitlistEnabled']
+        return data
+
+
+class EventFilters(BaseModel):
+    """Filters for listing events; unset filters match every event."""
+    dateFrom: Optional[str] = None
+    dateTo: Optional[str] = None
+    location: Optional[str] = None
+    status: Optional[str] = None
+    organizer: Optional[str] = None
+    hasAvailableSpots: Optional[bool] = None
+
+
+class EventCapacityUpdate(BaseModel):
+    """Changes to an existing event; only capacity can change."""
+    model_config = ConfigDict(extra="forbid")
+    
+    capacity: int
@@ -0,0 +1,120 @@
+"""Expiry timers for waitlist promotion offers.
+
+Events created with offerHoldSeconds do not hand a freed seat straight
+to the head of the waitlist. The user is moved into the seat with an
+offer that expires after that many seconds. Until they confirm it, or
+it expires and the seat is offered to the next in line, the seat is
+held for them. OfferTimers tracks every pending offer's deadline on a
+timer wheel (see core.timer_wheel). A background ticker advances the
+wheel once per tick and hands each expired offer to the registration
+service. The ticker only runs while offers are pending, and its cost
+does not grow with the number of events.
+
+Deadlines are wall-clock seconds, so offers logged by a durable
+repository expire on time after a restart. Pass a fake clock and
+background=False to control expiry from tests and benchmarks with
+expire_due().
+
+Configuration:
+
+- OFFER_TICK_MS (default 1000): resolution of offer deadlines, and how
+  often the ticker checks for expired offers
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from core.timer_wheel import TimerWheel
+
+# Expires one offer, given the eventId and userId
+OfferHandler = Callable[[str, str], None]
+
+logger = logging.getLogger(__name__)
+
+
+def holds_offers(repository: Any, event: Any) -> bool:
+    """Whether a freed seat of an event is offered rather than given outright."""
+    return bool(event.offerHoldSeconds) and repository.offer_holds_supported
+
+
+class OfferTimers:
+    """Deadlines of pending offers on a timer wheel, expired by a background ticker. Thread-safe."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        tick: float = 1.0,
+        background: bool = True
+    ):
+        """Initialize with no pending offers; tick is in seconds."""
+        self.clock = clock
+        self.tick = tick
+        self._background = background
+        self._wheel = TimerWheel(tick, clock())
+        self._handler: Optional[OfferHandler] = None
+        self._ticker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "OfferTimers":
+        """Build timers with the tick set by OFFER_TICK_MS."""
+        return cls(tick=float(os.environ.get("OFFER_TICK_MS", "1000")) / 1000)
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    def set_handler(self, handler: OfferHandler) -> None:
+        """Set the function that expires an offer once its deadline passes."""
+        self._handler = handler
+
+    def schedule(self, event_id: str, user_id: str, deadline: float) -> None:
+        """Expire a user's offer for an event at deadline, replacing any earlier deadline."""
+        with self._lock:
+            self._wheel.schedule((event_id, user_id), deadline)
+            if self._background and self._ticker is None:
+                self._ticker = threading.Thread(target=self._tick, name="offer-timers", daemon=True)
+                self._ticker.start()
+
+    def hold(self, repository: Any, event: Any, user_id: str) -> float:
+        """Turn a registered user's seat into an offer held for the event's hold time; returns its deadline."""
+        deadline = self.clock() + event.offerHoldSeconds
+        repository.hold_offer(event, user_id, deadline)
+        self.schedule(event.eventId, user_id, deadline)
+        return deadline
+
+    def cancel(self, event_id: str, user_id: str) -> None:
+        """Forget a user's offer for an event, e.g. once it was confirmed or declined."""
+        with self._lock:
+            self._wheel.cancel((event_id, user_id))
+
+    def expire_due(self) -> int:
+        """Hand every offer whose deadline has passed to the handler; returns how many.
+
+        An offer the handler fails on is retried a tick later.
+        """
+        with self._lock:
+            now = self.clock()
+            if self._handler is None:
+                # Nothing can expire offers until the registration service attaches
+                return 0
+            due: List[Tuple[Tuple[str, str], float]] = self._wheel.advance(now)
+        for (event_id, user_id), _ in due:
+            try:
+                self._handler(event_id, user_id)
+            except Exception:
+                logger.exception("Failed to expire the offer to '%s' for event '%s'", user_id, event_id)
+                self.schedule(event_id, user_id, now + self.tick)
+        return len(due)
+
+    def _tick(self) -> None:
+        """Expire due offers once per tick until none are pending."""
+        while True:
+            time.sleep(self.tick)
+            self.expire_due()
+            with self._lock:
+                if not len(self._wheel):
+                    self._ticker = None
+                    return
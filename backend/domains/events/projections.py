@@ -0,0 +1,63 @@
+"""Sparse fieldsets for event list responses.
+
+List routes take a `fields=` query parameter naming the Event fields to
+return, e.g. `fields=name,date`. eventId is always included, and `*`
+asks for every field. Without it, list responses leave out the
+registered and waitlist arrays, which grow with attendance and are
+rarely needed when listing events.
+
+Pages are written by one TypeAdapter straight from the stored events,
+with an include set cached per field set, so a projected response
+needs no copying or filtering of models.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+from .models import Event
+from core.exceptions import ValidationError
+
+EVENT_FIELDS: Tuple[str, ...] = tuple(Event.model_fields)
+
+# Fields of list responses when no fields= parameter is given
+LIST_FIELDS: Tuple[str, ...] = tuple(field for field in EVENT_FIELDS if field not in ("registered", "waitlist"))
+
+# Include sets kept; each distinct field set a client asks for takes one
+_MAX_PROJECTIONS = 128
+
+
+class _EventPage(TypedDict):
+    """A list page: {"events": [...], "nextCursor": ...}."""
+    events: List[Event]
+    nextCursor: NotRequired[Optional[str]]
+
+
+_PAGE = TypeAdapter(_EventPage)
+
+
+def parse_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """Parse a fields= parameter into Event fields in model order; None gives LIST_FIELDS."""
+    if value is None:
+        return LIST_FIELDS
+    if value.strip() == "*":
+        return EVENT_FIELDS
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested.difference(EVENT_FIELDS)
+    if unknown:
+        raise ValidationError(f"unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("eventId")
+    return tuple(field for field in EVENT_FIELDS if field in requested)
+
+
+@lru_cache(maxsize=_MAX_PROJECTIONS)
+def page_include(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Get the include set for pages showing only fields of each event."""
+    return {"events": {"__all__": set(fields)}, "nextCursor": True}
+
+
+def render_page(page: dict, fields: Tuple[str, ...]) -> bytes:
+    """Serialize a page of events showing only the given fields."""
+    return _PAGE.dump_json(page, include=page_include(fields))
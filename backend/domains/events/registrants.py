@@ -0,0 +1,364 @@
+"""Registrant collection used for event registered and waitlist entries."""
+
+from array import array
+from bisect import bisect_right
+from itertools import islice
+from sys import intern
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+
+# Removed slots tolerated before compacting, as a floor on live entries
+_COMPACT_MIN_REMOVED = 64
+
+
+class _Fenwick:
+    """Binary indexed tree of per-slot counts supporting prefix sums."""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self):
+        """Initialize an empty tree."""
+        self._tree: List[int] = [0]
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[int]) -> "_Fenwick":
+        """Build a tree over the given per-slot counts in O(n)."""
+        tree = cls()
+        nodes = tree._tree
+        nodes.extend(counts)
+        for node in range(1, len(nodes)):
+            parent = node + (node & -node)
+            if parent < len(nodes):
+                nodes[parent] += nodes[node]
+        return tree
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def append(self) -> None:
+        """Add a zero-valued slot at the end in O(log n)."""
+        index = len(self._tree)
+        stop = index - (index & -index)
+        total = 0
+        node = index - 1
+        while node > stop:
+            total += self._tree[node]
+            node -= node & -node
+        self._tree.append(total)
+
+    def add(self, slot: int, delta: int) -> None:
+        """Add delta to a slot's count."""
+        node = slot + 1
+        while node < len(self._tree):
+            self._tree[node] += delta
+            node += node & -node
+
+    def truncate(self, size: int) -> None:
+        """Drop the slots from size onwards."""
+        del self._tree[size + 1:]
+
+    def prefix(self, slot: int) -> int:
+        """Sum of counts for slots before the given slot."""
+        total = 0
+        node = slot
+        while node > 0:
+            total += self._tree[node]
+            node -= node & -node
+        return total
+
+
+class RegistrantList:
+    """Insertion-ordered set of user IDs.
+
+    Entries live in append-only slot arrays tagged with a monotonically
+    increasing join sequence number. Membership, append, removal and
+    FIFO promotion from the front are O(1) amortized; removed slots are
+    compacted away once they outnumber live entries. Position lookups
+    use a Fenwick tree of removed slots that is built on the first
+    lookup and then brought up to date lazily, so only callers asking
+    for positions pay O(log n) per change since the last lookup. Join
+    sequence numbers survive removals and compaction, so they serve as
+    stable pagination cursors.
+
+    Memory per entry is kept small because lists hold millions of them:
+    IDs are interned, so a user's ID is one string object however many
+    lists it is in, and sequence numbers are packed in an int64 array
+    rather than stored as int objects.
+
+    Validates from and serializes to a plain JSON array of strings, so
+    API payloads are unchanged.
+    """
+
+    __slots__ = ("_users", "_seqs", "_slots", "_head", "_removed", "_pending", "_next_seq")
+
+    def __init__(self, user_ids: Optional[Iterable[str]] = None):
+        """Initialize the collection, dropping duplicate user IDs."""
+        self._next_seq = 0
+        self._reset()
+        if user_ids:
+            self.extend(user_ids)
+
+    @classmethod
+    def from_sequenced(cls, entries: Iterable[Tuple[int, str]]) -> "RegistrantList":
+        """Build from (join sequence, userId) pairs in ascending sequence order."""
+        registrants = cls()
+        for seq, user_id in entries:
+            # Entries moved to the front of a list may have negative sequences
+            if registrants._users and seq < registrants._next_seq:
+                raise ValueError("entries must be in ascending sequence order")
+            registrants._next_seq = seq
+            registrants.append(user_id)
+        return registrants
+
+    @classmethod
+    def from_arrays(cls, user_ids: List[str], seqs: Sequence[int], next_seq: int) -> "RegistrantList":
+        """Rebuild from parallel arrays produced by to_arrays, without per-entry checks.
+
+        Takes ownership of the lists; used to restore snapshots in bulk,
+        whose string tables are already interned.
+        """
+        registrants = cls.__new__(cls)
+        registrants._users = user_ids
+        registrants._seqs = seqs if isinstance(seqs, array) else array("q", seqs)
+        registrants._slots = dict(zip(user_ids, range(len(user_ids))))
+        registrants._head = 0
+        registrants._removed = None
+        registrants._pending = None
+        registrants._next_seq = next_seq
+        return registrants
+
+    def to_arrays(self) -> Tuple[List[str], Sequence[int], int]:
+        """Get the live user IDs, their join sequence numbers and the next sequence number.
+
+        Does not modify the collection, so it is safe from readers that
+        do not hold the owner's lock, e.g. pickling.
+        """
+        head = self._first_live()
+        if len(self._users) - head == len(self._slots):
+            # No removed slots past the head, so slicing copies at C speed
+            return self._users[head:], self._seqs[head:], self._next_seq
+        users: List[str] = []
+        seqs = array("q")
+        for user_id, seq in zip(islice(self._users, head, None), islice(self._seqs, head, None)):
+            if user_id is not None:
+                users.append(user_id)
+                seqs.append(seq)
+        return users, seqs, self._next_seq
+
+    def append(self, user_id: str) -> None:
+        """Add a user to the end of the collection."""
+        if user_id in self._slots:
+            return
+        user_id = intern(user_id)
+        self._slots[user_id] = len(self._users)
+        self._users.append(user_id)
+        self._seqs.append(self._next_seq)
+        self._next_seq += 1
+
+    def extend(self, user_ids: Iterable[str]) -> None:
+        """Add users to the end in order, skipping those already present, at C speed."""
+        # dict.fromkeys drops repeats, keeping the first occurrence
+        new_ids = [user_id for user_id in dict.fromkeys(map(intern, user_ids)) if user_id not in self._slots]
+        start = len(self._users)
+        self._slots.update(zip(new_ids, range(start, start + len(new_ids))))
+        self._users.extend(new_ids)
+        self._seqs.extend(range(self._next_seq, self._next_seq + len(new_ids)))
+        self._next_seq += len(new_ids)
+
+    def remove(self, user_id: str) -> None:
+        """Remove a user, raises ValueError if not present."""
+        if user_id not in self._slots:
+            raise ValueError(f"{user_id!r} is not in registrant list")
+        self.discard(user_id)
+
+    def discard(self, user_id: str) -> None:
+        """Remove a user if present."""
+        slot = self._slots.pop(user_id, None)
+        if slot is None:
+            return
+        self._users[slot] = None
+        if self._pending is not None:
+            self._pending.append(slot)
+        self._compact_if_sparse()
+
+    def popleft(self) -> str:
+        """Remove and return the first user, raises IndexError if empty."""
+        if not self._slots:
+            raise IndexError("pop from empty registrant list")
+        self._skip_removed_head()
+        user_id = self._users[self._head]
+        self.discard(user_id)
+        return user_id
+
+    def popleft_many(self, count: int) -> List[str]:
+        """Remove and return up to count users from the front, in join order."""
+        return [self.popleft() for _ in range(min(count, len(self._slots)))]
+
+    def pop_many(self, count: int) -> List[str]:
+        """Remove and return up to count users from the end, in join order.
+
+        O(count) amortized: the vacated tail slots are truncated rather
+        than left behind as removed slots.
+        """
+        count = min(count, len(self._slots))
+        if count <= 0:
+            return []
+        users: List[str] = []
+        slot = len(self._users)
+        while len(users) < count:
+            slot -= 1
+            user_id = self._users[slot]
+            if user_id is not None:
+                del self._slots[user_id]
+                users.append(user_id)
+        del self._users[slot:]
+        del self._seqs[slot:]
+        if self._removed is not None:
+            self._removed.truncate(slot)
+            self._pending = [pending for pending in self._pending if pending < slot]
+        self._head = min(self._head, slot)
+        users.reverse()
+        return users
+
+    def prepend(self, user_ids: Iterable[str]) -> None:
+        """Add users ahead of everyone present, keeping their given order.
+
+        They get join sequence numbers below every present entry. The
+        slot arrays are rebuilt, so this costs O(n).
+        """
+        user_ids = [intern(user_id) for user_id in dict.fromkeys(user_ids) if user_id not in self._slots]
+        if not user_ids:
+            return
+        users, seqs, next_seq = self.to_arrays()
+        first = seqs[0] if seqs else next_seq
+        self._reset()
+        self._users = user_ids + users
+        self._seqs = array("q", range(first - len(user_ids), first)) + seqs
+        self._slots = dict(zip(self._users, range(len(self._users))))
+
+    def position(self, user_id: str) -> Optional[int]:
+        """Get a user's zero-based position, or None if not present.
+
+        Brings the removed-slot tree up to date, so callers must hold the
+        same lock as writers.
+        """
+        slot = self._slots.get(user_id)
+        if slot is None:
+            return None
+        self._sync_removed()
+        return slot - self._removed.prefix(slot)
+
+    def seq_of(self, user_id: str) -> int:
+        """Get the join sequence number of a present user."""
+        return self._seqs[self._slots[user_id]]
+
+    def page(self, after: Optional[int], limit: int) -> Tuple[List[str], Optional[int]]:
+        """Get up to limit users who joined after a sequence number.
+
+        Returns the users and the sequence number to resume after, which
+        is None once the end of the collection is reached. Does not modify
+        the collection.
+        """
+        head = self._first_live()
+        start = head if after is None else max(head, bisect_right(self._seqs, after))
+        users: List[str] = []
+        last_seq: Optional[int] = None
+        for slot in range(start, len(self._users)):
+            user_id = self._users[slot]
+            if user_id is None:
+                continue
+            if len(users) == limit:
+                return users, last_seq
+            users.append(user_id)
+            last_seq = self._seqs[slot]
+        return users, None
+
+    def __reduce__(self) -> Tuple[Any, Tuple[List[str], Sequence[int], int]]:
+        # Pickles as the live arrays, e.g. when sent between processes
+        return RegistrantList.from_arrays, self.to_arrays()
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __iter__(self) -> Iterator[str]:
+        # Compaction swaps in new arrays, so iterate over a snapshot reference
+        return (user_id for user_id in islice(self._users, self._head, None) if user_id is not None)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RegistrantList):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RegistrantList({list(self)!r})"
+
+    def _reset(self) -> None:
+        """Clear all slot storage, keeping the sequence counter."""
+        self._users: List[Optional[str]] = []
+        self._seqs = array("q")
+        self._slots: Dict[str, int] = {}
+        self._head = 0
+        # Built on the first position lookup, with removals pending since then
+        self._removed: Optional[_Fenwick] = None
+        self._pending: Optional[List[int]] = None
+
+    def _sync_removed(self) -> None:
+        """Build the removed-slot tree, or bring it up to date with appends and removals."""
+        if self._removed is None:
+            self._removed = _Fenwick.from_counts(1 if user_id is None else 0 for user_id in self._users)
+            self._pending = []
+            return
+        while len(self._removed) < len(self._users):
+            self._removed.append()
+        for slot in self._pending:
+            self._removed.add(slot, 1)
+        self._pending.clear()
+
+    def _skip_removed_head(self) -> None:
+        """Advance the head past removed slots; only writers call this."""
+        self._head = self._first_live()
+
+    def _first_live(self) -> int:
+        """Get the first slot at or after the head that is not removed."""
+        head = self._head
+        users = self._users
+        while head < len(users) and users[head] is None:
+            head += 1
+        return head
+
+    def _compact_if_sparse(self) -> None:
+        """Drop removed slots once they outnumber live entries."""
+        removed = len(self._users) - len(self._slots)
+        if removed <= _COMPACT_MIN_REMOVED or removed <= len(self._slots):
+            return
+        live = [(seq, user_id) for seq, user_id in zip(self._seqs, self._users) if user_id is not None]
+        self._reset()
+        for slot, (seq, user_id) in enumerate(live):
+            self._slots[user_id] = slot
+            self._users.append(user_id)
+            self._seqs.append(seq)
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source_type: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        """Validate from a list of strings and serialize back to a list."""
+        list_schema = core_schema.list_schema(core_schema.str_schema())
+        from_list = core_schema.no_info_after_validator_function(cls, list_schema)
+        return core_schema.json_or_python_schema(
+            json_schema=from_list,
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), from_list]
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                list, return_schema=list_schema
+            ),
+        )
@@ -1,7 +1,15 @@
 """Event repository for data access."""
 
-from typing import Dict, Optional, List
-from .models import Event
+import threading
+import uuid
+from sys import intern
+from contextlib import nullcontext
+from typing import ContextManager, Dict, Optional, List, Tuple
+from .models import Event, EventFilters
+from .registrants import RegistrantList
+from .search_index import EventSearchIndex
+from .stats import RegistrationStats
+from core.exceptions import ValidationError
 
 
 class EventRepository:
@@ -10,10 +18,42 @@ class EventRepository:
     def __init__(self):
         """Initialize the repository with empty storage."""
         self._events: Dict[str, Event] = {}
+        # Event ids in creation order; export cursors index into it
+        self._created: List[str] = []
+        # Reverse indexes: userId -> insertion-ordered set of eventIds
+        self._registered_by_user: Dict[str, RegistrantList] = {}
+        self._waitlisted_by_user: Dict[str, RegistrantList] = {}
+        # Events take per-event locks, but a user's index entry spans events
+        self._index_lock = threading.Lock()
+        # Change counters for conditional GETs; they restart with the process,
+        # so the epoch keeps version tokens from matching across restarts
+        self._event_versions: Dict[str, int] = {}
+        self._user_versions: Dict[str, int] = {}
+        self.version_epoch = uuid.uuid4().hex[:8]
+        # Secondary indexes for listing and filtering events
+        self._search = EventSearchIndex()
+        # Aggregates for the stats endpoint, updated with every change
+        self._stats = RegistrationStats()
+        # Pending promotion offers: eventId -> {userId: deadline}; offered users hold a registered seat
+        self._offers: Dict[str, Dict[str, float]] = {}
+        self.offer_holds_supported = True
+        # Batching admissions only pays off when writes wait on I/O; calls
+        # run inline on the event loop here, so batches could never form
+        self.admission_queue_supported = False
+        # Calls never wait on I/O, so async callers run them inline
+        self.blocking_io = False
     
     def create(self, event: Event) -> Event:
         """Create a new event in storage."""
+        if event.eventId not in self._events:
+            self._created.append(event.eventId)
         self._events[event.eventId] = event
+        self._event_versions[event.eventId] = 1
+        self._search.add(event)
+        self._stats.observe(event.eventId, event.capacity, len(event.registered), len(event.waitlist))
+        # Pre-populated registrants come from bulk loads
+        self._index_all(self._registered_by_user, event.registered, event.eventId)
+        self._index_all(self._waitlisted_by_user, event.waitlist, event.eventId)
         return event
     
     def get(self, event_id: str) -> Optional[Event]:
@@ -27,8 +67,248 @@ class EventRepository:
     def update(self, event: Event) -> Event:
         """Update an existing event in storage."""
         self._events[event.eventId] = event
+        self._bump(event.eventId)
+        self._search.add(event)
         return event
     
     def list_all(self) -> List[Event]:
         """Get all events."""
         return list(self._events.values())
+    
+    def page_all(self, after: Optional[int], limit: int) -> Tuple[List[Event], Optional[int]]:
+        """Get a page of all events in creation order, for bulk export.
+        
+        Events are never deleted, so creation order positions are stable
+        cursors. Returns the events and the position to resume after,
+        which is None on the last page.
+        """
+        start = after or 0
+        page = [self._events[event_id] for event_id in self._created[start:start + limit]]
+        return page, start + len(page) if len(page) == limit else None
+    
+    def registrant_totals(self) -> Dict[str, int]:
+        """Count events, registered seats, waitlist entries and the longest waitlist."""
+        events = list(self._events.values())
+        return {
+            "events": len(events),
+            "registered": sum(len(event.registered) for event in events),
+            "waitlisted": sum(len(event.waitlist) for event in events),
+            "max_waitlist": max((len(event.waitlist) for event in events), default=0),
+        }
+    
+    def registration_stats(self, top: int) -> dict:
+        """Get aggregate registration statistics and the top fullest events, in O(top log n)."""
+        return self._stats.summary(top)
+    
+    def search(
+        self, filters: EventFilters, after: Optional[Tuple[str, str]], limit: int
+    ) -> Tuple[List[Event], Optional[Tuple[str, str]]]:
+        """Get a page of events matching filters, ordered by date then eventId.
+        
+        Served from secondary indexes. Returns the events and the
+        (date, eventId) position to resume after, which is None on the
+        last page.
+        """
+        if after is not None and not (
+            isinstance(after, list) and len(after) == 2 and all(isinstance(part, str) for part in after)
+        ):
+            raise ValidationError("cursor is invalid")
+        return self._search.query(
+            filters, None if after is None else tuple(after), limit, self._events.__getitem__
+        )
+    
+    def add_registered(self, event: Event, user_id: str) -> None:
+        """Append a user to an event's registered list."""
+        event.registered.append(user_id)
+        self._bump(event.eventId)
+        self._search.refresh_availability(event)
+        self._index(self._registered_by_user, user_id, event.eventId)
+    
+    def remove_registered(self, event: Event, user_id: str) -> None:
+        """Remove a user from an event's registered list, dropping any offer they hold."""
+        event.registered.remove(user_id)
+        self._drop_offer(event.eventId, user_id)
+        self._bump(event.eventId)
+        self._search.refresh_availability(event)
+        self._unindex(self._registered_by_user, user_id, event.eventId)
+    
+    def add_waitlisted(self, event: Event, user_id: str) -> None:
+        """Append a user to the end of an event's waitlist."""
+        event.waitlist.append(user_id)
+        self._bump(event.eventId)
+        self._index(self._waitlisted_by_user, user_id, event.eventId)
+    
+    def remove_waitlisted(self, event: Event, user_id: str) -> None:
+        """Remove a user from an event's waitlist."""
+        event.waitlist.remove(user_id)
+        self._bump(event.eventId)
+        self._unindex(self._waitlisted_by_user, user_id, event.eventId)
+    
+    def release_seat(self, event: Event, user_id: str) -> Optional[str]:
+        """Remove a registered user and promote the head of the waitlist.
+        
+        Returns the promoted userId, or None if the waitlist was empty.
+        """
+        self.remove_registered(event, user_id)
+        if not event.waitlist:
+            return None
+        promoted_user = event.waitlist.popleft()
+        self._bump(event.eventId)
+        self._unindex(self._waitlisted_by_user, promoted_user, event.eventId)
+        self.add_registered(event, promoted_user)
+        return promoted_user
+    
+    def set_capacity(self, event: Event, capacity: int) -> Tuple[List[str], List[str]]:
+        """Change an event's capacity, moving users between its lists to fit.
+        
+        Raising capacity promotes users from the head of the waitlist into
+        the new seats, in O(promoted). Lowering it below the registered
+        count demotes the most recent registrants to the head of the
+        waitlist, keeping their order, so they are the first promoted
+        when seats free up again. Returns the promoted and demoted userIds.
+        """
+        event.capacity = capacity
+        promoted = event.waitlist.popleft_many(capacity - len(event.registered))
+        for user_id in promoted:
+            event.registered.append(user_id)
+            self._unindex(self._waitlisted_by_user, user_id, event.eventId)
+            self._index(self._registered_by_user, user_id, event.eventId)
+        demoted = event.registered.pop_many(len(event.registered) - capacity)
+        if demoted:
+            event.waitlist.prepend(demoted)
+            for user_id in demoted:
+                self._drop_offer(event.eventId, user_id)
+                self._unindex(self._registered_by_user, user_id, event.eventId)
+                self._index(self._waitlisted_by_user, user_id, event.eventId)
+        self._bump(event.eventId)
+        self._search.refresh_availability(event)
+        return promoted, demoted
+    
+    def hold_offer(self, event: Event, user_id: str, deadline: float) -> None:
+        """Mark a registered user's seat as an offer they must confirm by deadline."""
+        self._offers.setdefault(event.eventId, {})[user_id] = deadline
+        self._bump(event.eventId)
+    
+    def confirm_offer(self, event: Event, user_id: str) -> None:
+        """Turn a user's offer into a plain registration."""
+        self._drop_offer(event.eventId, user_id)
+        self._bump(event.eventId)
+    
+    def offer_deadline(self, event_id: str, user_id: str) -> Optional[float]:
+        """Get the deadline of a user's offer for an event, or None if they hold none."""
+        return self._offers.get(event_id, {}).get(user_id)
+    
+    def pending_offers(self) -> List[Tuple[str, str, float]]:
+        """Get every pending offer as (eventId, userId, deadline)."""
+        return [
+            (event_id, user_id, deadline)
+            for event_id, offers in self._offers.items()
+            for user_id, deadline in offers.items()
+        ]
+    
+    def group_commit(self) -> ContextManager[None]:
+        """Group the persistence of enclosed changes; in memory there is nothing to persist."""
+        return nullcontext()
+    
+    def event_version(self, event_id: str) -> Optional[int]:
+        """Get an event's change counter, or None if the event does not exist."""
+        return self._event_versions.get(event_id)
+    
+    def user_events_version(self, user_id: str) -> Tuple[int, int]:
+        """Get a user's registration-set counter and the sum of their events' counters.
+        
+        Counters only grow and any change to the set bumps the first, so
+        the pair changes whenever the user's events response would.
+        """
+        with self._index_lock:
+            event_ids = list(self._registered_by_user.get(user_id, ()))
+            user_version = self._user_versions.get(user_id, 0)
+        return user_version, sum(self._event_versions.get(event_id, 0) for event_id in event_ids)
+    
+    def list_registered_for_user(self, user_id: str) -> List[Event]:
+        """Get the events a user is registered for, in registration order."""
+        with self._index_lock:
+            event_ids = list(self._registered_by_user.get(user_id, ()))
+        return [self._events[event_id] for event_id in event_ids]
+    
+    def list_waitlisted_for_user(self, user_id: str) -> List[Event]:
+        """Get the events a user is waitlisted for, in waitlist order."""
+        with self._index_lock:
+            event_ids = list(self._waitlisted_by_user.get(user_id, ()))
+        return [self._events[event_id] for event_id in event_ids]
+    
+    def page_registered_for_user(
+        self, user_id: str, after: Optional[int], limit: int
+    ) -> Tuple[List[Event], Optional[int]]:
+        """Get a page of the events a user is registered for.
+        
+        Returns the events and the position to resume after, which is
+        None on the last page.
+        """
+        if after is not None and not isinstance(after, int):
+            raise ValidationError("cursor is invalid")
+        with self._index_lock:
+            event_ids = self._registered_by_user.get(user_id)
+            if event_ids is None:
+                return [], None
+            page, next_after = event_ids.page(after, limit)
+        return [self._events[event_id] for event_id in page], next_after
+    
+    def _index(self, index: Dict[str, RegistrantList], user_id: str, event_id: str) -> None:
+        """Record an eventId against a user in a reverse index."""
+        user_id = intern(user_id)
+        with self._index_lock:
+            event_ids = index.setdefault(user_id, RegistrantList())
+            event_ids.append(event_id)
+            self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+            if index is self._registered_by_user:
+                self._stats.user_registrations_changed(len(event_ids) - 1, len(event_ids))
+    
+    def _index_all(self, index: Dict[str, RegistrantList], user_ids: RegistrantList, event_id: str) -> None:
+        """Record an eventId against every user of a registrant list, whose userIds are interned."""
+        event_id = intern(event_id)
+        versions = self._user_versions
+        counted = index is self._registered_by_user
+        with self._index_lock:
+            for user_id in user_ids:
+                event_ids = index.get(user_id)
+                if event_ids is None:
+                    event_ids = index[user_id] = RegistrantList()
+                event_ids.append(event_id)
+                versions[user_id] = versions.get(user_id, 0) + 1
+                if counted:
+                    self._stats.user_registrations_changed(len(event_ids) - 1, len(event_ids))
+    
+    def _unindex(self, index: Dict[str, RegistrantList], user_id: str, event_id: str) -> None:
+        """Drop an eventId from a user's entry in a reverse index."""
+        with self._index_lock:
+            event_ids = index.get(user_id)
+            if event_ids is None:
+                return
+            count = len(event_ids)
+            event_ids.discard(event_id)
+            self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+            if index is self._registered_by_user:
+                self._stats.user_registrations_changed(count, len(event_ids))
+            if not event_ids:
+                del index[user_id]
+    
+    def _drop_offer(self, event_id: str, user_id: str) -> None:
+        """Forget a user's offer for an event, if they hold one."""
+        offers = self._offers.get(event_id)
+        if offers and offers.pop(user_id, None) is not None and not offers:
+            del self._offers[event_id]
+    
+    def _bump(self, event_id: str) -> None:
+        """Advance an event's change counter and statistics; callers hold the event's lock."""
+        self._event_versions[event_id] = self._event_versions.get(event_id, 0) + 1
+        event = self._events[event_id]
+        self._stats.observe(event_id, event.capacity, len(event.registered), len(event.waitlist))
+    
+    def _rebuild_stats(self) -> None:
+        """Recompute the statistics from scratch, after state was replaced wholesale."""
+        self._stats = RegistrationStats.from_counts(
+            ((event.eventId, event.capacity, len(event.registered), len(event.waitlist))
+             for event in self._events.values()),
+            (len(event_ids) for event_ids in self._registered_by_user.values()),
+        )
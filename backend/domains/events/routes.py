@@ -1,25 +1,32 @@
 """Event API routes."""
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from .models import Event
-from .service import EventService
-from core.exceptions import EntityAlreadyExistsError, EntityNotFoundError, ValidationError
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from .models import Event, EventCapacityUpdate, EventFilters
+from .projections import parse_fields, render_page
+from .service import AsyncEventService
+from core.change_feed import event_stream_response
+from core.dependencies import get_async_event_service
+from core.exceptions import (
+    BusinessRuleViolationError,
+    EntityAlreadyExistsError,
+    EntityNotFoundError,
+    ValidationError,
+)
+from core.http_cache import conditional_json_response
+from core.pagination import MAX_PAGE_SIZE
+from core.responses import FastJSONResponse
 
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
-def get_event_service() -> EventService:
-    """Dependency to get event service."""
-    from core.dependencies import get_event_service as _get_service
-    return _get_service()
-
-
-@router.post("", status_code=status.HTTP_201_CREATED)
-def create_event(event: Event, service: EventService = Depends(get_event_service)) -> Event:
+@router.post("", status_code=status.HTTP_201_CREATED, response_model=Event)
+async def create_event(event: Event, service: AsyncEventService = Depends(get_async_event_service)) -> FastJSONResponse:
     """Create a new event."""
     try:
-        return service.create_event(event)
+        return FastJSONResponse(await service.create_event(event), status_code=status.HTTP_201_CREATED)
     except EntityAlreadyExistsError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,13 +39,131 @@ def create_event(event: Event, service: EventService = Depends(get_event_service
         )
 
 
+@router.get("", status_code=status.HTTP_200_OK)
+async def list_events(
+    dateFrom: Optional[str] = None,
+    dateTo: Optional[str] = None,
+    location: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    organizer: Optional[str] = None,
+    hasAvailableSpots: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    service: AsyncEventService = Depends(get_async_event_service)
+) -> Response:
+    """List events ordered by date, filtered and paginated.
+    
+    Date bounds are inclusive and compare as strings, so a dateTo of
+    2024-06-30 includes events at any time that day. Events show the
+    fields named in fields, by default all but the registrant arrays.
+    """
+    filters = EventFilters(
+        dateFrom=dateFrom,
+        dateTo=dateTo,
+        location=location,
+        status=status_filter,
+        organizer=organizer,
+        hasAvailableSpots=hasAvailableSpots
+    )
+    try:
+        projection = parse_fields(fields)
+        page = await service.list_events(filters, limit, cursor)
+        return Response(render_page(page, projection), media_type="application/json")
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.patch("/{eventId}", status_code=status.HTTP_200_OK)
+async def update_event(
+    eventId: str,
+    update: EventCapacityUpdate,
+    service: AsyncEventService = Depends(get_async_event_service)
+) -> FastJSONResponse:
+    """Change an event's capacity, returning the users promoted or demoted to fit."""
+    try:
+        return FastJSONResponse(await service.update_capacity(eventId, update.capacity))
+    except EntityNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except BusinessRuleViolationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+
 @router.get("/{eventId}/registrations", status_code=status.HTTP_200_OK)
-def get_event_registrations(eventId: str, service: EventService = Depends(get_event_service)) -> dict:
-    """Get all registrations for an event."""
+async def get_event_registrations(
+    eventId: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: AsyncEventService = Depends(get_async_event_service)
+) -> Response:
+    """Get registrations for an event, paginated when limit or cursor is given.
+    
+    Responses carry an ETag; If-None-Match with the current one gets 304.
+    """
+    try:
+        version = await service.get_registrations_version(eventId)
+        return await conditional_json_response(
+            request, version, lambda: service.get_event_registrations(eventId, limit, cursor)
+        )
+    except EntityNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/{eventId}/registrations/{userId}", status_code=status.HTTP_200_OK)
+async def get_registration_position(
+    eventId: str,
+    userId: str,
+    service: AsyncEventService = Depends(get_async_event_service)
+) -> FastJSONResponse:
+    """Get a user's registration status and position for an event."""
+    try:
+        return FastJSONResponse(await service.get_registration_position(eventId, userId))
+    except EntityNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+
+@router.get("/{eventId}/stream", status_code=status.HTTP_200_OK)
+async def stream_event_changes(
+    eventId: str,
+    last_event_id: Optional[str] = Header(None),
+    service: AsyncEventService = Depends(get_async_event_service)
+) -> StreamingResponse:
+    """Stream the event's registration changes as server-sent events.
+    
+    Reconnecting with Last-Event-ID resumes after that change, or sends
+    a reset event if it is no longer buffered.
+    """
     try:
-        return service.get_event_registrations(eventId)
+        await service.get_event(eventId)
     except EntityNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    return event_stream_response(f"events/{eventId}", last_event_id)
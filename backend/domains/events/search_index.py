@@ -0,0 +1,269 @@
+"""Secondary indexes for filtering and paginating events in memory."""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import Event, EventFilters
+
+# Events order by (date, eventId); undated events sort first with an empty date
+SortKey = Tuple[str, str]
+
+# Fields with an equality filter backed by a hash index
+_HASH_FIELDS = ("location", "status", "organizer")
+
+# Sorts after any date string sharing the prefix, making dateTo inclusive
+_MAX_CHAR = chr(0x10FFFF)
+
+# Keys per bucket of a SortedKeys; a bucket splits when it doubles
+_BUCKET_SIZE = 1000
+
+
+class SortedKeys:
+    """Sort keys in order, held in buckets of bounded size.
+
+    Inserting into or removing from one flat sorted list moves every
+    key after the position. Here only the keys of one bucket move, and
+    the bucket is found by bisecting the bucket maxima, so the cost per
+    change stays flat as the number of events grows.
+    """
+
+    def __init__(self, keys: Iterable[SortKey] = ()):
+        """Hold keys, which must already be sorted."""
+        keys = list(keys)
+        self._buckets: List[List[SortKey]] = [
+            keys[start:start + _BUCKET_SIZE] for start in range(0, len(keys), _BUCKET_SIZE)
+        ]
+        self._maxes: List[SortKey] = [bucket[-1] for bucket in self._buckets]
+        # Keys before each bucket, rebuilt on demand after a change
+        self._offsets: Optional[List[int]] = None
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: SortKey) -> None:
+        """Insert a key in order."""
+        self._offsets = None
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            return
+        index = bisect_left(self._maxes, key)
+        if index == len(self._maxes):
+            # New largest key, the common case for events created in date order
+            index -= 1
+            self._buckets[index].append(key)
+            self._maxes[index] = key
+        else:
+            insort(self._buckets[index], key)
+        bucket = self._buckets[index]
+        if len(bucket) > 2 * _BUCKET_SIZE:
+            self._buckets[index:index + 1] = [bucket[:_BUCKET_SIZE], bucket[_BUCKET_SIZE:]]
+            self._maxes[index:index + 1] = [bucket[_BUCKET_SIZE - 1], bucket[-1]]
+
+    def discard(self, key: SortKey) -> None:
+        """Remove a key if present."""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._maxes):
+            return
+        bucket = self._buckets[index]
+        position = bisect_left(bucket, key)
+        if bucket[position] != key:
+            return
+        del bucket[position]
+        self._offsets = None
+        self._len -= 1
+        if not bucket:
+            del self._buckets[index]
+            del self._maxes[index]
+        elif position == len(bucket):
+            self._maxes[index] = bucket[-1]
+
+    def count(self, lower: Tuple[str, ...], upper: Tuple[str, ...]) -> int:
+        """Count keys from lower up to, not including, upper."""
+        return max(0, self._position(upper) - self._position(lower))
+
+    def walk(self, lower: Tuple[str, ...], after: Optional[SortKey], upper: Tuple[str, ...]) -> Iterator[SortKey]:
+        """Yield keys in order from lower, or from after a cursor key if later, stopping before upper."""
+        if after is not None and after >= lower:
+            index = bisect_right(self._maxes, after)
+            position = bisect_right(self._buckets[index], after) if index < len(self._buckets) else 0
+        else:
+            index = bisect_left(self._maxes, lower)
+            position = bisect_left(self._buckets[index], lower) if index < len(self._buckets) else 0
+        for bucket in self._buckets[index:]:
+            for key in bucket[position:]:
+                if key >= upper:
+                    return
+                yield key
+            position = 0
+
+    def _position(self, bound: Tuple[str, ...]) -> int:
+        """Get the number of keys sorting before bound."""
+        index = bisect_left(self._maxes, bound)
+        if index == len(self._maxes):
+            return self._len
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(len(bucket) for bucket in self._buckets)]
+        return self._offsets[index] + bisect_left(self._buckets[index], bound)
+
+
+class EventSearchIndex:
+    """Sorted and hash indexes over events, all ordered by (date, eventId).
+
+    A sorted set of every event's key serves date ranges and unfiltered
+    listing. Each location, status and organizer value maps to a sorted
+    set of the matching keys, and two further sets split events into
+    those with available spots and those that are full. Because every
+    set shares the same order, a query walks whichever one is smallest
+    within the date bounds, checks the remaining filters per event, and
+    resumes from a cursor key by bisection. Work grows with the matching
+    slice of the chosen index, not with the number of events.
+    """
+
+    def __init__(self):
+        """Initialize empty indexes."""
+        self._ordered = SortedKeys()
+        self._hashed: Dict[str, Dict[str, SortedKeys]] = {field: {} for field in _HASH_FIELDS}
+        self._available = SortedKeys()
+        self._full = SortedKeys()
+        # Indexed values per event, needed to remove stale entries on update
+        self._entries: Dict[str, Tuple[SortKey, Tuple[Optional[str], ...], bool]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, event: Event) -> None:
+        """Index an event, replacing any previous entry for it."""
+        key = (event.date or "", event.eventId)
+        values = tuple(getattr(event, field) for field in _HASH_FIELDS)
+        available = _has_spots(event)
+        with self._lock:
+            self._remove(event.eventId)
+            self._ordered.add(key)
+            for field, value in zip(_HASH_FIELDS, values):
+                if value is not None:
+                    index = self._hashed[field]
+                    if value not in index:
+                        index[value] = SortedKeys()
+                    index[value].add(key)
+            (self._available if available else self._full).add(key)
+            self._entries[event.eventId] = (key, values, available)
+
+    def rebuild(self, events: Iterable[Event]) -> None:
+        """Replace the indexes with entries for the given events, sorting once."""
+        ordered: List[SortKey] = []
+        hashed: Dict[str, Dict[str, List[SortKey]]] = {field: {} for field in _HASH_FIELDS}
+        available: List[SortKey] = []
+        full: List[SortKey] = []
+        entries = {}
+        for event in events:
+            key = (event.date or "", event.eventId)
+            values = tuple(getattr(event, field) for field in _HASH_FIELDS)
+            has_spots = _has_spots(event)
+            ordered.append(key)
+            for field, value in zip(_HASH_FIELDS, values):
+                if value is not None:
+                    hashed[field].setdefault(value, []).append(key)
+            (available if has_spots else full).append(key)
+            entries[event.eventId] = (key, values, has_spots)
+        indexes = {
+            field: {value: SortedKeys(sorted(keys)) for value, keys in index.items()}
+            for field, index in hashed.items()
+        }
+        ordered_keys = SortedKeys(sorted(ordered))
+        available_keys, full_keys = SortedKeys(sorted(available)), SortedKeys(sorted(full))
+        with self._lock:
+            self._ordered, self._hashed = ordered_keys, indexes
+            self._available, self._full = available_keys, full_keys
+            self._entries = entries
+
+    def refresh_availability(self, event: Event) -> None:
+        """Move an event between the available-spots and full indexes after registrant changes."""
+        available = _has_spots(event)
+        with self._lock:
+            entry = self._entries.get(event.eventId)
+            if entry is None or entry[2] == available:
+                return
+            key, values, _ = entry
+            if available:
+                self._full.discard(key)
+                self._available.add(key)
+            else:
+                self._available.discard(key)
+                self._full.add(key)
+            self._entries[event.eventId] = (key, values, available)
+
+    def query(
+        self,
+        filters: EventFilters,
+        after: Optional[SortKey],
+        limit: int,
+        get_event: Callable[[str], Event]
+    ) -> Tuple[List[Event], Optional[SortKey]]:
+        """Get up to limit matching events after a cursor key.
+
+        Returns the events and the key to resume after, which is None
+        once no further events match.
+        """
+        lower: Tuple[str, ...] = ("",)
+        upper: Tuple[str, ...] = (_MAX_CHAR,)
+        if filters.dateFrom is not None or filters.dateTo is not None:
+            # Undated events never match a date filter; "\0" sorts after their empty date
+            lower = (filters.dateFrom or "\0",)
+            if filters.dateTo is not None:
+                upper = (filters.dateTo + _MAX_CHAR,)
+
+        with self._lock:
+            candidates = [self._ordered]
+            for field in _HASH_FIELDS:
+                value = getattr(filters, field)
+                if value is not None:
+                    candidates.append(self._hashed[field].get(value, SortedKeys()))
+            if filters.hasAvailableSpots is not None:
+                candidates.append(self._available if filters.hasAvailableSpots else self._full)
+            keys = min(candidates, key=lambda keys: keys.count(lower, upper))
+
+            events: List[Event] = []
+            last: Optional[SortKey] = None
+            for key in keys.walk(lower, after, upper):
+                event = get_event(key[1])
+                if not _matches(event, filters):
+                    continue
+                if len(events) == limit:
+                    return events, last
+                events.append(event)
+                last = key
+        return events, None
+
+    def _remove(self, event_id: str) -> None:
+        """Drop an event's entries; callers hold the lock."""
+        entry = self._entries.pop(event_id, None)
+        if entry is None:
+            return
+        key, values, available = entry
+        self._ordered.discard(key)
+        for field, value in zip(_HASH_FIELDS, values):
+            if value is not None:
+                keys = self._hashed[field][value]
+                keys.discard(key)
+                if not keys:
+                    del self._hashed[field][value]
+        (self._available if available else self._full).discard(key)
+
+
+def _has_spots(event: Event) -> bool:
+    """Check whether an event has unfilled capacity."""
+    return len(event.registered) < event.capacity
+
+
+def _matches(event: Event, filters: EventFilters) -> bool:
+    """Check the equality and availability filters against an event."""
+    for field in _HASH_FIELDS:
+        value = getattr(filters, field)
+        if value is not None and getattr(event, field) != value:
+            return False
+    if filters.hasAvailableSpots is not None and _has_spots(event) != filters.hasAvailableSpots:
+        return False
+    return True
+
@@ -1,22 +1,58 @@
 """Event service for business logic."""
 
-from .models import Event
+from datetime import datetime, timezone
+from typing import Optional
+from .models import Event, EventFilters
+from .offers import OfferTimers, holds_offers
+from .registrants import RegistrantList
 from .repository import EventRepository
-from core.exceptions import EntityAlreadyExistsError, EntityNotFoundError, ValidationError
+from .stats import change_counts
+from core.exceptions import (
+    BusinessRuleViolationError,
+    EntityAlreadyExistsError,
+    EntityNotFoundError,
+    ValidationError,
+)
+from core.async_support import ServiceRunner
+from core.change_feed import ChangeFeed, change_feed, publish_registration_change
+from core.locking import EventLocks
+from core.metrics import timed
+from core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+# Registration pages walk the registered list, then the waitlist
+_SECTIONS = ("registered", "waitlist")
+
+
+def check_event_settings(event: Event) -> None:
+    """Check the settings every new event must have, however it is created."""
+    if event.capacity <= 0:
+        raise ValidationError("capacity must be greater than zero")
+    if event.offerHoldSeconds is not None and event.offerHoldSeconds <= 0:
+        raise ValidationError("offerHoldSeconds must be greater than zero")
 
 
 class EventService:
     """Service for event business logic."""
     
-    def __init__(self, repository: EventRepository):
-        """Initialize the service with a repository."""
+    def __init__(
+        self,
+        repository: EventRepository,
+        locks: Optional[EventLocks] = None,
+        feed: Optional[ChangeFeed] = None,
+        offers: Optional[OfferTimers] = None
+    ):
+        """Initialize the service with a repository, per-event locks, a change feed and offer timers."""
         self._repository = repository
+        self._locks = locks or EventLocks()
+        self._feed = feed or change_feed
+        self._changes = change_counts(self._feed)
+        self._offers = OfferTimers() if offers is None else offers
     
+    @timed
     def create_event(self, event: Event) -> Event:
         """Create a new event."""
-        # Validate capacity is greater than zero
-        if event.capacity <= 0:
-            raise ValidationError("capacity must be greater than zero")
+        check_event_settings(event)
         
         # Check for duplicate eventId
         if self._repository.exists(event.eventId):
@@ -25,11 +61,12 @@ class EventService:
             )
         
         # Initialize registered and waitlist arrays
-        event.registered = []
-        event.waitlist = []
+        event.registered = RegistrantList()
+        event.waitlist = RegistrantList()
         
         return self._repository.create(event)
     
+    @timed
     def get_event(self, event_id: str) -> Event:
         """Get an event by ID, raises exception if not found."""
         event = self._repository.get(event_id)
@@ -39,12 +76,249 @@ class EventService:
             )
         return event
     
-    def get_event_registrations(self, event_id: str) -> dict:
-        """Get registration information for an event."""
+    @timed
+    def update_capacity(self, event_id: str, capacity: int) -> dict:
+        """Change an event's capacity, promoting or demoting users to fit.
+        
+        Raising capacity promotes waitlisted users into the new seats in
+        waitlist order; with offerHoldSeconds each holds the seat as an
+        offer to confirm. Lowering it below the registered count moves the
+        most recent registrants, in order, to the head of the waitlist,
+        which the event must have. Runs under the event's lock, so no
+        registration interleaves with the moves.
+        """
+        if capacity <= 0:
+            raise ValidationError("capacity must be greater than zero")
+        return self._locks.run_atomically(event_id, lambda: self._update_capacity(event_id, capacity))
+    
+    @timed
+    def list_events(
+        self,
+        filters: EventFilters,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Get one page of the events matching filters.
+        
+        Returns the events and a nextCursor to fetch the following page,
+        which is None on the last page.
+        """
+        if (
+            filters.dateFrom is not None
+            and filters.dateTo is not None
+            and filters.dateFrom > filters.dateTo
+        ):
+            raise ValidationError("dateFrom must not be after dateTo")
+        after = None if cursor is None else decode_cursor(cursor)
+        events, next_after = self._repository.search(filters, after, limit or DEFAULT_PAGE_SIZE)
+        return {
+            "events": events,
+            "nextCursor": None if next_after is None else encode_cursor(next_after)
+        }
+    
+    @timed
+    def get_registration_totals(self) -> dict:
+        """Get event count, registrant totals and the longest waitlist."""
+        return self._repository.registrant_totals()
+    
+    @timed
+    def get_registration_stats(self, top: int = 10) -> dict:
+        """Get aggregate registration statistics, the top fullest events and change counts."""
+        stats = self._repository.registration_stats(top)
+        stats["changes"] = self._changes.snapshot()
+        return stats
+    
+    @timed
+    def get_registrations_version(self, event_id: str) -> str:
+        """Get a token that changes whenever the event's registrations change."""
+        version = self._repository.event_version(event_id)
+        if version is None:
+            raise EntityNotFoundError(
+                f"Event with eventId '{event_id}' does not exist"
+            )
+        return f"{self._repository.version_epoch}.{version}"
+    
+    @timed
+    def get_event_registrations(
+        self,
+        event_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Get registration information for an event.
+        
+        Without limit or cursor the full registered and waitlist arrays
+        are returned. Otherwise one page is returned, walking registered
+        users and then the waitlist in join order, with a nextCursor to
+        fetch the following page (None on the last page). Reads under the
+        event's lock, so the lists are not read mid-change.
+        """
+        with self._locks.for_event(event_id):
+            return self._event_registrations(event_id, limit, cursor)
+    
+    def _event_registrations(self, event_id: str, limit: Optional[int], cursor: Optional[str]) -> dict:
+        """Get registration information, must be called under the event's lock."""
         event = self.get_event(event_id)
+        if limit is None and cursor is None:
+            return {
+                "registered": list(event.registered),
+                "waitlist": list(event.waitlist),
+                "capacity": event.capacity,
+                "availableSpots": event.capacity - len(event.registered)
+            }
+        
+        section, after = self._decode_registrations_cursor(cursor)
+        remaining = limit or DEFAULT_PAGE_SIZE
+        pages = {"registered": [], "waitlist": []}
+        next_cursor = None
+        for name in _SECTIONS[_SECTIONS.index(section):]:
+            registrants = getattr(event, name)
+            if remaining == 0:
+                # Page filled exactly at the end of the previous section
+                if registrants:
+                    next_cursor = encode_cursor([name, None])
+                break
+            pages[name], next_after = registrants.page(after, remaining)
+            remaining -= len(pages[name])
+            if next_after is not None:
+                next_cursor = encode_cursor([name, next_after])
+                break
+            after = None
+        
         return {
-            "registered": event.registered,
-            "waitlist": event.waitlist,
+            "registered": pages["registered"],
+            "waitlist": pages["waitlist"],
             "capacity": event.capacity,
-            "availableSpots": event.capacity - len(event.registered)
+            "availableSpots": event.capacity - len(event.registered),
+            "registeredCount": len(event.registered),
+            "waitlistCount": len(event.waitlist),
+            "nextCursor": next_cursor
         }
+    
+    @timed
+    def get_registration_position(self, event_id: str, user_id: str) -> dict:
+        """Get whether a user is registered, offered a seat or waitlisted, and their 1-based position.
+        
+        Offered users hold a registered seat, so their position is among
+        the registered users; offerExpiresAt says when the offer lapses.
+        Position lookups update the lists' position trees, so they run
+        under the event's lock.
+        """
+        event = self.get_event(event_id)
+        for name, status in (("registered", "registered"), ("waitlist", "waitlisted")):
+            with self._locks.for_event(event_id):
+                position = getattr(event, name).position(user_id)
+            if position is not None:
+                result = {"userId": user_id, "status": status, "position": position + 1}
+                if name == "registered" and self._repository.offer_holds_supported:
+                    deadline = self._repository.offer_deadline(event_id, user_id)
+                    if deadline is not None:
+                        result["status"] = "offered"
+                        result["offerExpiresAt"] = datetime.fromtimestamp(deadline, timezone.utc).isoformat()
+                return result
+        raise EntityNotFoundError(
+            f"User '{user_id}' is not registered or waitlisted for event '{event_id}'"
+        )
+    
+    def _update_capacity(self, event_id: str, capacity: int) -> dict:
+        """Change capacity, must be called under the event's lock."""
+        event = self._repository.get(event_id)
+        if event is None:
+            raise EntityNotFoundError(
+                f"Event with eventId '{event_id}' does not exist"
+            )
+        if capacity < len(event.registered) and not event.hasWaitlist:
+            raise BusinessRuleViolationError(
+                f"Event '{event_id}' has {len(event.registered)} registered users "
+                f"and no waitlist to move them to"
+            )
+        
+        promoted, demoted = self._repository.set_capacity(event, capacity)
+        offering = holds_offers(self._repository, event)
+        for user_id in promoted:
+            if offering:
+                self._offers.hold(self._repository, event, user_id)
+            publish_registration_change(self._feed, event, user_id, "offered" if offering else "promoted")
+        for user_id in demoted:
+            # Demotion takes back any offer the user held
+            self._offers.cancel(event_id, user_id)
+            publish_registration_change(self._feed, event, user_id, "demoted")
+        return {
+            "eventId": event_id,
+            "capacity": event.capacity,
+            "availableSpots": event.capacity - len(event.registered),
+            "registeredCount": len(event.registered),
+            "waitlistCount": len(event.waitlist),
+            "promoted": promoted,
+            "demoted": demoted
+        }
+    
+    @staticmethod
+    def _decode_registrations_cursor(cursor: Optional[str]) -> tuple:
+        """Decode a registrations cursor into (section, resume position)."""
+        if cursor is None:
+            return "registered", None
+        position = decode_cursor(cursor)
+        if (
+            not isinstance(position, list)
+            or len(position) != 2
+            or position[0] not in _SECTIONS
+            or not (position[1] is None or isinstance(position[1], int))
+        ):
+            raise ValidationError("cursor is invalid")
+        return position[0], position[1]
+
+
+class AsyncEventService:
+    """Awaitable EventService for async route handlers."""
+    
+    def __init__(self, service: EventService, run: ServiceRunner):
+        """Initialize with the sync service and the runner for its calls."""
+        self._service = service
+        self._run = run
+    
+    async def create_event(self, event: Event) -> Event:
+        """Create a new event."""
+        return await self._run(self._service.create_event, event)
+    
+    async def get_event(self, event_id: str) -> Event:
+        """Get an event by ID, raises exception if not found."""
+        return await self._run(self._service.get_event, event_id)
+    
+    async def update_capacity(self, event_id: str, capacity: int) -> dict:
+        """Change an event's capacity, promoting or demoting users to fit."""
+        return await self._run(self._service.update_capacity, event_id, capacity)
+    
+    async def list_events(
+        self,
+        filters: EventFilters,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Get one page of the events matching filters."""
+        return await self._run(self._service.list_events, filters, limit, cursor)
+    
+    async def get_registration_totals(self) -> dict:
+        """Get event count, registrant totals and the longest waitlist."""
+        return await self._run(self._service.get_registration_totals)
+    
+    async def get_registration_stats(self, top: int = 10) -> dict:
+        """Get aggregate registration statistics, the top fullest events and change counts."""
+        return await self._run(self._service.get_registration_stats, top)
+    
+    async def get_registrations_version(self, event_id: str) -> str:
+        """Get a token that changes whenever the event's registrations change."""
+        return await self._run(self._service.get_registrations_version, event_id)
+    
+    async def get_event_registrations(
+        self,
+        event_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Get registration information for an event, paginated when limit or cursor is given."""
+        return await self._run(self._service.get_event_registrations, event_id, limit, cursor)
+    
+    async def get_registration_position(self, event_id: str, user_id: str) -> dict:
+        """Get whether a user is registered or waitlisted, and their 1-based position."""
+        return await self._run(self._service.get_registration_position, event_id, user_id)
@@ -0,0 +1,231 @@
+"""Registration statistics kept up to date as registrations change.
+
+RegistrationStats holds aggregates over all events: totals, a histogram
+of how full events are, a histogram of waitlist lengths, a histogram of
+registrations per user, and the fullest events. The in-memory event
+repository feeds it every change to an event's lists or capacity and to
+its per-user index, so reading the statistics costs O(1), plus
+O(top log n) for the fullest events, however many events there are.
+
+Size histograms use power-of-two buckets: 0, 1, 2-3, 4-7 and so on.
+Occupancy buckets are tenths of capacity, plus one for full events.
+
+The fullest events come from a heap with lazy deletion: a change pushes
+the event's new entry and leaves the old one behind, to be dropped when
+it surfaces. The heap is rebuilt from the current entries once stale
+ones outnumber them, so pushes stay O(log n) amortized.
+
+ChangeCounts counts the registration changes published on a change
+feed by kind, e.g. promotions. Only changes published since the
+process started are counted, so replaying a log on recovery does not
+inflate them.
+"""
+
+import heapq
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.change_feed import ChangeFeed
+
+# Occupancy buckets: tenths of capacity, then full
+_OCCUPANCY_BUCKETS = 11
+
+# Power-of-two size buckets; 64 covers any list that fits in memory
+_SIZE_BUCKETS = 64
+
+# Kinds of registration change, as published on the change feed
+CHANGE_KINDS = (
+    "registered", "waitlisted", "unregistered", "left_waitlist", "promoted", "demoted",
+    "offered", "confirmed", "offer_expired",
+)
+
+
+def _occupancy_bucket(registered: int, capacity: int) -> int:
+    """Get the tenth of capacity an event's registrations fall in, or 10 when full."""
+    if registered >= capacity:
+        return _OCCUPANCY_BUCKETS - 1
+    return registered * 10 // capacity
+
+
+def _size_histogram(counts: List[int], key: str, skip_zero: bool = False) -> List[dict]:
+    """Render power-of-two buckets up to the last nonempty one."""
+    last = max((i for i, count in enumerate(counts) if count), default=-1)
+    return [
+        {"min": 0 if i == 0 else 1 << (i - 1), "max": (1 << i) - 1, key: counts[i]}
+        for i in range(1 if skip_zero else 0, last + 1)
+    ]
+
+
+class RegistrationStats:
+    """Aggregates over every event's capacity and lists, maintained incrementally.
+
+    observe and summary are thread-safe; per-user changes are serialized by the caller.
+    """
+
+    def __init__(self):
+        """Initialize statistics for no events."""
+        # eventId -> (capacity, registered, waitlisted) as last observed
+        self._events: Dict[str, Tuple[int, int, int]] = {}
+        self._capacity = 0
+        self._registered = 0
+        self._waitlisted = 0
+        self._occupancy = [0] * _OCCUPANCY_BUCKETS
+        self._waitlists = [0] * _SIZE_BUCKETS
+        # Registrations per user, over users with at least one
+        self._per_user = [0] * _SIZE_BUCKETS
+        self._users = 0
+        # (-fill rate, -waitlisted, eventId, observed counts); current while
+        # the counts are the very tuple _events holds for the event
+        self._fullest: List[tuple] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_counts(
+        cls, events: Iterable[Tuple[str, int, int, int]], per_user: Iterable[int] = ()
+    ) -> "RegistrationStats":
+        """Compute statistics from scratch.
+
+        events yields (eventId, capacity, registered, waitlisted) and
+        per_user the number of events each user is registered for.
+        """
+        stats = cls()
+        for event_id, capacity, registered, waitlisted in events:
+            stats.observe(event_id, capacity, registered, waitlisted)
+        for count in per_user:
+            stats.user_registrations_changed(0, count)
+        return stats
+
+    def observe(self, event_id: str, capacity: int, registered: int, waitlisted: int) -> None:
+        """Record an event's current capacity and list lengths."""
+        current = (capacity, registered, waitlisted)
+        occupancy = _OCCUPANCY_BUCKETS - 1 if registered >= capacity else registered * 10 // capacity
+        waitlist = waitlisted.bit_length()
+        with self._lock:
+            previous = self._events.get(event_id)
+            if previous == current:
+                return
+            self._events[event_id] = current
+            if previous is None:
+                self._capacity += capacity
+                self._registered += registered
+                self._waitlisted += waitlisted
+                self._occupancy[occupancy] += 1
+                self._waitlists[waitlist] += 1
+            else:
+                old_capacity, old_registered, old_waitlisted = previous
+                self._capacity += capacity - old_capacity
+                self._registered += registered - old_registered
+                self._waitlisted += waitlisted - old_waitlisted
+                old_occupancy = _occupancy_bucket(old_registered, old_capacity)
+                if old_occupancy != occupancy:
+                    self._occupancy[old_occupancy] -= 1
+                    self._occupancy[occupancy] += 1
+                old_waitlist = old_waitlisted.bit_length()
+                if old_waitlist != waitlist:
+                    self._waitlists[old_waitlist] -= 1
+                    self._waitlists[waitlist] += 1
+            heapq.heappush(self._fullest, (-registered / capacity, -waitlisted, event_id, current))
+            if len(self._fullest) > 2 * len(self._events) + 64:
+                self._rebuild_fullest()
+
+    def user_registrations_changed(self, old: int, new: int) -> None:
+        """Record that a user's registration count went from old to new.
+
+        Not locked: callers serialize these, e.g. under the lock of the
+        index the counts come from.
+        """
+        if old:
+            self._per_user[old.bit_length()] -= 1
+        else:
+            self._users += 1
+        if new:
+            self._per_user[new.bit_length()] += 1
+        else:
+            self._users -= 1
+
+    def summary(self, top: int = 10) -> dict:
+        """Get the statistics, with the top fullest events by fill rate then waitlist length."""
+        with self._lock:
+            fullest = self._top(top)
+            return {
+                "events": len(self._events),
+                "capacity": self._capacity,
+                "registered": self._registered,
+                "waitlisted": self._waitlisted,
+                "fillRate": self._registered / self._capacity if self._capacity else 0.0,
+                "registeredUsers": self._users,
+                "registrationsPerUser": self._registered / self._users if self._users else 0.0,
+                "occupancy": [
+                    {"minPercent": i * 10, "events": count} for i, count in enumerate(self._occupancy)
+                ],
+                "waitlistLengths": _size_histogram(self._waitlists, "events"),
+                "registrationsPerUserHistogram": _size_histogram(self._per_user, "users", skip_zero=True),
+                "fullest": [
+                    {
+                        "eventId": event_id,
+                        "capacity": capacity,
+                        "registeredCount": registered,
+                        "waitlistCount": waitlisted,
+                        "fillRate": registered / capacity,
+                    }
+                    for event_id, capacity, registered, waitlisted in fullest
+                ],
+            }
+
+    def _top(self, count: int) -> List[Tuple[str, int, int, int]]:
+        """Pop current entries off the heap until count are found, then push them back."""
+        found = []
+        heap = self._fullest
+        while heap and len(found) < count:
+            entry = heapq.heappop(heap)
+            if self._events.get(entry[2]) is entry[3]:
+                found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(entry[2],) + entry[3] for entry in found]
+
+    def _rebuild_fullest(self) -> None:
+        """Replace the heap with one current entry per event."""
+        self._fullest = [
+            (-counts[1] / counts[0], -counts[2], event_id, counts)
+            for event_id, counts in self._events.items()
+        ]
+        heapq.heapify(self._fullest)
+
+
+class ChangeCounts:
+    """Counts of the registration changes published on a change feed, by kind."""
+
+    def __init__(self, feed: ChangeFeed):
+        """Start counting changes published on feed from now on."""
+        self._counts: Dict[str, int] = dict.fromkeys(CHANGE_KINDS, 0)
+        self._lock = threading.Lock()
+        feed.add_listener(self._count)
+
+    def _count(self, topic: str, kind: str, body: bytes) -> None:
+        # Each change is published to its event's topic and its user's topic
+        if topic.startswith("events/"):
+            with self._lock:
+                self._counts[kind] = self._counts.get(kind, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Get the counts so far."""
+        with self._lock:
+            return dict(self._counts)
+
+
+_change_counts: "weakref.WeakKeyDictionary[ChangeFeed, ChangeCounts]" = weakref.WeakKeyDictionary()
+_change_counts_lock = threading.Lock()
+
+
+def change_counts(feed: ChangeFeed) -> ChangeCounts:
+    """Get the change counts for a feed, counting from the first call.
+
+    Call it when the feed is created, so that no change escapes the counts.
+    """
+    with _change_counts_lock:
+        counts: Optional[ChangeCounts] = _change_counts.get(feed)
+        if counts is None:
+            counts = _change_counts[feed] = ChangeCounts(feed)
+        return counts
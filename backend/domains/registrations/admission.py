@@ -0,0 +1,80 @@
+"""Per-event admission queues for high-contention registration."""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Tuple, Union
+
+
+# Registrations applied per batch, bounding how long one batch holds the event
+DEFAULT_MAX_BATCH = 256
+
+# Processes a batch of userIds for an event, returning a result or exception per user
+BatchProcessor = Callable[[str, List[str]], List[Union[dict, Exception]]]
+
+
+class AdmissionQueues:
+    """FIFO queues of pending registrations, each drained by one worker.
+
+    Callers enqueue a userId and block on a future. A caller that finds
+    its event's queue idle becomes the worker: it takes up to max_batch
+    entries in arrival order and hands them to the processor, which
+    applies the whole batch in one critical section and one group
+    commit. If more requests queued up meanwhile, a worker thread takes
+    over draining so the caller can return; it exits once the queue is
+    empty, so idle events hold no threads and an uncontended request
+    never waits on a thread handoff.
+    """
+
+    def __init__(self, process: BatchProcessor, max_batch: int = DEFAULT_MAX_BATCH):
+        """Initialize with the batch processor."""
+        if max_batch <= 0:
+            raise ValueError("max_batch must be greater than zero")
+        self._process = process
+        self._max_batch = max_batch
+        self._queues: Dict[str, Deque[Tuple[str, Future]]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, event_id: str, user_id: str) -> dict:
+        """Queue a registration and wait for its result, re-raising its exception."""
+        future: Future = Future()
+        with self._lock:
+            queue = self._queues.get(event_id)
+            idle = queue is None
+            if idle:
+                queue = self._queues[event_id] = deque()
+            queue.append((user_id, future))
+        if idle and self._drain_batch(event_id):
+            threading.Thread(
+                target=self._drain, args=(event_id,), name=f"admission-{event_id}", daemon=True
+            ).start()
+        return future.result()
+
+    def _drain(self, event_id: str) -> None:
+        """Process an event's queue in batches until it is empty."""
+        while self._drain_batch(event_id):
+            pass
+
+    def _drain_batch(self, event_id: str) -> bool:
+        """Process one batch, returning whether more entries are waiting.
+
+        When none are, the queue is removed so the next submit finds it
+        idle; only the current worker calls this for a given event.
+        """
+        with self._lock:
+            queue = self._queues[event_id]
+            batch = [queue.popleft() for _ in range(min(len(queue), self._max_batch))]
+        try:
+            results = self._process(event_id, [user_id for user_id, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        with self._lock:
+            if queue:
+                return True
+            del self._queues[event_id]
+            return False
@@ -1,7 +1,8 @@
 """Registration domain models."""
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from domains.users.models import MAX_BATCH_SIZE
 
 
 class RegistrationRequest(BaseModel):
@@ -9,6 +10,11 @@ class RegistrationRequest(BaseModel):
     userId: str
 
 
+class BatchRegistrationRequest(BaseModel):
+    """Request model for bulk registration of users for one event."""
+    userIds: List[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 class RegistrationResponse(BaseModel):
     """Response model for registration operations."""
     message: str
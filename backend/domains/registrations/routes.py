@@ -1,30 +1,59 @@
 """Registration API routes."""
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from .models import RegistrationRequest
-from .service import RegistrationService
-from core.exceptions import EntityNotFoundError, BusinessRuleViolationError
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status, Depends
+from .models import RegistrationRequest, BatchRegistrationRequest
+from .service import AsyncRegistrationService
+from domains.events.projections import parse_fields, render_page
+from core.dependencies import get_async_registration_service
+from core.exceptions import (
+    EntityNotFoundError,
+    BusinessRuleViolationError,
+    IdempotencyKeyReusedError,
+    ValidationError,
+)
+from core.http_cache import conditional_json_response
+from core.pagination import MAX_PAGE_SIZE
+from core.responses import FastJSONResponse, route_status_code
 
 
 router = APIRouter(tags=["registrations"])
 
+# Longest Idempotency-Key header accepted
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
 
-def get_registration_service() -> RegistrationService:
-    """Dependency to get registration service."""
-    from core.dependencies import get_registration_service as _get_service
-    return _get_service()
+
+def _idempotency_key(
+    key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=MAX_IDEMPOTENCY_KEY_LENGTH)
+) -> Optional[str]:
+    """Dependency reading the optional Idempotency-Key header."""
+    return key
 
 
 @router.post("/events/{eventId}/register", status_code=status.HTTP_200_OK)
 @router.post("/events/{eventId}/registrations", status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     eventId: str,
     request: RegistrationRequest,
-    service: RegistrationService = Depends(get_registration_service)
-) -> dict:
-    """Register a user for an event."""
+    service: AsyncRegistrationService = Depends(get_async_registration_service),
+    status_code: int = Depends(route_status_code),
+    idempotency_key: Optional[str] = Depends(_idempotency_key)
+) -> FastJSONResponse:
+    """Register a user for an event.
+    
+    Retries sending the same Idempotency-Key get the first attempt's
+    response instead of "already registered".
+    """
     try:
-        return service.register_user(eventId, request.userId)
+        return FastJSONResponse(
+            await service.register_user(eventId, request.userId, idempotency_key),
+            status_code=status_code
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except EntityNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -44,16 +73,63 @@ def register_user(
             )
 
 
+@router.post("/events/{eventId}/registrations:batch", status_code=status.HTTP_200_OK)
+async def register_users(
+    eventId: str,
+    request: BatchRegistrationRequest,
+    service: AsyncRegistrationService = Depends(get_async_registration_service)
+) -> FastJSONResponse:
+    """Register a batch of users for an event, returning a status per user."""
+    try:
+        return FastJSONResponse({"results": await service.register_users(eventId, request.userIds)})
+    except EntityNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+
 @router.delete("/events/{eventId}/register/{userId}", status_code=status.HTTP_200_OK)
 @router.delete("/events/{eventId}/registrations/{userId}", status_code=status.HTTP_200_OK)
-def unregister_user(
+async def unregister_user(
+    eventId: str,
+    userId: str,
+    service: AsyncRegistrationService = Depends(get_async_registration_service),
+    idempotency_key: Optional[str] = Depends(_idempotency_key)
+) -> FastJSONResponse:
+    """Unregister a user from an event.
+    
+    Retries sending the same Idempotency-Key get the first attempt's
+    response, even after the seat has been given to someone else.
+    """
+    try:
+        return FastJSONResponse(await service.unregister_user(eventId, userId, idempotency_key))
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except EntityNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except BusinessRuleViolationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+
+@router.post("/events/{eventId}/offers/{userId}/confirm", status_code=status.HTTP_200_OK)
+async def confirm_offer(
     eventId: str,
     userId: str,
-    service: RegistrationService = Depends(get_registration_service)
-) -> dict:
-    """Unregister a user from an event."""
+    service: AsyncRegistrationService = Depends(get_async_registration_service)
+) -> FastJSONResponse:
+    """Confirm the seat a user was offered from the waitlist before the offer expires."""
     try:
-        return service.unregister_user(eventId, userId)
+        return FastJSONResponse(await service.confirm_offer(eventId, userId))
     except EntityNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,16 +144,43 @@ def unregister_user(
 
 @router.get("/users/{userId}/events", status_code=status.HTTP_200_OK)
 @router.get("/users/{userId}/registrations", status_code=status.HTTP_200_OK)
-def get_user_events(
+async def get_user_events(
     userId: str,
-    service: RegistrationService = Depends(get_registration_service)
-) -> dict:
-    """Get all events a user is registered for."""
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    service: AsyncRegistrationService = Depends(get_async_registration_service)
+) -> Response:
+    """Get events a user is registered for, paginated when limit or cursor is given.
+    
+    Events show the fields named in fields, by default all but the
+    registrant arrays. Responses carry an ETag; If-None-Match with the
+    current one gets 304.
+    """
     try:
-        events = service.get_user_events(userId)
-        return {"events": events}
+        projection = parse_fields(fields)
+        version = await service.get_user_events_version(userId)
+        
+        def serialize(page: dict) -> bytes:
+            return render_page(page, projection)
+        
+        if limit is not None or cursor is not None:
+            return await conditional_json_response(
+                request, version, lambda: service.get_user_events_page(userId, limit, cursor), serialize=serialize
+            )
+        
+        async def all_events() -> dict:
+            return {"events": await service.get_user_events(userId)}
+        
+        return await conditional_json_response(request, version, all_events, serialize=serialize)
     except EntityNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -1,34 +1,199 @@
 """Registration service for business logic."""
 
-from typing import List
+from typing import List, Optional, Tuple, Union
 from domains.users.repository import UserRepository
 from domains.events.repository import EventRepository
 from domains.events.models import Event
-from core.exceptions import EntityNotFoundError, BusinessRuleViolationError
+from domains.events.offers import OfferTimers, holds_offers
+from core.exceptions import (
+    EntityNotFoundError,
+    BusinessRuleViolationError,
+    ConcurrentModificationError,
+)
+from core.async_support import ServiceRunner
+from core.change_feed import ChangeFeed, change_feed, publish_registration_change
+from core.idempotency import IdempotencyStore, idempotency_store
+from core.locking import MAX_CONFLICT_ATTEMPTS, EventLocks
+from .admission import AdmissionQueues
+from core.metrics import timed
+from core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
 
 
 class RegistrationService:
     """Service for registration business logic."""
     
-    def __init__(self, user_repo: UserRepository, event_repo: EventRepository):
-        """Initialize the service with repositories."""
+    def __init__(
+        self,
+        user_repo: UserRepository,
+        event_repo: EventRepository,
+        locks: Optional[EventLocks] = None,
+        feed: Optional[ChangeFeed] = None,
+        idempotency: Optional[IdempotencyStore] = None,
+        offers: Optional[OfferTimers] = None
+    ):
+        """Initialize the service with repositories, per-event locks, a change feed, an idempotency store and offer timers.
+        
+        The service expires the offers the timers hold, starting with
+        any the repository recovered.
+        """
         self._user_repo = user_repo
         self._event_repo = event_repo
+        self._locks = locks or EventLocks()
+        self._feed = feed or change_feed
+        self._idempotency = idempotency or idempotency_store
+        self._admission = AdmissionQueues(self._admit)
+        self._offers = OfferTimers() if offers is None else offers
+        self._offers.set_handler(self._expire_offer)
+        if event_repo.offer_holds_supported:
+            for event_id, user_id, deadline in event_repo.pending_offers():
+                self._offers.schedule(event_id, user_id, deadline)
     
-    def register_user(self, event_id: str, user_id: str) -> dict:
-        """Register a user for an event."""
-        # Check if user exists
+    @timed
+    def register_user(self, event_id: str, user_id: str, idempotency_key: Optional[str] = None) -> dict:
+        """Register a user for an event.
+        
+        Events created with admissionQueue go through a per-event queue
+        whose worker seats users in arrival order, many per critical
+        section, instead of each request taking the event lock in turn.
+        The flag is honoured only by repositories whose writes block on
+        I/O (the write-ahead log with fsync always); elsewhere it is ignored.
+        With an idempotency key, a repeated call replays the first
+        call's result or error instead of registering again.
+        """
+        if idempotency_key is None:
+            return self._register_user(event_id, user_id)
+        return self._idempotency.run(
+            idempotency_key, ("register", event_id, user_id),
+            lambda: self._register_user(event_id, user_id)
+        )
+    
+    @timed
+    def unregister_user(self, event_id: str, user_id: str, idempotency_key: Optional[str] = None) -> dict:
+        """Unregister a user from an event.
+        
+        With an idempotency key, a repeated call replays the first
+        call's result or error instead of unregistering again.
+        """
+        if idempotency_key is None:
+            return self._unregister_user(event_id, user_id)
+        return self._idempotency.run(
+            idempotency_key, ("unregister", event_id, user_id),
+            lambda: self._unregister_user(event_id, user_id)
+        )
+    
+    @timed
+    def confirm_offer(self, event_id: str, user_id: str) -> dict:
+        """Confirm the seat a user was offered from the waitlist, making it a plain registration.
+        
+        Raises BusinessRuleViolationError when the user holds no offer
+        for the event, or it has expired; an expired offer passes to
+        the next user in line.
+        """
+        return self._locks.run_atomically(event_id, lambda: self._confirm_offer(event_id, user_id))
+    
+    @timed
+    def register_users(self, event_id: str, user_ids: List[str]) -> List[dict]:
+        """Register a batch of users for an event in arrival order.
+        
+        The whole batch runs in one critical section on the event, and
+        each user gets a per-item status instead of an exception:
+        registered, waitlisted, duplicate, not_found, or rejected when
+        the event is full and has no waitlist.
+        """
+        with self._locks.for_event(event_id), self._event_repo.group_commit():
+            event = self._get_event(event_id)
+            results = []
+            for user_id in user_ids:
+                if not self._user_repo.exists(user_id):
+                    status = "not_found"
+                elif user_id in event.registered or user_id in event.waitlist:
+                    status = "duplicate"
+                else:
+                    status, event = self._place_with_retries(event, user_id)
+                results.append({"userId": user_id, "status": status})
+            return results
+    
+    @timed
+    def get_user_events(self, user_id: str) -> List[Event]:
+        """Get all events a user is registered for."""
+        # Validate user existence
+        if not self._user_repo.exists(user_id):
+            raise EntityNotFoundError(
+                f"User with userId '{user_id}' does not exist"
+            )
+        
+        # Only include events where user is registered, not waitlisted
+        return self._event_repo.list_registered_for_user(user_id)
+    
+    @timed
+    def get_user_events_version(self, user_id: str) -> str:
+        """Get a token that changes whenever the user's events response would."""
+        # Validate user existence
         if not self._user_repo.exists(user_id):
             raise EntityNotFoundError(
                 f"User with userId '{user_id}' does not exist"
             )
         
-        # Check if event exists
+        user_version, events_version = self._event_repo.user_events_version(user_id)
+        return f"{self._event_repo.version_epoch}.{user_version}.{events_version}"
+    
+    @timed
+    def get_user_events_page(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Get one page of the events a user is registered for.
+        
+        Returns the events and a nextCursor to fetch the following page,
+        which is None on the last page.
+        """
+        # Validate user existence
+        if not self._user_repo.exists(user_id):
+            raise EntityNotFoundError(
+                f"User with userId '{user_id}' does not exist"
+            )
+        
+        after = None if cursor is None else decode_cursor(cursor)
+        events, next_after = self._event_repo.page_registered_for_user(
+            user_id, after, limit or DEFAULT_PAGE_SIZE
+        )
+        return {
+            "events": events,
+            "nextCursor": None if next_after is None else encode_cursor(next_after)
+        }
+    
+    def _get_event(self, event_id: str) -> Event:
+        """Get an event, raises exception if not found."""
         event = self._event_repo.get(event_id)
         if event is None:
             raise EntityNotFoundError(
                 f"Event with eventId '{event_id}' does not exist"
             )
+        return event
+    
+    def _register_user(self, event_id: str, user_id: str) -> dict:
+        """Register a user, through the event's admission queue if it has one."""
+        # Check if user exists
+        if not self._user_repo.exists(user_id):
+            raise EntityNotFoundError(
+                f"User with userId '{user_id}' does not exist"
+            )
+        
+        if self._event_repo.admission_queue_supported:
+            event = self._event_repo.get(event_id)
+            if event is not None and event.admissionQueue:
+                return self._admission.submit(event_id, user_id)
+        return self._locks.run_atomically(event_id, lambda: self._register(event_id, user_id))
+    
+    def _unregister_user(self, event_id: str, user_id: str) -> dict:
+        """Unregister a user under the event's lock."""
+        return self._locks.run_atomically(event_id, lambda: self._unregister(event_id, user_id))
+    
+    def _register(self, event_id: str, user_id: str) -> dict:
+        """Register a user, must be called under the event's lock."""
+        event = self._get_event(event_id)
         
         # Check if user is already registered
         if user_id in event.registered or user_id in event.waitlist:
@@ -36,58 +201,123 @@ class RegistrationService:
                 f"User '{user_id}' is already registered for event '{event_id}'"
             )
         
-        # Check if event has available capacity
-        if len(event.registered) < event.capacity:
-            # Add user to registered list
-            event.registered.append(user_id)
-            self._event_repo.update(event)
+        return self._registration_result(event_id, user_id, self._place(event, user_id))
+    
+    def _admit(self, event_id: str, user_ids: List[str]) -> List[Union[dict, Exception]]:
+        """Register a queued batch in order under one lock and one group commit.
+        
+        Returns each user's response, or the exception register_user
+        would have raised for them.
+        """
+        with self._locks.for_event(event_id), self._event_repo.group_commit():
+            event = self._event_repo.get(event_id)
+            results: List[Union[dict, Exception]] = []
+            for user_id in user_ids:
+                if event is None:
+                    results.append(EntityNotFoundError(
+                        f"Event with eventId '{event_id}' does not exist"
+                    ))
+                    continue
+                if user_id in event.registered or user_id in event.waitlist:
+                    results.append(BusinessRuleViolationError(
+                        f"User '{user_id}' is already registered for event '{event_id}'"
+                    ))
+                    continue
+                try:
+                    status, event = self._place_with_retries(event, user_id)
+                    results.append(self._registration_result(event_id, user_id, status))
+                except Exception as e:
+                    results.append(e)
+            return results
+    
+    @staticmethod
+    def _registration_result(event_id: str, user_id: str, status: str) -> dict:
+        """Build the response for a placement, raising if it was rejected."""
+        if status == "registered":
             return {
                 "message": f"User '{user_id}' successfully registered for event '{event_id}'",
                 "status": "registered"
             }
-        
-        # Event is at full capacity
-        if event.hasWaitlist:
-            # Add user to waitlist
-            event.waitlist.append(user_id)
-            self._event_repo.update(event)
+        if status == "waitlisted":
             return {
                 "message": f"Event '{event_id}' is full. User '{user_id}' added to waitlist",
                 "status": "waitlisted"
             }
-        else:
-            # Reject registration
+        if status == "duplicate":
             raise BusinessRuleViolationError(
-                f"Event '{event_id}' is at full capacity and does not have a waitlist"
+                f"User '{user_id}' is already registered for event '{event_id}'"
             )
+        # Reject registration
+        raise BusinessRuleViolationError(
+            f"Event '{event_id}' is at full capacity and does not have a waitlist"
+        )
     
-    def unregister_user(self, event_id: str, user_id: str) -> dict:
-        """Unregister a user from an event."""
-        # Check if event exists
-        event = self._event_repo.get(event_id)
-        if event is None:
-            raise EntityNotFoundError(
-                f"Event with eventId '{event_id}' does not exist"
-            )
+    def _place(self, event: Event, user_id: str) -> str:
+        """Seat or waitlist a user who is not yet on the event.
+        
+        Returns "registered", "waitlisted", or "rejected" when the event
+        is full and has no waitlist.
+        """
+        # Check if event has available capacity
+        if len(event.registered) < event.capacity:
+            # Add user to registered list
+            self._event_repo.add_registered(event, user_id)
+            self._publish(event, user_id, "registered")
+            return "registered"
+        
+        # Event is at full capacity
+        if event.hasWaitlist:
+            # Add user to waitlist
+            self._event_repo.add_waitlisted(event, user_id)
+            self._publish(event, user_id, "waitlisted")
+            return "waitlisted"
+        return "rejected"
+    
+    def _place_with_retries(self, event: Event, user_id: str) -> Tuple[str, Event]:
+        """Place a user, re-reading the event when a write loses a race.
+        
+        Returns the status and the event as of the last read, so batches
+        keep working from fresh state after a conflict.
+        """
+        for attempt in range(MAX_CONFLICT_ATTEMPTS):
+            try:
+                return self._place(event, user_id), event
+            except ConcurrentModificationError:
+                if attempt == MAX_CONFLICT_ATTEMPTS - 1:
+                    raise
+                event = self._get_event(event.eventId)
+                if user_id in event.registered or user_id in event.waitlist:
+                    return "duplicate", event
+        raise AssertionError("unreachable")
+    
+    def _publish(self, event: Event, user_id: str, change: str) -> None:
+        """Announce a registration change on the event's and the user's feeds."""
+        publish_registration_change(self._feed, event, user_id, change)
+    
+    def _unregister(self, event_id: str, user_id: str) -> dict:
+        """Unregister a user, must be called under the event's lock."""
+        event = self._get_event(event_id)
         
         # Check if user is in registered list
         if user_id in event.registered:
-            # Remove user from registered list
-            event.registered.remove(user_id)
-            
-            # Check if there's a waitlist to promote from
-            if event.waitlist:
-                # Move first user from waitlist to registered
-                promoted_user = event.waitlist.pop(0)
-                event.registered.append(promoted_user)
-                self._event_repo.update(event)
+            # Free the seat, moving the first waitlisted user into it
+            self._offers.cancel(event_id, user_id)
+            promoted_user = self._event_repo.release_seat(event, user_id)
+            self._publish(event, user_id, "unregistered")
+            if promoted_user is not None and holds_offers(self._event_repo, event):
+                self._offer(event, promoted_user)
+                return {
+                    "message": f"User '{user_id}' unregistered from event '{event_id}'. User '{promoted_user}' offered the seat from waitlist",
+                    "offered": promoted_user
+                }
+            if promoted_user is not None:
+                self._publish(event, promoted_user, "promoted")
                 return {
                     "message": f"User '{user_id}' unregistered from event '{event_id}'. User '{promoted_user}' promoted from waitlist",
                     "promoted": promoted_user
                 }
             else:
                 # No waitlist, capacity simply increases
-                self._event_repo.update(event)
                 return {
                     "message": f"User '{user_id}' successfully unregistered from event '{event_id}'"
                 }
@@ -95,8 +325,8 @@ class RegistrationService:
         # Check if user is in waitlist
         elif user_id in event.waitlist:
             # Remove user from waitlist
-            event.waitlist.remove(user_id)
-            self._event_repo.update(event)
+            self._event_repo.remove_waitlisted(event, user_id)
+            self._publish(event, user_id, "left_waitlist")
             return {
                 "message": f"User '{user_id}' removed from waitlist for event '{event_id}'"
             }
@@ -107,19 +337,96 @@ class RegistrationService:
                 f"User '{user_id}' is not registered or waitlisted for event '{event_id}'"
             )
     
-    def get_user_events(self, user_id: str) -> List[Event]:
-        """Get all events a user is registered for."""
-        # Validate user existence
-        if not self._user_repo.exists(user_id):
-            raise EntityNotFoundError(
-                f"User with userId '{user_id}' does not exist"
+    def _offer(self, event: Event, user_id: str) -> None:
+        """Hold a promoted user's seat as an offer and start its expiry timer."""
+        self._offers.hold(self._event_repo, event, user_id)
+        self._publish(event, user_id, "offered")
+    
+    def _confirm_offer(self, event_id: str, user_id: str) -> dict:
+        """Confirm an offer, must be called under the event's lock."""
+        event = self._get_event(event_id)
+        deadline = None
+        if self._event_repo.offer_holds_supported:
+            deadline = self._event_repo.offer_deadline(event_id, user_id)
+        if deadline is None:
+            raise BusinessRuleViolationError(
+                f"User '{user_id}' has no pending offer for event '{event_id}'"
             )
-        
-        # Filter events where user is in registered list
-        registered_events = []
-        for event in self._event_repo.list_all():
-            # Only include events where user is registered, not waitlisted
-            if user_id in event.registered:
-                registered_events.append(event)
-        
-        return registered_events
+        if deadline <= self._offers.clock():
+            # The timer has not caught up yet; expire the offer now
+            self._release_offer(event, user_id)
+            raise BusinessRuleViolationError(
+                f"The offer to user '{user_id}' for event '{event_id}' has expired"
+            )
+        self._event_repo.confirm_offer(event, user_id)
+        self._offers.cancel(event_id, user_id)
+        self._publish(event, user_id, "confirmed")
+        return {
+            "message": f"User '{user_id}' confirmed their seat for event '{event_id}'",
+            "status": "registered"
+        }
+    
+    def _expire_offer(self, event_id: str, user_id: str) -> None:
+        """Expire an offer whose timer fired, unless it was settled or extended meanwhile."""
+        def expire() -> None:
+            event = self._event_repo.get(event_id)
+            deadline = self._event_repo.offer_deadline(event_id, user_id)
+            if event is None or deadline is None:
+                return
+            if deadline > self._offers.clock():
+                self._offers.schedule(event_id, user_id, deadline)
+                return
+            self._release_offer(event, user_id)
+        self._locks.run_atomically(event_id, expire)
+    
+    def _release_offer(self, event: Event, user_id: str) -> None:
+        """Take back an expired offer and offer the seat to the next in line."""
+        self._offers.cancel(event.eventId, user_id)
+        next_user = self._event_repo.release_seat(event, user_id)
+        self._publish(event, user_id, "offer_expired")
+        if next_user is not None and holds_offers(self._event_repo, event):
+            self._offer(event, next_user)
+        elif next_user is not None:
+            self._publish(event, next_user, "promoted")
+
+
+class AsyncRegistrationService:
+    """Awaitable RegistrationService for async route handlers."""
+    
+    def __init__(self, service: RegistrationService, run: ServiceRunner):
+        """Initialize with the sync service and the runner for its calls."""
+        self._service = service
+        self._run = run
+    
+    async def register_user(self, event_id: str, user_id: str, idempotency_key: Optional[str] = None) -> dict:
+        """Register a user for an event."""
+        return await self._run(self._service.register_user, event_id, user_id, idempotency_key)
+    
+    async def unregister_user(self, event_id: str, user_id: str, idempotency_key: Optional[str] = None) -> dict:
+        """Unregister a user from an event."""
+        return await self._run(self._service.unregister_user, event_id, user_id, idempotency_key)
+    
+    async def confirm_offer(self, event_id: str, user_id: str) -> dict:
+        """Confirm the seat a user was offered from the waitlist."""
+        return await self._run(self._service.confirm_offer, event_id, user_id)
+    
+    async def register_users(self, event_id: str, user_ids: List[str]) -> List[dict]:
+        """Register a batch of users for an event in arrival order."""
+        return await self._run(self._service.register_users, event_id, user_ids)
+    
+    async def get_user_events(self, user_id: str) -> List[Event]:
+        """Get all events a user is registered for."""
+        return await self._run(self._service.get_user_events, user_id)
+    
+    async def get_user_events_version(self, user_id: str) -> str:
+        """Get a token that changes whenever the user's events response would."""
+        return await self._run(self._service.get_user_events_version, user_id)
+    
+    async def get_user_events_page(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Get one page of the events a user is registered for."""
+        return await self._run(self._service.get_user_events_page, user_id, limit, cursor)
@@ -0,0 +1,45 @@
+"""User repository persisted through a write-ahead log and snapshots."""
+
+from sys import intern
+from typing import List
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from .models import User
+from .repository import UserRepository
+from core.persistence import USER_CREATED, DurableStore, SnapshotReader, SnapshotWriter
+
+
+# Validates a whole snapshot's users in one pydantic-core call
+_USER_LIST = TypeAdapter(List[User])
+
+
+class DurableUserRepository(UserRepository):
+    """In-memory user repository whose mutations are logged to a DurableStore."""
+
+    OPCODES = (USER_CREATED,)
+
+    def __init__(self, store: DurableStore):
+        """Initialize empty storage and attach to the store."""
+        super().__init__()
+        self._store = store
+        self.blocking_io = store.blocking_io
+        store.attach(self)
+
+    def create(self, user: User) -> User:
+        """Create a new user in storage."""
+        with self._store.mutation(USER_CREATED, to_json(user), creates=True):
+            return super().create(user)
+
+    def replay(self, opcode: int, fields: List[str]) -> None:
+        """Apply a logged mutation during recovery."""
+        self.create(User.model_validate_json(fields[0]))
+
+    def dump_snapshot(self, writer: SnapshotWriter) -> None:
+        """Write all users to a snapshot."""
+        writer.write_bytes(to_json(self.list_all()))
+
+    def load_snapshot(self, reader: SnapshotReader) -> None:
+        """Replace all users with those read from a snapshot."""
+        users = _USER_LIST.validate_json(reader.read_bytes())
+        self._users = {intern(user.userId): user.name for user in users}
+        self._created = list(self._users)
@@ -0,0 +1,91 @@
+"""User repository backed by DynamoDB."""
+
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from .models import User
+from core.dynamodb import from_item, is_conditional_failure, to_item
+from core.exceptions import EntityAlreadyExistsError
+
+
+class DynamoDBUserRepository:
+    """Repository for managing user data in DynamoDB.
+
+    Implements the same interface as UserRepository. User items also
+    carry the registeredEvents/waitlistedEvents string sets maintained
+    by DynamoDBEventRepository.
+    """
+    
+    def __init__(self, client, table_name: str):
+        """Initialize the repository with a DynamoDB client and table."""
+        self._client = client
+        self._table = table_name
+        self.blocking_io = True
+    
+    def create(self, user: User) -> User:
+        """Create a new user in storage."""
+        try:
+            self._client.put_item(
+                TableName=self._table,
+                Item=to_item(user.model_dump()),
+                ConditionExpression="attribute_not_exists(userId)"
+            )
+        except ClientError as e:
+            if is_conditional_failure(e):
+                raise EntityAlreadyExistsError(
+                    f"User with userId '{user.userId}' already exists"
+                ) from e
+            raise
+        return user
+    
+    def get(self, user_id: str) -> Optional[User]:
+        """Get a user by ID, returns None if not found."""
+        response = self._client.get_item(
+            TableName=self._table,
+            Key=to_item({"userId": user_id}),
+            ProjectionExpression="userId, #name",
+            ExpressionAttributeNames={"#name": "name"}
+        )
+        item = response.get("Item")
+        return User(**from_item(item)) if item else None
+    
+    def exists(self, user_id: str) -> bool:
+        """Check if a user exists."""
+        response = self._client.get_item(
+            TableName=self._table,
+            Key=to_item({"userId": user_id}),
+            ProjectionExpression="userId"
+        )
+        return "Item" in response
+    
+    def list_all(self) -> List[User]:
+        """Get all users."""
+        users = []
+        paginator = self._client.get_paginator("scan")
+        pages = paginator.paginate(
+            TableName=self._table,
+            ProjectionExpression="userId, #name",
+            ExpressionAttributeNames={"#name": "name"}
+        )
+        for page in pages:
+            users.extend(User(**from_item(item)) for item in page["Items"])
+        return users
+    
+    def page_all(
+        self, after: Optional[Dict[str, Any]], limit: int
+    ) -> Tuple[List[User], Optional[Dict[str, Any]]]:
+        """Get a page of all users in scan order, for bulk export.
+        
+        Returns the users and the key to resume after, which is None on
+        the last page.
+        """
+        request = {
+            "TableName": self._table,
+            "Limit": limit,
+            "ProjectionExpression": "userId, #name",
+            "ExpressionAttributeNames": {"#name": "name"},
+        }
+        if after is not None:
+            request["ExclusiveStartKey"] = after
+        response = self._client.scan(**request)
+        users = [User(**from_item(item)) for item in response["Items"]]
+        return users, response.get("LastEvaluatedKey")
@@ -1,6 +1,10 @@
 """User domain models."""
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
+from typing import List
+
+# Upper bound on items accepted by batch endpoints
+MAX_BATCH_SIZE = 1000
 
 
 class User(BaseModel):
@@ -15,3 +19,8 @@ class User(BaseModel):
         if not v or v.strip() == "":
             raise ValueError("cannot be empty or whitespace-only")
         return v
+
+
+class UserBatchRequest(BaseModel):
+    """Request model for bulk user creation."""
+    users: List[User] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
@@ -1,24 +1,40 @@
 """User repository for data access."""
 
-from typing import Dict, Optional, List
+from sys import intern
+from typing import Dict, Optional, List, Tuple
 from .models import User
 
 
 class UserRepository:
-    """Repository for managing user data in memory."""
+    """Repository for managing user data in memory.
+
+    Users are stored as interned userId -> name rather than as models,
+    which saves most of a model's footprint per user and lets registrant
+    lists share the same userId strings. Models are built when read.
+    """
     
     def __init__(self):
         """Initialize the repository with empty storage."""
-        self._users: Dict[str, User] = {}
+        self._users: Dict[str, str] = {}
+        # User ids in creation order; export cursors index into it
+        self._created: List[str] = []
+        # Calls never wait on I/O, so async callers run them inline
+        self.blocking_io = False
     
     def create(self, user: User) -> User:
         """Create a new user in storage."""
-        self._users[user.userId] = user
+        user_id = intern(user.userId)
+        if user_id not in self._users:
+            self._created.append(user_id)
+        self._users[user_id] = user.name
         return user
     
     def get(self, user_id: str) -> Optional[User]:
         """Get a user by ID, returns None if not found."""
-        return self._users.get(user_id)
+        name = self._users.get(user_id)
+        if name is None:
+            return None
+        return User.model_construct(userId=user_id, name=name)
     
     def exists(self, user_id: str) -> bool:
         """Check if a user exists."""
@@ -26,4 +42,18 @@ class UserRepository:
     
     def list_all(self) -> List[User]:
         """Get all users."""
-        return list(self._users.values())
+        return [User.model_construct(userId=user_id, name=name) for user_id, name in self._users.items()]
+    
+    def page_all(self, after: Optional[int], limit: int) -> Tuple[List[User], Optional[int]]:
+        """Get a page of all users in creation order, for bulk export.
+        
+        Users are never deleted, so creation order positions are stable
+        cursors. Returns the users and the position to resume after,
+        which is None on the last page.
+        """
+        start = after or 0
+        page = [
+            User.model_construct(userId=user_id, name=self._users[user_id])
+            for user_id in self._created[start:start + limit]
+        ]
+        return page, start + len(page) if len(page) == limit else None
@@ -1,26 +1,25 @@
 """User API routes."""
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from .models import User
-from .service import UserService
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
+from .models import User, UserBatchRequest
+from .service import AsyncUserService
+from core.change_feed import event_stream_response
+from core.dependencies import get_async_user_service
 from core.exceptions import EntityAlreadyExistsError, EntityNotFoundError
+from core.responses import FastJSONResponse
 from pydantic import ValidationError
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-def get_user_service() -> UserService:
-    """Dependency to get user service."""
-    from core.dependencies import get_user_service as _get_service
-    return _get_service()
-
-
-@router.post("", status_code=status.HTTP_201_CREATED)
-def create_user(user: User, service: UserService = Depends(get_user_service)) -> User:
+@router.post("", status_code=status.HTTP_201_CREATED, response_model=User)
+async def create_user(user: User, service: AsyncUserService = Depends(get_async_user_service)) -> FastJSONResponse:
     """Create a new user."""
     try:
-        return service.create_user(user)
+        return FastJSONResponse(await service.create_user(user), status_code=status.HTTP_201_CREATED)
     except EntityAlreadyExistsError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,3 +31,27 @@ def create_user(user: User, service: UserService = Depends(get_user_service)) ->
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+
+
+@router.post(":batch", status_code=status.HTTP_200_OK)
+async def create_users(
+    request: UserBatchRequest,
+    service: AsyncUserService = Depends(get_async_user_service)
+) -> FastJSONResponse:
+    """Create a batch of users, returning a status per user."""
+    return FastJSONResponse({"results": await service.create_users(request.users)})
+
+
+@router.get("/{userId}/stream", status_code=status.HTTP_200_OK)
+async def stream_user_changes(
+    userId: str,
+    last_event_id: Optional[str] = Header(None),
+    service: AsyncUserService = Depends(get_async_user_service)
+) -> StreamingResponse:
+    """Stream the user's registration changes across events as server-sent events."""
+    if not await service.user_exists(userId):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with userId '{userId}' does not exist"
+        )
+    return event_stream_response(f"users/{userId}", last_event_id)
@@ -1,8 +1,11 @@
 """User service for business logic."""
 
+from typing import List
 from .models import User
 from .repository import UserRepository
 from core.exceptions import EntityAlreadyExistsError, EntityNotFoundError
+from core.async_support import ServiceRunner
+from core.metrics import timed
 
 
 class UserService:
@@ -12,6 +15,7 @@ class UserService:
         """Initialize the service with a repository."""
         self._repository = repository
     
+    @timed
     def create_user(self, user: User) -> User:
         """Create a new user."""
         # Check for duplicate userId
@@ -22,6 +26,20 @@ class UserService:
         
         return self._repository.create(user)
     
+    @timed
+    def create_users(self, users: List[User]) -> List[dict]:
+        """Create a batch of users, reporting created or duplicate per user."""
+        results = []
+        for user in users:
+            try:
+                self.create_user(user)
+                status = "created"
+            except EntityAlreadyExistsError:
+                status = "duplicate"
+            results.append({"userId": user.userId, "status": status})
+        return results
+    
+    @timed
     def get_user(self, user_id: str) -> User:
         """Get a user by ID, raises exception if not found."""
         user = self._repository.get(user_id)
@@ -31,6 +49,32 @@ class UserService:
             )
         return user
     
+    @timed
     def user_exists(self, user_id: str) -> bool:
         """Check if a user exists."""
         return self._repository.exists(user_id)
+
+
+class AsyncUserService:
+    """Awaitable UserService for async route handlers."""
+    
+    def __init__(self, service: UserService, run: ServiceRunner):
+        """Initialize with the sync service and the runner for its calls."""
+        self._service = service
+        self._run = run
+    
+    async def create_user(self, user: User) -> User:
+        """Create a new user."""
+        return await self._run(self._service.create_user, user)
+    
+    async def create_users(self, users: List[User]) -> List[dict]:
+        """Create a batch of users, reporting created or duplicate per user."""
+        return await self._run(self._service.create_users, users)
+    
+    async def get_user(self, user_id: str) -> User:
+        """Get a user by ID, raises exception if not found."""
+        return await self._run(self._service.get_user, user_id)
+    
+    async def user_exists(self, user_id: str) -> bool:
+        """Check if a user exists."""
+        return await self._run(self._service.user_exists, user_id)
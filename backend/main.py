@@ -1,10 +1,22 @@
-from fastapi import FastAPI
+import os
+from fastapi import Depends, FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from domains.users.routes import router as users_router
 from domains.events.routes import router as events_router
 from domains.registrations.routes import router as registrations_router
+from domains.admin.routes import router as admin_router
+from core.dependencies import get_async_event_service, get_event_service, is_eager_startup, warm_up
+from core.load_shedding import LoadSheddingMiddleware
+from core.metrics import MetricsMiddleware, metrics
+from core.responses import EventStreamAwareGZipMiddleware, FastJSONResponse
+from domains.events.service import AsyncEventService
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
+
+# Innermost, so shed requests still get CORS headers and are counted in metrics;
+# off unless LOAD_SHEDDING or RATE_LIMIT_* are set
+app.add_middleware(LoadSheddingMiddleware)
 
 # CORS configuration
 app.add_middleware(
@@ -15,20 +27,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses larger than COMPRESSION_MINIMUM_SIZE bytes (0 compresses everything)
+app.add_middleware(
+    EventStreamAwareGZipMiddleware,
+    minimum_size=int(os.environ.get("COMPRESSION_MINIMUM_SIZE", "1024")),
+)
+
+# Outermost, so request latency includes compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
+# Gauges are computed when metrics are collected, not on every request
+def _registration_gauges():
+    totals = get_event_service().get_registration_totals()
+    return {
+        "events": totals["events"],
+        "registered_users": totals["registered"],
+        "waitlisted_users": totals["waitlisted"],
+        "max_waitlist_depth": totals["max_waitlist"],
+    }
+
+metrics.register_gauges(_registration_gauges)
+
 # Register routers
 app.include_router(users_router)
 app.include_router(events_router)
 app.include_router(registrations_router)
 
+# Export reads and import replaces all state without authentication, so
+# the admin routes are only mounted where ADMIN_API=on opts in
+if os.environ.get("ADMIN_API", "off").lower() == "on":
+    app.include_router(admin_router)
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "User Registration API"}
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "healthy"}
 
+@app.get("/stats")
+async def read_stats(
+    top: int = Query(10, ge=0, le=100, description="Number of fullest events to include"),
+    service: AsyncEventService = Depends(get_async_event_service)
+):
+    """Get registration statistics: totals, fill and waitlist histograms, the fullest events and change counts."""
+    return await service.get_registration_stats(top)
+
+# Sync, so gauge sources that scan DynamoDB run in the threadpool rather than on the event loop
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+# Lambda handler, built on first invocation unless STARTUP_MODE=eager
+_mangum = None
+
+
+def handler(event, context):
+    """Lambda entry point adapting API Gateway events to the ASGI app."""
+    global _mangum
+    if _mangum is None:
+        from mangum import Mangum
+        # The app has no lifespan hooks, so skip the per-invocation lifespan cycle
+        _mangum = Mangum(app, lifespan="off")
+    try:
+        return _mangum(event, context)
+    finally:
+        if metrics.emf:
+            # Lambda ships stdout to CloudWatch Logs, which extracts EMF lines
+            for line in metrics.drain_emf():
+                print(line, flush=True)
+
 
-# Lambda handler
-from mangum import Mangum
-handler = Mangum(app)
+if is_eager_startup():
+    warm_up()
+    from mangum import Mangum
+    _mangum = Mangum(app, lifespan="off")
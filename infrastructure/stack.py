@@ -24,6 +24,16 @@ class AppStack(Stack):
             removal_policy=RemovalPolicy.DESTROY
         )
         
+        users_table = dynamodb.Table(
+            self, "UsersTable",
+            partition_key=dynamodb.Attribute(
+                name="userId",
+                type=dynamodb.AttributeType.STRING
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        
         # Lambda Function
         api_lambda = _lambda.Function(
             self, "EventsApiFunction",
@@ -33,18 +43,26 @@ class AppStack(Stack):
             timeout=Duration.seconds(30),
             memory_size=512,
             environment={
-                "DYNAMODB_TABLE_NAME": events_table.table_name
+                "STORAGE_BACKEND": "dynamodb",
+                "DYNAMODB_TABLE_NAME": events_table.table_name,
+                "USERS_TABLE_NAME": users_table.table_name,
+                "METRICS_EMF": "true",
+                # The API Gateway is public and /admin has no authentication
+                "ADMIN_API": "off"
             }
         )
         
         # Grant Lambda permissions to access DynamoDB
         events_table.grant_read_write_data(api_lambda)
+        users_table.grant_read_write_data(api_lambda)
         
         # API Gateway
         api = apigw.LambdaRestApi(
             self, "EventsApi",
             handler=api_lambda,
             proxy=True,
+            # Lets gzip-compressed (base64-encoded) Lambda responses reach clients as binary
+            binary_media_types=["*/*"],
             default_cors_preflight_options=apigw.CorsOptions(
                 allow_origins=apigw.Cors.ALL_ORIGINS,
                 allow_methods=apigw.Cors.ALL_METHODS,
@@ -55,3 +73,4 @@ class AppStack(Stack):
         # Outputs
         CfnOutput(self, "ApiUrl", value=api.url, description="API Gateway URL")
         CfnOutput(self, "TableName", value=events_table.table_name, description="DynamoDB Table Name")
+        CfnOutput(self, "UsersTableName", value=users_table.table_name, description="DynamoDB Users Table Name")